@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Veri birleştirme ayrı migration'da: PostgreSQL'de aynı işlemde bekleyen FK tetikleyicileri
+    # varken ALTER TABLE çalıştırılamaz
+
+    dependencies = [
+        ('cart', '0003_merge_duplicate_cart_items'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='cart_item_unique_product'),
+        ),
+    ]
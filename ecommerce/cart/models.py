@@ -1,10 +1,40 @@
+from decimal import Decimal
+
 from django.db import models
 from django.conf import settings
-from products.models import Product
+from django.db.models import DecimalField, ExpressionWrapper, F, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
+from products.models import Product, unit_price_expression
+
+PRICE_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+class CartQuerySet(models.QuerySet):
+    def with_contents(self):
+        """
+        Sepet okuma yolu: toplam tutar sepet sorgusunda `Sum(adet * birim fiyat)` ile hesaplanır,
+        kalemler ürünleriyle birlikte tek prefetch sorgusunda gelir. Satır sayısından bağımsız 2 sorgu.
+        """
+        items = (
+            CartItem.objects.select_related('product')
+            .annotate(unit_price=unit_price_expression('product__'))
+            .annotate(line_total=ExpressionWrapper(F('quantity') * F('unit_price'), output_field=PRICE_FIELD))
+            .order_by('id')
+        )
+        return self.annotate(
+            total_price=Coalesce(
+                Sum(F('items__quantity') * unit_price_expression('items__product__'), output_field=PRICE_FIELD),
+                Value(Decimal('0.00')),
+                output_field=PRICE_FIELD,
+            )
+        ).prefetch_related(Prefetch('items', queryset=items))
+
 
 class Cart(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cart')
 
+    objects = CartQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user.email}'s cart"
 
@@ -13,9 +43,15 @@ class CartItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    class Meta:
+        # Sepette ürün başına tek satır; toplu güncelleme (cart/operations.py) bu kısıta upsert yapar
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='cart_item_unique_product'),
+        ]
+
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
 
     @property
     def total_price(self):
-        return self.product.price * self.quantity
+        return self.product.unit_price * self.quantity
@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest, Least
+
+from .models import CartItem
+
+# Bir sepet satırının alabileceği en yüksek adet; işlem alanları da bununla sınırlanır, böylece
+# toplanan delta'lar veritabanı tamsayı sınırına ulaşmaz
+MAX_LINE_QUANTITY = 1000
+
+
+def collapse_operations(operations):
+    """
+    İşlemleri sırasıyla ürün başına tek talimata indirger: ('set', n) veya ('delta', d).
+    `set` sonrası gelen delta hedefe eklenir; yeni bir `set` öncekileri geçersiz kılar.
+    """
+    collapsed = {}
+    for op in operations:
+        product_id = op['product_id']
+        if op.get('set_quantity') is not None:
+            collapsed[product_id] = ('set', op['set_quantity'])
+            continue
+        kind, value = collapsed.get(product_id, ('delta', 0))
+        value += op['quantity_delta']
+        collapsed[product_id] = (kind, min(max(value, 0), MAX_LINE_QUANTITY) if kind == 'set' else value)
+    return collapsed
+
+
+def apply_operations(cart, operations):
+    """
+    Sepet işlemlerini tek transaction'da, işlem sayısından bağımsız sabit sayıda sorguyla uygular:
+    eksik satırları ekle (ignore_conflicts), delta'ları tek `CASE` ile F() artır (0..MAX_LINE_QUANTITY),
+    set'leri (cart, product) kısıtına upsert et, sıfıra düşen satırları sil.
+    """
+    collapsed = collapse_operations(operations)
+    deltas = {pid: value for pid, (kind, value) in collapsed.items() if kind == 'delta' and value}
+    sets = {pid: value for pid, (kind, value) in collapsed.items() if kind == 'set'}
+    items = CartItem.objects.filter(cart=cart)
+
+    with transaction.atomic():
+        additions = [pid for pid, delta in deltas.items() if delta > 0]
+        if additions:
+            CartItem.objects.bulk_create(
+                [CartItem(cart=cart, product_id=pid, quantity=0) for pid in additions],
+                ignore_conflicts=True,
+            )
+        if deltas:
+            items.filter(product_id__in=deltas).update(quantity=Least(
+                Greatest(
+                    Case(*[When(product_id=pid, then=F('quantity') + delta) for pid, delta in deltas.items()]),
+                    Value(0),
+                ),
+                Value(MAX_LINE_QUANTITY),
+            ))
+        kept = {pid: quantity for pid, quantity in sets.items() if quantity > 0}
+        if kept:
+            CartItem.objects.bulk_create(
+                [CartItem(cart=cart, product_id=pid, quantity=quantity) for pid, quantity in kept.items()],
+                update_conflicts=True,
+                unique_fields=['cart', 'product'],
+                update_fields=['quantity'],
+            )
+        emptied = [pid for pid, quantity in sets.items() if quantity == 0]
+        decreased = [pid for pid, delta in deltas.items() if delta < 0]
+        if emptied or decreased:
+            items.filter(Q(product_id__in=emptied) | Q(product_id__in=decreased, quantity=0)).delete()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
+from .operations import MAX_LINE_QUANTITY
 from decimal import Decimal
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -15,13 +16,13 @@ class CartItemSerializer(serializers.ModelSerializer):
         }
 
     def get_product_price(self, obj):
-        # Ensure Decimal is returned for consistent math/serialization
-        return Decimal(str(obj.product.price or 0))
+        # Cart.objects.with_contents() ile gelen kalemlerde annotate edilmiş birim fiyat kullanılır
+        unit_price = getattr(obj, 'unit_price', None)
+        return unit_price if unit_price is not None else obj.product.unit_price
 
     def get_total_price(self, obj):
-        price = Decimal(str(obj.product.price or 0))
-        quantity = int(obj.quantity)
-        return price * quantity
+        line_total = getattr(obj, 'line_total', None)
+        return line_total if line_total is not None else obj.total_price
 
 
 class CartSerializer(serializers.ModelSerializer):
@@ -34,10 +35,20 @@ class CartSerializer(serializers.ModelSerializer):
         read_only_fields = ['user']
 
     def get_total_price(self, obj):
-        # Sum total price from related items to avoid trusting client input
-        total = Decimal('0.00')
-        for item in obj.items.select_related('product').all():
-            price = Decimal(str(getattr(item.product, 'price', Decimal('0.00')) or Decimal('0.00')))
-            quantity = int(item.quantity)
-            total += price * quantity
+        # Toplam istemciden alınmaz; with_contents() annotasyonu yoksa kalemlerden hesaplanır
+        total = getattr(obj, 'total_price', None)
+        if total is None:
+            total = sum((item.total_price for item in obj.items.select_related('product')), Decimal('0.00'))
         return total
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """Toplu sepet işlemi: `quantity_delta` (artır/azalt) veya `set_quantity` (0 = çıkar) alanlarından biri."""
+    product_id = serializers.IntegerField(min_value=1)
+    quantity_delta = serializers.IntegerField(required=False, min_value=-MAX_LINE_QUANTITY, max_value=MAX_LINE_QUANTITY)
+    set_quantity = serializers.IntegerField(required=False, min_value=0, max_value=MAX_LINE_QUANTITY)
+
+    def validate(self, attrs):
+        if ('quantity_delta' in attrs) == ('set_quantity' in attrs):
+            raise serializers.ValidationError('quantity_delta veya set_quantity alanlarından yalnızca biri verilmeli.')
+        return attrs
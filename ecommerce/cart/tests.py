@@ -1,3 +1,110 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ecommerce.testing import QueryCountMixin
+from products.models import Product
+from users.models import User
+from .models import Cart, CartItem
+
+
+class CartQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='c@example.com', email='c@example.com', password=None)
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+
+    def grow_cart(self, size):
+        existing = self.cart.items.count()
+        products = Product.objects.bulk_create([
+            Product(name=f'Ürün {i}', description='-', price=10, discount_price=8 if i % 2 else None,
+                    stock=5, slug=f'urun-{i}')
+            for i in range(existing, size)
+        ])
+        CartItem.objects.bulk_create([CartItem(cart=self.cart, product=p, quantity=2) for p in products])
+
+    def expected_total(self):
+        return sum((item.total_price for item in self.cart.items.select_related('product')), Decimal('0.00'))
+
+    def test_cart_query_count_is_constant(self):
+        counts = self.assertConstantQueries('/api/cart/', self.grow_cart, sizes=(1, 50, 500))
+        self.assertLessEqual(counts[500], 2)
+
+    def test_total_uses_discount_price(self):
+        self.grow_cart(3)
+        response = self.client.get('/api/cart/')
+        self.assertEqual(Decimal(str(response.data['total_price'])), Decimal('56.00'))
+        self.assertEqual(Decimal(str(response.data['total_price'])), self.expected_total())
+        self.assertEqual(
+            [Decimal(str(item['product_price'])) for item in response.data['items']],
+            [Decimal('10.00'), Decimal('8.00'), Decimal('10.00')],
+        )
+
+    def test_mutations_use_the_same_read_path(self):
+        self.grow_cart(50)
+        product = self.cart.items.first().product
+        with self.assertNumQueries(6):
+            # ürün + sepet + kalem get_or_create + save + okuma yolu (2)
+            response = self.client.post('/api/cart/add/', {'product_id': product.id, 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 50)
+
+
+class CartBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='b@example.com', email='b@example.com', password=None)
+        self.client.force_authenticate(self.user)
+        self.products = Product.objects.bulk_create([
+            Product(name=f'Ürün {i}', description='-', price=10, stock=5, slug=f'batch-{i}') for i in range(60)
+        ])
+
+    def batch(self, operations):
+        return self.client.post('/api/cart/batch/', {'operations': operations}, format='json')
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(cart__user=self.user).values_list('product_id', 'quantity'))
+
+    def test_operations_are_applied_in_order(self):
+        a, b, c, d = self.products[:4]
+        self.batch([{'product_id': a.id, 'set_quantity': 3}, {'product_id': b.id, 'quantity_delta': 2}])
+        response = self.batch([
+            {'product_id': a.id, 'quantity_delta': 2},
+            {'product_id': b.id, 'quantity_delta': -5},
+            {'product_id': c.id, 'quantity_delta': 1},
+            {'product_id': c.id, 'quantity_delta': 1},
+            {'product_id': d.id, 'set_quantity': 4},
+            {'product_id': d.id, 'set_quantity': 0},
+        ])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.quantities(), {a.id: 5, c.id: 2})
+        self.assertEqual(Decimal(str(response.data['total_price'])), Decimal('70.00'))
+
+    def test_fifty_line_sync_uses_constant_queries(self):
+        operations = [{'product_id': p.id, 'quantity_delta': 1} for p in self.products[:50]]
+        operations += [{'product_id': p.id, 'set_quantity': 2} for p in self.products[50:]]
+        Cart.objects.create(user=self.user)
+        with self.assertNumQueries(9):
+            # ürün kontrolü, sepet, savepoint, ekle, artır, upsert, release, okuma yolu (2)
+            response = self.batch(operations)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 60)
+
+    def test_invalid_operations_are_rejected(self):
+        product = self.products[0]
+        response = self.batch([{'product_id': product.id, 'quantity_delta': 1, 'set_quantity': 1}])
+        self.assertEqual(response.status_code, 400)
+        response = self.batch([{'product_id': 999999, 'quantity_delta': 1}])
+        self.assertEqual(response.status_code, 404)
+        for operation in ({'quantity_delta': 10 ** 20}, {'quantity_delta': -10 ** 20}, {'set_quantity': 10 ** 20}):
+            response = self.batch([{'product_id': product.id, **operation}])
+            self.assertEqual(response.status_code, 400, operation)
+        self.assertEqual(self.quantities(), {})
 
-# Create your tests here.
+    def test_line_quantity_is_capped(self):
+        a, b = self.products[:2]
+        self.batch([{'product_id': a.id, 'quantity_delta': 1000}] * 3 + [{'product_id': b.id, 'set_quantity': 900}])
+        self.batch([{'product_id': b.id, 'quantity_delta': 1000}, {'product_id': b.id, 'quantity_delta': 1000}])
+        self.assertEqual(self.quantities(), {a.id: 1000, b.id: 1000})
@@ -7,5 +7,6 @@ urlpatterns = [
     path('remove/', CartViewSet.as_view({'delete': 'remove'}), name='cart-remove'),
     path('decrease/', CartViewSet.as_view({'patch': 'decrease'}), name='cart-decrease'),
     path('clear/', CartViewSet.as_view({'delete': 'clear'}), name='cart-clear'),
+    path('batch/', CartViewSet.as_view({'post': 'batch'}), name='cart-batch'),
 ]
 
@@ -3,16 +3,29 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from .models import Cart, CartItem
-from .serializers import CartSerializer
+from .operations import apply_operations
+from .serializers import CartOperationSerializer, CartSerializer
 from products.models import Product
 
+MAX_BATCH_OPERATIONS = 200
+
+
+def load_cart(user):
+    """Yanıt için sepeti toplamı ve kalemleriyle yükler (bkz. CartQuerySet.with_contents)."""
+    carts = Cart.objects.with_contents()
+    try:
+        return carts.get(user=user)
+    except Cart.DoesNotExist:
+        Cart.objects.get_or_create(user=user)
+        return carts.get(user=user)
+
+
 class CartViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     # GET /api/cart/
     def list(self, request):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-        serializer = CartSerializer(cart)
+        serializer = CartSerializer(load_cart(request.user))
         return Response(serializer.data)
 
     @action(detail=False, methods=['post'])
@@ -40,7 +53,7 @@ class CartViewSet(viewsets.ViewSet):
             item.quantity = quantity  # Yeni eklenen ürün miktarını ata
         item.save()
 
-        serializer = CartSerializer(cart)  # Nested serializer otomatik toplamı alır
+        serializer = CartSerializer(load_cart(request.user))  # Toplam sepet sorgusunda hesaplanır
         return Response(serializer.data, status=200)
 
     # DELETE /api/cart/remove/
@@ -53,7 +66,7 @@ class CartViewSet(viewsets.ViewSet):
             
         cart, _ = Cart.objects.get_or_create(user=request.user)
         CartItem.objects.filter(cart=cart, product_id=product_id).delete()
-        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
+        return Response(CartSerializer(load_cart(request.user)).data, status=status.HTTP_200_OK)
 
     # PATCH /api/cart/decrease/
     @action(detail=False, methods=['patch'])
@@ -84,7 +97,7 @@ class CartViewSet(viewsets.ViewSet):
             # Miktar 0 veya daha az olursa ürünü sepetten çıkar
             item.delete()
 
-        serializer = CartSerializer(cart)
+        serializer = CartSerializer(load_cart(request.user))
         return Response(serializer.data)
 
     # DELETE /api/cart/clear/
@@ -93,7 +106,27 @@ class CartViewSet(viewsets.ViewSet):
         """Sepeti tamamen temizler, tüm ürünleri kaldırır."""
         cart, _ = Cart.objects.get_or_create(user=request.user)
         CartItem.objects.filter(cart=cart).delete()
-        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
-
+        return Response(CartSerializer(load_cart(request.user)).data, status=status.HTTP_200_OK)
 
+    # POST /api/cart/batch/
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Birden çok sepet işlemini tek transaction'da uygular, sepeti bir kez döndürür (çevrimdışı senkronizasyon)."""
+        operations = request.data.get('operations') if isinstance(request.data, dict) else request.data
+        if not isinstance(operations, list) or not operations:
+            return Response({'error': 'operations listesi gerekli'}, status=400)
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return Response({'error': f'En fazla {MAX_BATCH_OPERATIONS} işlem gönderilebilir'}, status=400)
+
+        serializer = CartOperationSerializer(data=operations, many=True)
+        if not serializer.is_valid():
+            return Response({'error': 'Geçersiz işlem', 'details': serializer.errors}, status=400)
+
+        product_ids = {op['product_id'] for op in serializer.validated_data}
+        missing = product_ids - set(Product.objects.filter(pk__in=product_ids).values_list('pk', flat=True))
+        if missing:
+            return Response({'error': 'Ürün bulunamadı', 'product_ids': sorted(missing)}, status=404)
 
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+        apply_operations(cart, serializer.validated_data)
+        return Response(CartSerializer(load_cart(request.user)).data, status=status.HTTP_200_OK)
@@ -14,6 +14,9 @@ case "${1:-}" in
   run)
     python manage.py runserver
     ;;
+  worker)
+    python manage.py run_jobs
+    ;;
   createsuperuser)
     python manage.py createsuperuser
     ;;
@@ -21,6 +24,6 @@ case "${1:-}" in
     python manage.py check
     ;;
   *)
-    echo "Usage: $0 {install|run|createsuperuser|check}"
+    echo "Usage: $0 {install|run|worker|createsuperuser|check}"
     ;;
 esac
\ No newline at end of file
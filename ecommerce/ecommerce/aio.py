@@ -0,0 +1,27 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+
+
+def _in_worker(fn):
+    def run():
+        try:
+            return fn()
+        finally:
+            # Havuz thread'inin bağlantısı CONN_MAX_AGE'e göre kapatılır ya da yeniden kullanılır
+            close_old_connections()
+    return run
+
+
+async def gather_queries(*fns):
+    """
+    Birbirinden bağımsız senkron ORM çağrılarını eşzamanlı çalıştırır ve sonuçlarını sırayla döndürür.
+
+    Django'nun async ORM'i (`aget`, `async for` …) tüm sorguları tek bir thread'de sıraya koyar;
+    burada her çağrı kendi veritabanı bağlantısıyla ayrı bir thread'de çalışır. SQLite'ta paralellik
+    kazancı olmadığından ve diğer thread'ler açık transaction'ı göremediğinden çağrılar sırayla yapılır.
+    """
+    if connection.vendor == 'sqlite':
+        return await sync_to_async(lambda: [fn() for fn in fns])()
+    return await asyncio.gather(*(sync_to_async(_in_worker(fn), thread_sensitive=False)() for fn in fns))
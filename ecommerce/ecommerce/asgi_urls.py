@@ -0,0 +1,8 @@
+from django.urls import include, path
+
+# ASGI URL yapılandırması: herkese açık katalog GET'leri async view'lara bağlanır (bkz. products/async_urls.py),
+# geri kalan her şey ve yazma istekleri WSGI ile aynı senkron DRF view'larına gider.
+urlpatterns = [
+    path('api/products/', include('products.async_urls')),
+    path('', include('ecommerce.urls')),
+]
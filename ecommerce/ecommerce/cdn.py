@@ -0,0 +1,87 @@
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from jobs.queue import task
+
+logger = logging.getLogger(__name__)
+
+FASTLY_PURGE_URL = 'https://api.fastly.com/service/{service}/purge'
+FASTLY_KEY_LIMIT = 256  # tek purge isteğinde en fazla surrogate key
+
+
+class BasePurger:
+    """CDN önbelleğinden surrogate key'lerle etiketli yanıtları düşüren arka uç (bkz. `CDN_PURGER`)."""
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class LocalPurger(BasePurger):
+    """CDN olmayan ortamlar ve testler için: purge olaylarını süreç içinde biriktirir."""
+
+    def __init__(self):
+        self.purged = []
+        self._lock = threading.Lock()
+
+    def purge(self, keys):
+        with self._lock:
+            self.purged.append(sorted(keys))
+
+    def keys(self):
+        with self._lock:
+            return {key for batch in self.purged for key in batch}
+
+    def clear(self):
+        with self._lock:
+            self.purged.clear()
+
+
+class FastlyPurger(BasePurger):
+    """
+    Fastly surrogate key purge. İstek yolunda HTTP çağrısı yapılmaz: anahtarlar iş kuyruğuna
+    yazılır, worker `cdn.purge` işlerini birleştirip 256'lık partilerle gönderir.
+    """
+
+    def purge(self, keys):
+        purge_keys.enqueue(keys=sorted(keys))
+
+
+@task('cdn.purge', batch_size=100)
+def purge_keys(payloads):
+    keys = sorted({key for payload in payloads for key in payload['keys']})
+    headers = {'Fastly-Key': settings.FASTLY_API_TOKEN}
+    if getattr(settings, 'FASTLY_SOFT_PURGE', True):
+        # Soft purge içeriği silmez, eskimiş işaretler; origin yanıt veremezse eski kopya sunulabilir
+        headers['Fastly-Soft-Purge'] = '1'
+    url = FASTLY_PURGE_URL.format(service=settings.FASTLY_SERVICE_ID)
+    with requests.Session() as session:
+        for start in range(0, len(keys), FASTLY_KEY_LIMIT):
+            batch = keys[start:start + FASTLY_KEY_LIMIT]
+            response = session.post(
+                url, headers={**headers, 'Surrogate-Key': ' '.join(batch)},
+                timeout=getattr(settings, 'CDN_PURGE_TIMEOUT', 10),
+            )
+            response.raise_for_status()
+    logger.info('%d surrogate key purge edildi', len(keys))
+
+
+_purger = None
+_purger_lock = threading.Lock()
+
+
+def get_purger():
+    global _purger
+    if _purger is None:
+        with _purger_lock:
+            if _purger is None:
+                _purger = import_string(getattr(settings, 'CDN_PURGER', 'ecommerce.cdn.LocalPurger'))()
+    return _purger
+
+
+def purge(keys):
+    if keys:
+        get_purger().purge(keys)
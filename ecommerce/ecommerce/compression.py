@@ -0,0 +1,219 @@
+import threading
+import zlib
+from collections import defaultdict
+
+import brotli
+import zstandard
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+from .metrics import registry
+
+DEFAULT_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+DEFAULT_CONTENT_TYPES = (
+    'application/json', 'application/javascript', 'text/javascript', 'text/css', 'text/plain', 'image/svg+xml',
+)
+
+
+class GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level, wbits=31)
+
+    def streamer(self):
+        """(parça, bitiş) fonksiyonları; her parça istemciye hemen ulaşsın diye flush edilir."""
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class BrotliCodec:
+    name = 'br'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def streamer(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish
+
+
+class ZstdCodec:
+    name = 'zstd'
+
+    def __init__(self, level):
+        self.level = level
+        self._local = threading.local()  # ZstdCompressor thread'ler arasında paylaşılamaz
+
+    def compress(self, data):
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor.compress(data)
+
+    def streamer(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+
+def _stream(codec, chunks):
+    process, finish = codec.streamer()
+    for chunk in chunks:
+        yield process(chunk)
+    yield finish()
+
+
+async def _astream(codec, chunks):
+    process, finish = codec.streamer()
+    async for chunk in chunks:
+        yield process(chunk)
+    yield finish()
+
+
+CODECS = {codec.name: codec for codec in (GzipCodec, BrotliCodec, ZstdCodec)}
+
+
+def parse_accept_encoding(header):
+    """`Accept-Encoding` başlığını {kodlama: q} sözlüğüne çevirir (geçersiz q değerleri 0 sayılır)."""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate(header, preference):
+    """İstemcinin kabul ettiği (q > 0) kodlamalar arasından sunucu tercih sırasındaki ilki; yoksa None."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    for name in preference:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+class CompressionStats:
+    """Kodlama başına sıkıştırılan yanıt sayısı ve giriş/çıkış baytları (`/api/_metrics`)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    def record(self, encoding, before, after):
+        with self._lock:
+            self.responses[encoding] += 1
+            self.bytes[(encoding, 'in')] += before
+            self.bytes[(encoding, 'out')] += after
+
+    def collect(self):
+        with self._lock:
+            responses, sizes = dict(self.responses), dict(self.bytes)
+        lines = [
+            '# HELP http_compressed_responses_total Sıkıştırılan yanıtlar (streaming dahil)',
+            '# TYPE http_compressed_responses_total counter',
+        ]
+        for encoding, count in responses.items():
+            lines.append(f'http_compressed_responses_total{{encoding="{encoding}"}} {count}')
+        lines.append('# HELP http_compression_bytes_total Sıkıştırma öncesi (in) ve sonrası (out) gövde baytları (streaming hariç)')
+        lines.append('# TYPE http_compression_bytes_total counter')
+        for (encoding, stage), count in sizes.items():
+            lines.append(f'http_compression_bytes_total{{encoding="{encoding}",stage="{stage}"}} {count}')
+        return lines
+
+
+stats = CompressionStats()
+registry.add_collector(stats.collect)
+
+
+class CompressionMiddleware:
+    """
+    `Accept-Encoding` ile anlaşılan zstd / brotli / gzip sıkıştırması (sıra: COMPRESSION_ENCODINGS).
+    COMPRESSION_MIN_SIZE'tan küçük gövdeler, COMPRESSION_CONTENT_TYPES dışı tipler, zaten
+    kodlanmış yanıtlar, 206'lar ve FileResponse (sendfile korunur) olduğu gibi geçer. Streaming
+    yanıtlar parça parça sıkıştırılır. text/html bilerek listede yok: CSRF token'ı taşıyan
+    sayfalar BREACH saldırısına açık olmasın.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        levels = {**DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {})}
+        self.preference = tuple(getattr(settings, 'COMPRESSION_ENCODINGS', ('zstd', 'br', 'gzip')))
+        self.codecs = {name: CODECS[name](levels[name]) for name in self.preference}
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.content_types = tuple(getattr(settings, 'COMPRESSION_CONTENT_TYPES', DEFAULT_CONTENT_TYPES))
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (
+            response.has_header('Content-Encoding') or response.status_code == 206
+            or isinstance(response, FileResponse)
+        ):
+            return response
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.headers.get('Accept-Encoding'), self.preference)
+        if encoding is None:
+            return response
+        codec = self.codecs[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _astream(codec, response.streaming_content)
+            else:
+                response.streaming_content = _stream(codec, response.streaming_content)
+            del response['Content-Length']
+            stats.record(encoding, 0, 0)
+        else:
+            compressed = codec.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            stats.record(encoding, len(response.content), len(compressed))
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Sıkıştırılmış gövde bayt bayt aynı olmadığından güçlü ETag zayıflatılır (GZipMiddleware gibi)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,142 @@
+from functools import lru_cache
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from .prefetch import PrefetchPlanMixin, split_fieldset
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+@lru_cache(maxsize=None)
+def readable_fields(serializer_class):
+    """Yanıtta görünen alanlar: ad -> iç içe serializer sınıfı (düz alanlar için None)."""
+    fields = {}
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, ListSerializer):
+            field = field.child
+        fields[name] = type(field) if isinstance(field, BaseSerializer) else None
+    return fields
+
+
+def _expand(serializer_class, tokens):
+    """Preset adlarını açar, `items.quantity` gibi yolları doğrular; bilinmeyenleri ayrı döndürür."""
+    presets = getattr(getattr(serializer_class, 'Meta', None), 'field_presets', {})
+    paths, unknown = [], []
+    for token in tokens:
+        if token in presets:
+            paths.extend(presets[token] if presets[token] != '__all__' else readable_fields(serializer_class))
+            continue
+        name, _, rest = token.partition('.')
+        child = readable_fields(serializer_class).get(name, False)
+        if child is False or (rest and child is None):
+            unknown.append(token)
+        elif rest:
+            child_paths, child_unknown = _expand(child, [rest])
+            paths.extend(f'{name}.{path}' for path in child_paths)
+            unknown.extend(f'{name}.{path}' for path in child_unknown)
+        else:
+            paths.append(name)
+    return paths, unknown
+
+
+def _tokens(value):
+    return [token.strip() for token in (value or '').split(',') if token.strip()]
+
+
+@lru_cache(maxsize=1024)
+def resolve_fieldset(serializer_class, fields=None, omit=None):
+    """
+    `?fields=` / `?omit=` değerlerini serializer'ın alanlarına göre çözer; sonuç sıralı bir yol
+    tuple'ıdır (örn. `('id', 'items.quantity', 'name')`), iki parametre de boşsa None.
+    `fields` virgülle ayrılmış alan ya da `Meta.field_presets` adları (örn. `card`) içerebilir;
+    `omit` seçimden çıkarılacak alanlardır. Bilinmeyen alanlar 400 döndürür.
+    """
+    if not _tokens(fields) and not _tokens(omit):
+        return None
+    errors = {}
+    if _tokens(fields):
+        selected, unknown = _expand(serializer_class, _tokens(fields))
+        if unknown:
+            errors[FIELDS_PARAM] = [f"Bilinmeyen alan: {', '.join(unknown)}"]
+    else:
+        selected = list(readable_fields(serializer_class))
+    omitted, unknown = _expand(serializer_class, _tokens(omit))
+    if unknown:
+        errors[OMIT_PARAM] = [f"Bilinmeyen alan: {', '.join(unknown)}"]
+    if errors:
+        raise ValidationError(errors)
+
+    selection = split_fieldset(selected)
+    for path in omitted:
+        name, _, rest = path.partition('.')
+        if name not in selection:
+            continue
+        if not rest:
+            del selection[name]
+            continue
+        # İç içe alandan çıkarma: önce o serializer'ın (seçili) alanlarına açılır
+        child = readable_fields(serializer_class)[name]
+        remaining = [p for p in (selection[name] or readable_fields(child)) if p != rest and not p.startswith(f'{rest}.')]
+        selection[name] = tuple(remaining)
+    return tuple(sorted(
+        path for name, sub in selection.items()
+        for path in ([name] if sub is None else [f'{name}.{child}' for child in sub])
+    ))
+
+
+def fieldset_from_request(serializer_class, request):
+    params = request.query_params
+    return resolve_fieldset(serializer_class, params.get(FIELDS_PARAM), params.get(OMIT_PARAM))
+
+
+def trim(serializer, fieldset):
+    """Serializer'dan (ve iç içe serializer'lardan) seçili olmayan alanları çıkarır."""
+    selection = split_fieldset(fieldset)
+    if selection is None:
+        return serializer
+    fields = serializer.fields
+    for name in list(fields):
+        field = fields[name]
+        if field.write_only:
+            continue
+        if name not in selection:
+            fields.pop(name)
+        elif selection[name] is not None:
+            trim(field.child if isinstance(field, ListSerializer) else field, selection[name])
+    return serializer
+
+
+class SparseFieldsetSerializerMixin:
+    """Serializer'a `fields=` argümanı ekler (bkz. trim); alan kümesi `resolve_fieldset` sonucudur."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            trim(self, fields)
+
+
+class SparseFieldsetMixin(PrefetchPlanMixin):
+    """
+    GET isteklerinde `?fields=` / `?omit=` ile yanıt alanlarını daraltır. Seçim hem serializer
+    çıktısına hem sorguya yansır: yalnızca gereken ilişkiler JOIN'lenir, seçili alanların okumadığı
+    büyük sütunlar (açıklamalar, JSON) SELECT'e girmez. `fieldset_actions` verilirse yalnızca o
+    action'larda uygulanır (başka serializer döndüren action'lar kendi alan kümesini çözer).
+    """
+    fieldset_actions = None
+
+    def get_fieldset(self):
+        if self.request is None or self.request.method not in ('GET', 'HEAD'):
+            return None
+        if self.fieldset_actions is not None and getattr(self, 'action', None) not in self.fieldset_actions:
+            return None
+        return fieldset_from_request(self.get_serializer_class(), self.request)
+
+    def get_serializer(self, *args, **kwargs):
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            kwargs.setdefault('fields', fieldset)
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,216 @@
+import hashlib
+import io
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from PIL import ExifTags, Image, ImageOps, features
+from rest_framework import serializers
+
+from jobs.queue import task
+
+DERIVATIVE_DIR = 'derivatives'
+WIDTHS = tuple(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (160, 320, 640, 1280)))
+# Tercih sırası: istemci desteklediği ilk biçimi seçer
+FORMATS = tuple(getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', ('avif', 'webp', 'jpeg')))
+QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80, **getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', {})}
+SAVE_OPTIONS = {
+    'avif': {'speed': 6},
+    'webp': {'method': 4},
+    'jpeg': {'optimize': True, 'progressive': True},
+}
+# Boyut/biçim/kalite ayarlarının özeti; ayarlar değişince türevler yeni dizine yeniden üretilir
+CONFIG_KEY = hashlib.blake2b(repr((WIDTHS, FORMATS, sorted(QUALITY.items()))).encode(), digest_size=4).hexdigest()
+
+# model etiketi -> {görsel alanı: türev manifest alanı}
+_tracked = {}
+
+
+def available_formats():
+    # Pillow AVIF/WebP desteği olmadan derlenmiş olabilir; desteklenmeyen biçim atlanır
+    return [fmt for fmt in FORMATS if fmt == 'jpeg' or features.check(fmt)]
+
+
+def target_widths(width):
+    """Yapılandırılmış genişlikler; görsel hiç büyütülmez, en büyük boyut orijinal genişlikle sınırlanır."""
+    widths = [w for w in WIDTHS if w < width]
+    widths.append(min(width, WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _encode(image, fmt):
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        # JPEG saydamlık desteklemez; saydam alanlar beyaz zemine oturtulur
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=QUALITY[fmt], **SAVE_OPTIONS.get(fmt, {}))
+    return buffer.getvalue()
+
+
+def build_derivatives(field_file):
+    """
+    Görselin tüm türevlerini üretir ve manifest'i döndürür. Türevler içerik özetiyle anahtarlanan
+    `derivatives/<blake2b>/<ayar özeti>/` dizinine yazılır; aynı içerik (tekrar yüklenen görsel, yeniden denenen
+    iş) için manifest diskte varsa hiçbir şey yeniden kodlanmaz. Manifest en son yazılır, yarım
+    kalan üretim tekrar başlar.
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    base = f'{DERIVATIVE_DIR}/{digest[:2]}/{digest}/{CONFIG_KEY}'
+    manifest_path = f'{base}/manifest.json'
+    if storage.exists(manifest_path):
+        with storage.open(manifest_path, 'rb') as f:
+            return json.load(f)
+
+    with Image.open(io.BytesIO(data)) as source:
+        # EXIF'e göre 90° döndürülecek görselde genişlik kaynağın yüksekliğidir
+        rotated = source.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8)
+        width, height = reversed(source.size) if rotated else source.size
+        # JPEG, en büyük hedef genişliği karşılayan en küçük DCT ölçeğinde çözülür (büyük kaynakta birkaç kat hızlı)
+        scale = min(WIDTHS[-1], width) / width
+        draft = (round(height * scale), round(width * scale)) if rotated else (round(width * scale), round(height * scale))
+        source.draft('RGB', draft)
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+        formats = {fmt: {} for fmt in available_formats()}
+        # Büyükten küçüğe: her boyut bir öncekinden küçültülür, biçimler aynı küçültmeyi paylaşır
+        for size in sorted(target_widths(image.width), reverse=True):
+            if size != image.width:
+                image = image.resize(
+                    (size, max(round(image.height * size / image.width), 1)),
+                    Image.Resampling.LANCZOS, reducing_gap=3.0,
+                )
+            for fmt, sizes in formats.items():
+                path = f'{base}/{size}.{fmt}'
+                if storage.exists(path):
+                    storage.delete(path)
+                sizes[str(size)] = storage.save(path, ContentFile(_encode(image, fmt)))
+
+    manifest = {
+        'hash': digest, 'config': CONFIG_KEY, 'width': width, 'height': height,
+        'formats': {fmt: dict(reversed(sizes.items())) for fmt, sizes in formats.items()},
+    }
+    if storage.exists(manifest_path):
+        storage.delete(manifest_path)
+    storage.save(manifest_path, ContentFile(json.dumps(manifest).encode()))
+    return manifest
+
+
+@task('images.generate_derivatives')
+def generate_derivatives(model, pk, field, source):
+    model_class = apps.get_model(model)
+    target = _tracked[model_class._meta.label_lower][field]
+    instance = model_class._default_manager.filter(pk=pk).first()
+    if instance is None or getattr(instance, field).name != source:
+        return  # kayıt silinmiş ya da görsel değişmiş; yeni görselin işi ayrıca kuyrukta
+    manifest = build_derivatives(getattr(instance, field))
+    with transaction.atomic():
+        instance = model_class._default_manager.select_for_update().filter(pk=pk).first()
+        if instance is None or getattr(instance, field).name != source:
+            return
+        setattr(instance, target, dict(manifest, source=source))
+        # save() sinyalleri katalog cache'ini geçersiz kılar; yanıtlar türevlerle yeniden üretilir
+        instance.save(update_fields=[target])
+
+
+def enqueue_missing(model, field):
+    """Görseli olup türevi eksik/eskimiş kayıtlar için iş oluşturur (toplu içe aktarma sonrası geri doldurma)."""
+    target = _tracked[model._meta.label_lower][field]
+    count = 0
+    rows = model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+    for pk, name, manifest in rows.values_list('pk', field, target).iterator():
+        manifest = manifest or {}
+        if manifest.get('source') != name or manifest.get('config') != CONFIG_KEY:
+            generate_derivatives.enqueue(model=model._meta.label_lower, pk=pk, field=field, source=name)
+            count += 1
+    return count
+
+
+def tracked_fields():
+    return [
+        (apps.get_model(label), field)
+        for label, fields in _tracked.items() for field in fields
+    ]
+
+
+def track(model, field='image', target=None):
+    """
+    `field` görseli değiştiğinde türev üretimini kuyruğa alır; manifest `target` JSON alanına
+    (varsayılan `<field>_derivatives`) yazılır. App'lerin `ready()` metodundan çağrılır.
+    """
+    label = model._meta.label_lower
+    _tracked.setdefault(label, {})[field] = target or f'{field}_derivatives'
+    post_init.connect(_remember_sources, sender=model, dispatch_uid=f'images:init:{label}')
+    post_save.connect(_schedule_derivatives, sender=model, dispatch_uid=f'images:save:{label}')
+
+
+def _file_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def _remember_sources(sender, instance, **kwargs):
+    # __dict__ okunur: ertelenmiş (.only ile yüklenmemiş) alana erişip sorgu tetiklememek için
+    instance._image_sources = {
+        field: _file_name(instance.__dict__[field])
+        for field in _tracked[sender._meta.label_lower] if field in instance.__dict__
+    }
+
+
+def _schedule_derivatives(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    label = sender._meta.label_lower
+    sources = getattr(instance, '_image_sources', {})
+    for field, target in _tracked[label].items():
+        if update_fields is not None and field not in update_fields:
+            continue
+        name = _file_name(getattr(instance, field))
+        if created:
+            changed = bool(name)
+        elif field in sources:
+            changed = sources[field] != name
+        else:
+            changed = (getattr(instance, target) or {}).get('source') != name
+        if not changed:
+            continue
+        sources[field] = name
+        # Eski görselin türevleri artık geçersiz; yenileri üretilene kadar alan boş döner
+        if not created:
+            sender._default_manager.filter(pk=instance.pk).update(**{target: {}})
+            setattr(instance, target, {})
+        if name:
+            generate_derivatives.enqueue(model=label, pk=instance.pk, field=field, source=name)
+    instance._image_sources = sources
+
+
+class SrcsetField(serializers.Field):
+    """
+    Türev manifest'ini biçim başına `srcset` dizesine çevirir:
+    `{"avif": "<url> 160w, <url> 320w", "webp": ..., "jpeg": ...}`. Türevler henüz üretilmediyse `null`.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, manifest):
+        if not manifest or not manifest.get('formats'):
+            return None
+        request = self.context.get('request')
+        srcset = {}
+        for fmt, sizes in manifest['formats'].items():
+            urls = []
+            for width, path in sizes.items():
+                url = default_storage.url(path)
+                urls.append(f'{request.build_absolute_uri(url) if request else url} {width}w')
+            srcset[fmt] = ', '.join(urls)
+        return srcset
@@ -0,0 +1,80 @@
+from email.utils import parseaddr
+
+import requests
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+MAILJET_SEND_URL = 'https://api.mailjet.com/v3.1/send'
+MAILJET_BATCH_LIMIT = 50  # v3.1 /send tek istekte en fazla 50 mesaj kabul eder
+
+
+def _address(value):
+    name, email = parseaddr(value)
+    return {'Email': email, 'Name': name} if name else {'Email': email}
+
+
+class MailjetEmailBackend(BaseEmailBackend):
+    """
+    Mailjet v3.1 HTTP API e-posta backend'i. `send_messages` mesajları 50'lik partiler halinde
+    tek istekle gönderir; bağlantı (requests.Session) `open`/`close` arasında yeniden kullanılır.
+    """
+
+    def __init__(self, api_key=None, secret_key=None, timeout=None, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently, **kwargs)
+        self.api_key = api_key or settings.MAILJET_API_KEY
+        self.secret_key = secret_key or settings.MAILJET_SECRET_KEY
+        self.timeout = timeout or getattr(settings, 'EMAIL_TIMEOUT', None) or 10
+        self.session = None
+
+    def open(self):
+        if self.session is not None:
+            return False
+        self.session = requests.Session()
+        self.session.auth = (self.api_key, self.secret_key)
+        return True
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        created = self.open()
+        sent = 0
+        try:
+            for start in range(0, len(email_messages), MAILJET_BATCH_LIMIT):
+                batch = email_messages[start:start + MAILJET_BATCH_LIMIT]
+                try:
+                    response = self.session.post(
+                        MAILJET_SEND_URL,
+                        json={'Messages': [self._payload(message) for message in batch]},
+                        timeout=self.timeout,
+                    )
+                    response.raise_for_status()
+                except requests.RequestException:
+                    if not self.fail_silently:
+                        raise
+                    continue
+                sent += len(batch)
+        finally:
+            if created:
+                self.close()
+        return sent
+
+    def _payload(self, message):
+        payload = {
+            'From': _address(message.from_email),
+            'To': [_address(address) for address in message.to],
+            'Subject': message.subject,
+            'TextPart': message.body,
+        }
+        if message.cc:
+            payload['Cc'] = [_address(address) for address in message.cc]
+        if message.bcc:
+            payload['Bcc'] = [_address(address) for address in message.bcc]
+        for content, mimetype in getattr(message, 'alternatives', []):
+            if mimetype == 'text/html':
+                payload['HTMLPart'] = content
+        return payload
@@ -0,0 +1,163 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.urls import path as url_path
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+
+YEAR = 365 * 24 * 60 * 60
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangedFile:
+    """
+    Dosyanın [start, start+length) aralığını okuyan sarmalayıcı. `fileno()` gerçek dosyayı verdiği
+    için WSGI sunucusunun `wsgi.file_wrapper`'ı (gunicorn) Content-Length kadar sendfile yapar;
+    sendfile olmayan sunucularda `read()` aralık dışına taşmaz. (__slots__ yok: WSGIHandler
+    `close` özniteliğini değiştirir.)
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def tell(self):
+        return self.file.tell()
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def is_immutable(path):
+    """İçerik özetli yollar (örn. görsel türevleri) hiç değişmez; bir yıl boyunca yeniden doğrulanmadan cache'lenir."""
+    return path.startswith(tuple(getattr(settings, 'MEDIA_IMMUTABLE_PREFIXES', ('derivatives/',))))
+
+
+def file_etag(st):
+    # Güçlü ETag: boyut + nanosaniye mtime (nginx'in ETag'i ile aynı yaklaşım)
+    return quote_etag(f'{st.st_size:x}-{st.st_mtime_ns:x}')
+
+
+def parse_range(header, size):
+    """
+    Tek aralıklı `Range: bytes=...` başlığını (start, length) olarak döndürür. Başlık yoksa ya da
+    çoklu aralıksa None (tam yanıt), karşılanamazsa ValueError.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # bytes=-N: son N bayt
+        length = min(int(last), size)
+        if length == 0:
+            raise ValueError(header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and int(mtime) <= since
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    MEDIA_ROOT altındaki dosyayı sunar. ETag/Last-Modified ile koşullu istek (304), tek aralıklı
+    Range (206/416) ve Cache-Control Django'da belirlenir; gövdeyi MEDIA_ACCEL ayarına göre
+    nginx (`X-Accel-Redirect`), Apache (`X-Sendfile`) ya da sendfile'lı FileResponse gönderir.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except (OSError, SuspiciousFileOperation) as exc:  # ../ ile MEDIA_ROOT dışına çıkma girişimi
+        raise Http404('Dosya bulunamadı.') from exc
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('Dosya bulunamadı.')
+
+    etag = file_etag(st)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (
+            f'public, max-age={YEAR}, immutable' if is_immutable(path)
+            else f"public, max-age={getattr(settings, 'MEDIA_CACHE_SECONDS', 86400)}"
+        ),
+    }
+    if _not_modified(request, etag, st.st_mtime):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    accel = getattr(settings, 'MEDIA_ACCEL', '')
+    if accel:
+        # Aralık ve gövde web sunucusunda işlenir; başlıklar yanıta aynen eklenir
+        response = HttpResponse(content_type=content_type, headers=headers)
+        if accel == 'nginx':
+            response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/_media/') + quote(path)
+        else:
+            response['X-Sendfile'] = full_path
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['Content-Length'] = st.st_size
+        return response
+
+    byte_range = None
+    if request.headers.get('If-Range', etag) in (etag, headers['Last-Modified']):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), st.st_size)
+        except ValueError:
+            return HttpResponse(status=416, headers={'Content-Range': f'bytes */{st.st_size}'})
+    start, length = byte_range or (0, st.st_size)
+    response = FileResponse(
+        RangedFile(open(full_path, 'rb'), start, length),
+        status=206 if byte_range else 200, content_type=content_type, headers=headers,
+    )
+    response.block_size = 64 * 1024  # sendfile olmayan sunucularda okuma parçası
+    response['Content-Length'] = length
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{start + length - 1}/{st.st_size}'
+    return response
+
+
+def media_urlpatterns():
+    """MEDIA_URL altındaki yollar; MEDIA_SERVE kapalıysa (medya doğrudan web sunucusundan) boş."""
+    if not getattr(settings, 'MEDIA_SERVE', True):
+        return []
+    return [url_path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name='media')]
@@ -0,0 +1,317 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+# Prometheus histogram sınırları (saniye / sorgu adedi)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Etiket kümesi sınırlı kalsın: istemcinin gönderdiği diğer metodlar `other` olarak sayılır
+KNOWN_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'window')
+
+    def __init__(self, bounds, window):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # son eleman +Inf
+        self.total = 0
+        self.window = deque(maxlen=window)  # yüzdelikler için son N gözlem
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.window.append(value)
+
+    def quantiles(self):
+        ordered = sorted(self.window)
+        if not ordered:
+            return {}
+        return {q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] for q in QUANTILES}
+
+
+class EndpointStats:
+    __slots__ = ('duration', 'db_duration', 'queries', 'statuses')
+
+    def __init__(self, window):
+        self.duration = Histogram(DURATION_BUCKETS, window)
+        self.db_duration = Histogram(DURATION_BUCKETS, window)
+        self.queries = Histogram(QUERY_BUCKETS, window)
+        self.statuses = Counter()
+
+
+class Registry:
+    """
+    Süreç içi metrik deposu. Her worker süreci kendi değerlerini tutar; Prometheus her
+    worker'ı ayrı hedef olarak kazımalı ya da toplamalıdır.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Kazıma anında çağrılıp Prometheus satırları döndüren ek metrik kaynağı (örn. users.revocation)."""
+        self._collectors.append(collector)
+
+    def record(self, endpoint, method, status, duration, db_duration, queries):
+        key = (endpoint, method if method in KNOWN_METHODS else 'other')
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats(self.window)
+            stats.duration.observe(duration)
+            stats.db_duration.observe(db_duration)
+            stats.queries.observe(queries)
+            stats.statuses[status] += 1
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self):
+        """Prometheus metin formatı (0.0.4)."""
+        with self._lock:
+            snapshot = sorted(self._endpoints.items())
+            lines = []
+            self._render_histogram(lines, snapshot, 'http_request_duration_seconds', 'duration',
+                                   'İstek süresi (saniye)')
+            self._render_histogram(lines, snapshot, 'http_request_db_duration_seconds', 'db_duration',
+                                   'İstek başına toplam DB sorgu süresi (saniye)')
+            self._render_histogram(lines, snapshot, 'http_request_db_queries', 'queries',
+                                   'İstek başına DB sorgu sayısı')
+            lines.append('# HELP http_responses_total Durum koduna göre yanıt sayısı')
+            lines.append('# TYPE http_responses_total counter')
+            for (endpoint, method), stats in snapshot:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_responses_total{{{_labels(endpoint, method)},status="{status}"}} {count}')
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, lines, snapshot, name, attr, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (endpoint, method), stats in snapshot:
+            render_histogram(lines, name, getattr(stats, attr), _labels(endpoint, method))
+        # Kayan penceredeki (son N istek) yüzdelikler; histogram birikimli, bu anlık görünüm
+        lines.append(f'# HELP {name}_window Son {self.window} istekte yüzdelik değerler')
+        lines.append(f'# TYPE {name}_window gauge')
+        for (endpoint, method), stats in snapshot:
+            labels = _labels(endpoint, method)
+            for quantile, value in getattr(stats, attr).quantiles().items():
+                lines.append(f'{name}_window{{{labels},quantile="{quantile}"}} {value:g}')
+
+
+def render_histogram(lines, name, histogram, labels=''):
+    """Tek bir histogramın _bucket/_sum/_count satırları."""
+    prefix = f'{labels},' if labels else ''
+    cumulative = 0
+    for bound, count in zip(histogram.bounds + ('+Inf',), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {histogram.total:.6f}')
+    lines.append(f'{name}_count{suffix} {cumulative}')
+
+
+def _labels(endpoint, method):
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return f'endpoint="{endpoint}",method="{method}"'
+
+
+registry = Registry(getattr(settings, 'METRICS_WINDOW', 1024))
+
+
+class QueryTimer:
+    """İstek boyunca sorgu sayısı ve toplam süresi (bkz. `_dispatch`)."""
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+# Aktif isteğin sayacı. ContextVar, sync_to_async ile açılan worker thread'lerine de taşınır;
+# böylece async view'ların başka thread'lerdeki bağlantılarda çalıştırdığı sorgular da sayılır.
+_current_timer = ContextVar('query_timer', default=None)
+
+
+def _dispatch(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def _install(connection):
+    # Başa eklenir: execute_wrapper() bloğu sondaki elemanı çıkardığı için sıra bozulmamalı
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _dispatch)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    _install(connection)
+
+
+class SlowRequestProfiler:
+    """
+    Eşik süresini aşan isteklerin yığınını örnekleyen tek arka plan thread'i.
+
+    Hızlı isteklerin maliyeti sadece bir sözlük ekle/sil işlemidir. Eşiği geçen isteklerin
+    thread yığını `interval` aralıkla `sys._current_frames()` ile örneklenir; istek bitince
+    katlanmış yığınlar (flamegraph.pl / speedscope formatı) `directory` altına yazılır.
+    """
+
+    def __init__(self, threshold, directory, interval=0.005):
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+                    self._thread.start()
+        self._active[thread_id] = (time.perf_counter(), Counter())
+
+    def finish(self, thread_id, endpoint, duration):
+        _, samples = self._active.pop(thread_id, (None, None))
+        if samples and duration >= self.threshold:
+            self._dump(endpoint, duration, samples)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            deadline = time.perf_counter() - self.threshold
+            frames = None
+            for thread_id, (started, samples) in list(self._active.items()):
+                if started > deadline:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[_collapse(frame)] += 1
+
+    def _dump(self, endpoint, duration, samples):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{endpoint}-{int(time.time() * 1000)}-{int(duration * 1000)}ms.folded')
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class InstrumentationMiddleware:
+    """
+    Çözümlenen URL adı (örn. `order-create`, `product-list`) bazında istek süresi, DB sorgu
+    sayısı ve DB süresini ölçer; değerler `/api/_metrics` üzerinden okunur.
+    `METRICS_SLOW_REQUEST_MS` verilirse o süreyi aşan isteklerin örneklenmiş yığını
+    `METRICS_PROFILE_DIR` altına yazılır (yalnızca senkron isteklerde; async istekler tek
+    thread'e bağlı olmadığından örneklenmez).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        slow_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', None)
+        self.profiler = SlowRequestProfiler(
+            slow_ms / 1000, getattr(settings, 'METRICS_PROFILE_DIR', 'profiles'),
+        ) if slow_ms else None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        for connection in connections.all():
+            _install(connection)
+        timer = QueryTimer()
+        token = _current_timer.set(timer)
+        thread_id = threading.get_ident()
+        if self.profiler:
+            self.profiler.start(thread_id)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        duration = time.perf_counter() - start
+
+        endpoint = self.record(request, response, duration, timer)
+        if self.profiler:
+            self.profiler.finish(thread_id, endpoint, duration)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        token = _current_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self.record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    def record(self, request, response, duration, timer):
+        match = request.resolver_match
+        endpoint = (match.url_name or match.view_name) if match else 'unresolved'
+        registry.record(endpoint, request.method, response.status_code, duration, timer.duration, timer.count)
+        return endpoint
+
+
+class MetricsView(APIView):
+    """Prometheus kazıma endpoint'i (yalnızca yönetici)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
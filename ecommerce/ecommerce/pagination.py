@@ -0,0 +1,233 @@
+import base64
+import datetime
+import decimal
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder mikrosaniyeyi milisaniyeye kırpar; keyset eşitliği için tam değer gerekir
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} cursor değerine çevrilemez')
+
+
+# Sayfalanan son queryset'leri dinlemek için (örn. advise_indexes komutu); normalde None
+_recorded_querysets = ContextVar('recorded_querysets', default=None)
+
+
+@contextmanager
+def record_page_querysets():
+    """Blok içinde sayfalanan queryset'leri (sıralama ve LIMIT uygulanmış hâliyle) toplar."""
+    recorded = []
+    token = _recorded_querysets.set(recorded)
+    try:
+        yield recorded
+    finally:
+        _recorded_querysets.reset(token)
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Opak cursor ile keyset (seek) sayfalama.
+
+    Sıralama alanlarına her zaman birincil anahtar eklenir, örn. (-created_at, -id);
+    sonraki sayfa `OFFSET` yerine son satırın değerlerinden devam eder, böylece bir
+    sayfanın maliyeti derinliğinden bağımsızdır. Sıralama alanları NULL olmamalı ve
+    (alan, id) bileşik indeksine sahip olmalıdır.
+
+    Geriye dönük uyumluluk için `cursor` veya `page_size` parametresi gelmezse liste
+    sayfalanmadan döner; `always_paginate = True` bunu kapatır.
+    """
+    page_size = api_settings.PAGE_SIZE or 24
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at',)
+    always_paginate = False
+    invalid_cursor_message = 'Geçersiz cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.prepare_page(queryset, request, view)
+        if page is None:
+            return None
+        return self.finish_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async view'lar için: sayfa sorgusu async ORM ile çalıştırılır."""
+        page = self.prepare_page(queryset, request, view)
+        if page is None:
+            return None
+        return self.finish_page([row async for row in page])
+
+    def prepare_page(self, queryset, request, view=None):
+        """Sıralama, seek koşulu ve LIMIT uygulanmış (henüz çalıştırılmamış) sayfa sorgusu."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        if not self.always_paginate and not (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        ):
+            return None
+
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = bool(self.cursor and self.cursor.get('r'))
+
+        queryset = queryset.order_by(*(self._invert(self.ordering) if self.reverse else self.ordering))
+        if self.cursor:
+            queryset = queryset.filter(self._seek_filter(self.cursor['v'], self.reverse))
+
+        page = queryset[:self.page_size + 1]
+        recorded = _recorded_querysets.get()
+        if recorded is not None:
+            recorded.append(page)
+        return page
+
+    def finish_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = self.cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Öncelik: queryset'in açık order_by'ı (OrderingFilter'ın ?ordering= sonucu dahil) >
+        view.ordering > sınıf varsayılanı. Sonuna aynı yönde `pk` eklenir.
+        """
+        ordering = [f for f in queryset.query.order_by if isinstance(f, str)]
+        if not ordering:
+            ordering = getattr(view, 'ordering', None)
+        if not ordering:
+            field_names = {f.name for f in queryset.model._meta.concrete_fields}
+            ordering = self.ordering if self.ordering[0].lstrip('-') in field_names else ('-pk',)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        ordering = [f for f in ordering if f.lstrip('-') not in ('pk', 'id')]
+        # Eşitlikleri id ile çöz; ilk alanla aynı yön, (alan, id) indeksinin ters taranabilmesi için
+        tiebreaker = '-pk' if ordering and ordering[0].startswith('-') else 'pk'
+        return [*ordering, tiebreaker]
+
+    def decode_cursor(self, request, model):
+        """
+        Cursor'ı çözer ve değerlerini sıralama alanlarının tiplerine çevirir (seek filtresi doğrudan
+        bunları kullanır). Bozuk ya da elle değiştirilmiş cursor 404 döner.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = cursor['v']
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            cursor['v'] = [
+                self._field_value(model, field.lstrip('-'), value) for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, ArithmeticError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    @staticmethod
+    def _field_value(model, name, value):
+        *relations, name = name.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        value = field.to_python(value)
+        if value is None:  # sıralama alanları NULL olamaz (bkz. sınıf açıklaması)
+            raise ValueError
+        return value
+
+    def encode_cursor(self, row, reverse=False):
+        values = [attrgetter(f.lstrip('-').replace('__', '.'))(row) for f in self.ordering]
+        payload = {'v': values}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, default=_cursor_value, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        url = replace_query_param(self.base_url, self.cursor_query_param, encoded)
+        return replace_query_param(url, self.page_size_query_param, self.page_size)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.encode_cursor(self.last_row)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_row, reverse=True)
+
+    def _seek_filter(self, values, reverse):
+        """(a, b, id) > (x, y, z) koşulunu alan yönlerine göre OR/AND zinciri olarak kurar."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def _invert(ordering):
+        return [f[1:] if f.startswith('-') else f'-{f}' for f in ordering]
+
+
+class RequiredCursorPagination(KeysetCursorPagination):
+    """Parametre gelmese de her zaman sayfalar (büyük, yalnızca yönetici listeleri için)."""
+    always_paginate = True
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField, SlugRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+# Seçili alanlarca okunmuyorsa ertelenen (SELECT'e girmeyen) büyük sütun tipleri
+HEAVY_FIELDS = (models.TextField, models.JSONField, models.BinaryField)
+
+
+def split_fieldset(fieldset):
+    """
+    `('id', 'items.quantity')` biçimindeki alan kümesini üst seviye ad -> alt küme sözlüğüne
+    çevirir (alt küme None ise iç içe serializer'ın tüm alanları). fieldset None ise None.
+    """
+    if fieldset is None:
+        return None
+    selection = {}
+    for path in fieldset:
+        name, _, rest = path.partition('.')
+        if not rest:
+            selection[name] = None
+        elif name not in selection or selection[name] is not None:
+            selection[name] = selection.get(name, ()) + (rest,)
+    return selection
+
+
+def _single_relation_path(model, source):
+    """`product.brand.name` gibi bir source'un select_related edilebilir ilişki önekini döndürür."""
+    path = []
+    for part in source.split('.'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not (field.is_relation and (field.many_to_one or field.one_to_one)):
+            break
+        path.append(part)
+        model = field.related_model
+    return '__'.join(path)
+
+
+def _columns(model, field, declared):
+    """
+    Alanın okuduğu sütun yolları (örn. `brand__name`, tüm satır için `address__*`); alan bir
+    model özelliği/metodu okuyorsa ve `Meta.field_sources`'ta bildirilmemişse None.
+    """
+    if field.field_name in declared:
+        return list(declared[field.field_name])
+    if field.source == '*':
+        return None
+    path = []
+    for part in field.source_attrs:
+        try:
+            model_field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        path.append(part)
+        if not model_field.is_relation:
+            return ['__'.join(path)]
+        if not (model_field.many_to_one or model_field.one_to_one):
+            return []  # çoklu ilişki: prefetch kendi sorgusunu kurar
+        model = model_field.related_model
+    lookup = '__'.join(path)
+    if isinstance(field, SlugRelatedField):
+        return [f"{lookup}__{field.slug_field.replace('.', '__')}"]
+    if isinstance(field, PrimaryKeyRelatedField) or isinstance(field, BaseSerializer):
+        return [lookup]  # iç içe serializer'ın sütunlarını kendi planı belirler
+    if isinstance(field, RelatedField):
+        return [f'{lookup}__*']  # StringRelatedField vb.: __str__ herhangi bir sütunu okuyabilir
+    return [lookup]
+
+
+def _deferred_columns(model, needed):
+    """İhtiyaç bilinen her model için okunmayan büyük sütunlar (`defer()` argümanları)."""
+    columns = []
+    for prefix, names in needed.items():
+        if '*' in names:
+            continue
+        target = model
+        for part in filter(None, prefix.split('__')):
+            target = target._meta.get_field(part).related_model
+        columns.extend(
+            f'{prefix}__{f.name}' if prefix else f.name
+            for f in target._meta.concrete_fields
+            if isinstance(f, HEAVY_FIELDS) and f.name not in names
+        )
+    return columns
+
+
+@lru_cache(maxsize=1024)
+def get_prefetch_plan(serializer_class, fieldset=None):
+    """
+    Serializer'ın ihtiyaç duyduğu ilişkileri (select_related, prefetch_related) çıkarır.
+
+    İlişkili alanlar (`source='product.name'`, SlugRelatedField, StringRelatedField) ve iç içe
+    serializer'lar otomatik bulunur: tekil ilişkiler select_related'a, `many=True` olanlar alt
+    serializer'ın kendi planıyla kurulan bir Prefetch'e dönüşür. Otomatik bulunamayanlar
+    (örn. __str__ içinde erişilen `user`) `Meta.select_related` / `Meta.prefetch_related` ile
+    bildirilir.
+
+    `fieldset` (bkz. ecommerce/fieldsets.py) verilirse yalnızca seçili alanların ilişkileri
+    kurulur ve seçili alanların okumadığı TextField/JSONField sütunları `defer` listesine girer.
+    Sütunu çıkarılamayan alanlar (model özellikleri) `Meta.field_sources` ile bildirilir; hiç
+    bildirilmeyen bir alan seçiliyse o modelde hiçbir sütun ertelenmez.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    select = list(getattr(meta, 'select_related', ()))
+    prefetch = list(getattr(meta, 'prefetch_related', ()))
+    declared = getattr(meta, 'field_sources', {})
+    selection = split_fieldset(fieldset)
+    needed = defaultdict(set)
+    defer = []
+
+    fields = serializer_class().fields
+    if selection is not None:
+        # Meta'da bildirilen ilişkilerden yalnızca seçili alanların yolundakiler kalır
+        roots = {fields[name].source_attrs[0] for name in selection if fields[name].source != '*'}
+        select = [lookup for lookup in select if lookup.split('__')[0] in roots]
+        prefetch = [lookup for lookup in prefetch if lookup.split('__')[0] in roots]
+
+    for name, field in fields.items():
+        if field.write_only or (selection is not None and name not in selection):
+            continue
+        sub_fieldset = selection.get(name) if selection is not None else None
+        if selection is not None and sub_fieldset is None and isinstance(field, BaseSerializer):
+            # İç içe serializer'ın tamamı seçildiyse de sütunları daraltılabilir
+            child = field.child if isinstance(field, ListSerializer) else field
+            sub_fieldset = tuple(n for n, f in child.fields.items() if not f.write_only)
+        if selection is not None and model is not None:
+            columns = _columns(model, field, declared)
+            for column in (['*'] if columns is None else columns):
+                prefix, _, column_name = column.rpartition('__')
+                needed[prefix].add(column_name)
+        if field.source == '*':
+            continue
+        if isinstance(field, ListSerializer):
+            # (lookup, alt serializer, alt alan kümesi); Prefetch her istekte yeniden kurulur
+            prefetch.append((field.source.replace('.', '__'), type(field.child), sub_fieldset))
+            continue
+        if model is None:
+            continue
+        lookup = _single_relation_path(model, field.source)
+        if not lookup:
+            if isinstance(field, ManyRelatedField):
+                prefetch.append(field.source.replace('.', '__'))
+            continue
+        if isinstance(field, PrimaryKeyRelatedField) and lookup == field.source:
+            continue  # sadece <alan>_id okunur, JOIN gerekmez
+        select.append(lookup)
+        if isinstance(field, BaseSerializer):
+            child_select, child_prefetch, child_defer = get_prefetch_plan(type(field), sub_fieldset)
+            select.extend(f'{lookup}__{related}' for related in child_select)
+            prefetch.extend(f'{lookup}__{related}' for related in child_prefetch if isinstance(related, str))
+            defer.extend(f'{lookup}__{column}' for column in child_defer)
+
+    if selection is not None and model is not None:
+        defer.extend(_deferred_columns(model, needed))
+    return tuple(dict.fromkeys(select)), tuple(prefetch), tuple(defer)
+
+
+def apply_prefetch_plan(queryset, serializer_class, fieldset=None):
+    """Serializer'ın (varsa yalnızca `fieldset` alanlarının) planını queryset'e uygular."""
+    select, prefetch, defer = get_prefetch_plan(serializer_class, fieldset)
+    if select:
+        queryset = queryset.select_related(*select)
+    if defer:
+        queryset = queryset.defer(*defer)
+    for item in prefetch:
+        if isinstance(item, tuple):
+            lookup, child, child_fieldset = item
+            child_model = child.Meta.model
+            item = Prefetch(lookup, queryset=apply_prefetch_plan(
+                child_model._default_manager.all(), child, child_fieldset,
+            ))
+        queryset = queryset.prefetch_related(item)
+    return queryset
+
+
+class PrefetchPlanMixin:
+    """get_queryset sonucuna serializer'ın prefetch planını uygular (N+1 sorgularını önler)."""
+
+    def get_queryset(self):
+        return apply_prefetch_plan(super().get_queryset(), self.get_serializer_class(), self.get_fieldset())
+
+    def get_fieldset(self):
+        return None  # bkz. ecommerce.fieldsets.SparseFieldsetMixin
@@ -0,0 +1,49 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# orjson'ın doğrudan desteklemediği tipler (Decimal, lazy string, UUID, QuerySet...) DRF
+# encoder'ına düşer; datetime/date/time da oraya bırakılır ki çıktı JSONRenderer ile aynı olsun
+# (milisaniye hassasiyeti, UTC için "Z").
+_default = encoders.JSONEncoder().default
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer'ın orjson ile çalışan karşılığı; çıktı bayt bayt aynıdır (kompakt, UTF-8).
+    orjson'ın karşılayamadığı durumlarda (girintili çıktı, 64 bit'i aşan tamsayı, ensure_ascii)
+    DRF'in kendi render'ına dönülür; browsable API'nin `indent=4` çıktısı da bu yoldan gelir.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer gibi U+2028/U+2029 kaçışlanır (JSON'u JavaScript alt kümesi tutar)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """İstek gövdesini orjson ile çözer; UTF-8 dışı karakter kümelerinde JSONParser'a döner."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
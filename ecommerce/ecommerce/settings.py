@@ -54,10 +54,15 @@ INSTALLED_APPS = [
     'products',
     'cart',
     'orders',
+    'jobs',
     'django_extensions',
 ]
 
 MIDDLEWARE = [
+    # En dışta: tüm middleware zinciri dahil süre ve DB sorgularını ölçer (bkz. /api/_metrics)
+    'ecommerce.metrics.InstrumentationMiddleware',
+    # Accept-Encoding'e göre zstd/br/gzip (bkz. ecommerce/compression.py); süresi metriklere dahil
+    'ecommerce.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,7 +73,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'ecommerce.urls'
+# Endpoint metrikleri: son METRICS_WINDOW istekte yüzdelikler; METRICS_SLOW_REQUEST_MS verilirse
+# bu süreyi aşan isteklerin örneklenmiş yığını METRICS_PROFILE_DIR altına yazılır
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_WINDOW = 1024
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', 0)) or None
+METRICS_PROFILE_DIR = os.getenv('METRICS_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+# asgi.py bunu `ecommerce.asgi_urls` yapar; böylece katalog okumaları ASGI altında async view'lardan sunulur
+ROOT_URLCONF = os.getenv('DJANGO_ROOT_URLCONF', 'ecommerce.urls')
 
 TEMPLATES = [
     {
@@ -99,13 +112,101 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # ASGI'de eşzamanlı sorgular (ecommerce/aio.py) havuz thread'lerinin bağlantılarını yeniden kullanır
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
+# Cache
+# REDIS_URL verilirse katalog yanıt cache'i Redis'te (süreçler arası paylaşımlı), aksi halde
+# süreç içi bellekte tutulur. Girdiler TTL ile değil model sürüm etiketleriyle geçersiz olur.
+REDIS_URL = os.getenv('REDIS_URL')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'TIMEOUT': None,
+        'KEY_PREFIX': 'ecommerce',
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+CATALOG_CACHE_ALIAS = 'catalog'
+
+# Katalog yanıtlarının HTTP önbellek başlıkları (products/cache.py): tarayıcı her seferinde ETag ile
+# doğrular (304), CDN Surrogate-Key ile purge edilene kadar CATALOG_CDN_MAX_AGE saniye saklar
+CATALOG_BROWSER_MAX_AGE = 0
+CATALOG_CDN_MAX_AGE = 86400
+# Purge arka ucu (ecommerce/cdn.py): Fastly anahtarları varsa Fastly, yoksa süreç içi LocalPurger
+FASTLY_API_TOKEN = os.getenv('FASTLY_API_TOKEN', '')
+FASTLY_SERVICE_ID = os.getenv('FASTLY_SERVICE_ID', '')
+CDN_PURGER = 'ecommerce.cdn.FastlyPurger' if FASTLY_API_TOKEN else 'ecommerce.cdn.LocalPurger'
+# filter_options (products/facets.py): filtresiz sayılar ürün yazımından en geç bu kadar saniye sonra
+# iş kuyruğunda yeniden hesaplanır (0: yazımın ardından hemen); fiyat histogramının yaklaşık dilim sayısı
+CATALOG_FACETS_MAX_AGE = int(os.getenv('CATALOG_FACETS_MAX_AGE', '60'))
+CATALOG_FACETS_PRICE_BUCKETS = 10
+# Sayfalı ürün listesi için süreç içi katalog indeksi (products/index.py); kapalıyken liste ORM ile çözülür.
+# Tahmini bellek sınırı aşılırsa indeks kendini kapatır
+CATALOG_INDEX_ENABLED = os.getenv('CATALOG_INDEX_ENABLED', 'False') == 'True'
+CATALOG_INDEX_MAX_BYTES = int(os.getenv('CATALOG_INDEX_MAX_BYTES', 64 * 1024 * 1024))
+
+# JWT ile doğrulanan kullanıcının anlık görüntüsü: süreç içi LRU (AUTH_USER_CACHE_LOCAL_TTL sn) + paylaşılan cache
+AUTH_USER_CACHE_ALIAS = 'catalog'
+AUTH_USER_CACHE_SIZE = 2048
+AUTH_USER_CACHE_LOCAL_TTL = 5
+AUTH_USER_CACHE_TTL = 300
+
+# E-posta: Mailjet anahtarları varsa HTTP API, yoksa konsol. Gönderim istekte değil iş kuyruğunda yapılır
+MAILJET_API_KEY = os.getenv('MAILJET_API_KEY')
+MAILJET_SECRET_KEY = os.getenv('MAILJET_SECRET_KEY')
+if MAILJET_API_KEY == 'dkmsakdsmkadkmsakmd':  # .env'deki yer tutucu değer
+    MAILJET_API_KEY = None
+DEFAULT_FROM_EMAIL = f"{os.getenv('MAILJET_FROM_NAME', 'Sampa E-comm')} <{os.getenv('MAILJET_FROM_EMAIL', 'no-reply@example.com')}>"
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND') or (
+    'ecommerce.mail.MailjetEmailBackend' if MAILJET_API_KEY and MAILJET_SECRET_KEY
+    else 'django.core.mail.backends.console.EmailBackend'
+)
+EMAIL_TIMEOUT = 10
+
+# İş kuyruğu (jobs): hata alan iş JOB_RETRY_BASE_SECONDS * 2^(deneme-1) sonra (en çok JOB_RETRY_MAX_SECONDS)
+# yeniden denenir; JOB_LOCK_TIMEOUT'tan uzun süre kilitli kalan iş çökmüş worker'dan geri alınır
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_SECONDS = 30
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_LOCK_TIMEOUT = 300
+
+# Bekleyen siparişin stok rezervasyonu süresi (saniye); sonra release_expired_reservations iptal eder
+ORDER_RESERVATION_TTL = int(os.getenv('ORDER_RESERVATION_TTL', 15 * 60))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Şifre hash politikası: listenin ilk hasher'ı yeni hash'leri üretir, diğerleri eski hash'leri doğrular.
+# Politika ya da maliyet değişince eski hash'ler kullanıcının bir sonraki girişinde yeniden hash'lenir.
+# Argon2 varsayılanları OWASP önerisidir (19 MiB, t=2, p=1).
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'argon2')  # argon2 | pbkdf2
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 19 * 1024))  # KiB
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 1))
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_HASHERS = {
+    'argon2': ['users.hashers.TunedArgon2PasswordHasher', 'users.hashers.TunedPBKDF2PasswordHasher'],
+    'pbkdf2': ['users.hashers.TunedPBKDF2PasswordHasher', 'users.hashers.TunedArgon2PasswordHasher'],
+}[PASSWORD_HASHER] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -123,21 +224,50 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication + kullanıcı cache'i (bkz. users/authentication.py)
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
             'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    # Keyset cursor sayfalama; istemci ?cursor= / ?page_size= göndermezse liste sayfalanmaz
+    'DEFAULT_PAGINATION_CLASS': 'ecommerce.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 24,
+    # orjson tabanlı JSON (ecommerce/renderers.py); çıktı JSONRenderer ile aynı, browsable API korunur
+    'DEFAULT_RENDERER_CLASSES': (
+        'ecommerce.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'ecommerce.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# Yanıt sıkıştırma: istemcinin kabul ettikleri arasından bu sıradaki ilk kodlama seçilir;
+# COMPRESSION_MIN_SIZE bayttan küçük gövdeler sıkıştırılmaz (başlık maliyeti kazançtan büyük)
+COMPRESSION_ENCODINGS = ('zstd', 'br', 'gzip')
+COMPRESSION_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),    # varsayılan: kısa (örn. 5 veya 10 dk)
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.RevocableTokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'users.serializers.RevocableTokenBlacklistSerializer',
     # ...diğer ayarlarınız varsa koruyun...
 }
 
+# Refresh token kara listesinin süreç içi Bloom filtresi (users/revocation.py): her
+# REVOCATION_SYNC_SECONDS'ta yeni kayıtlar eklenir, REVOCATION_REBUILD_SECONDS'ta baştan kurulur
+REVOCATION_SYNC_SECONDS = 1
+REVOCATION_SYNC_OVERLAP = 60  # commit'i bu süreden geç görünen kayıt kaçabilir
+REVOCATION_REBUILD_SECONDS = 600
+REVOCATION_FILTER_ERROR_RATE = 0.001
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -156,7 +286,23 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_ROOT = os.getenv('DJANGO_MEDIA_ROOT') or BASE_DIR / 'media'
+
+# Medya sunumu (ecommerce/media.py). MEDIA_ACCEL: '' (geliştirme: Django sendfile'lı FileResponse ile sunar),
+# 'nginx' (X-Accel-Redirect; nginx'te MEDIA_ACCEL_PREFIX için `internal` location MEDIA_ROOT'a alias'lanır)
+# ya da 'apache' (mod_xsendfile, X-Sendfile). MEDIA_SERVE=False ise medya tamamen web sunucusundan sunulur.
+MEDIA_SERVE = os.getenv('MEDIA_SERVE', 'True') == 'True'
+MEDIA_ACCEL = os.getenv('MEDIA_ACCEL', '')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/_media/')
+MEDIA_CACHE_SECONDS = 86400
+# İçerik özetli yollar; bir yıllık `immutable` Cache-Control alır
+MEDIA_IMMUTABLE_PREFIXES = ('derivatives/',)
+
+# Görsel türevleri (ecommerce/images.py): yüklenen her görsel için bu genişliklerde ve biçimlerde
+# kopyalar iş kuyruğunda üretilir, MEDIA_ROOT/derivatives/ altında içerik özetiyle saklanır
+IMAGE_DERIVATIVE_WIDTHS = (160, 320, 640, 1280)
+IMAGE_DERIVATIVE_FORMATS = ('avif', 'webp', 'jpeg')
+IMAGE_DERIVATIVE_QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,25 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountMixin:
+    """
+    Endpoint'in sorgu sayısının satır sayısıyla büyümediğini doğrulayan test yardımcısı.
+
+    `grow(n)` çağrısı veriyi toplam n satıra tamamlar; her boyut için istek atılır ve
+    sorgu sayılarının hepsinin aynı olması beklenir.
+    """
+
+    def assertConstantQueries(self, url, grow, sizes=(1, 10, 50)):
+        counts = {}
+        for size in sizes:
+            grow(size)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts[size] = len(ctx.captured_queries)
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f'{url} sorgu sayısı satır sayısıyla değişiyor: {counts}',
+        )
+        return counts
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from products.cache import get_cache
+from products.models import Product
+from users.models import User
+from .metrics import InstrumentationMiddleware, Registry, registry
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        registry.reset()
+        self.client = APIClient()
+        self.product = Product.objects.create(name='Ürün', description='-', price=10, stock=5)
+
+    def test_requests_are_recorded_per_endpoint(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/products/products/')
+        executed = len(queries)  # sonraki istekler (request_started) sorgu günlüğünü sıfırlar
+        self.client.get('/api/products/products/')
+        self.client.get(f'/api/products/products/{self.product.pk}/')
+        self.client.get('/api/products/products/999999/')
+
+        listed = registry._endpoints[('product-list', 'GET')]
+        self.assertEqual(dict(listed.statuses), {200: 2})
+        self.assertEqual(list(listed.queries.window), [executed, executed])
+        self.assertGreater(listed.duration.total, listed.db_duration.total)
+        self.assertGreater(listed.db_duration.total, 0)
+        self.assertEqual(dict(registry._endpoints[('product-detail', 'GET')].statuses), {200: 1, 404: 1})
+
+    def test_unknown_methods_share_one_series(self):
+        for method in ('PROPFIND', 'BREW', 'X' * 100):
+            self.client.generic(method, '/api/products/products/')
+        self.client.options('/api/products/products/')
+        self.assertEqual(
+            sorted(key for key in registry._endpoints if key[0] == 'product-list'),
+            [('product-list', 'OPTIONS'), ('product-list', 'other')],
+        )
+        self.assertEqual(sum(registry._endpoints[('product-list', 'other')].statuses.values()), 3)
+
+    def test_prometheus_text_format(self):
+        metrics = Registry(window=4)
+        metrics.add_collector(lambda: ['# TYPE extra gauge', 'extra 1'])
+        metrics.record('product-list', 'GET', 200, 0.003, 0.001, 2)
+        metrics.record('product-list', 'GET', 500, 0.3, 0.2, 12)
+        metrics.record('a"b', 'POST', 201, 0.01, 0.0, 0)
+        lines = metrics.render().splitlines()
+
+        labels = 'endpoint="product-list",method="GET"'
+        for line in (
+            '# HELP http_request_duration_seconds İstek süresi (saniye)',
+            '# TYPE http_request_duration_seconds histogram',
+            f'http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1',
+            f'http_request_duration_seconds_bucket{{{labels},le="0.25"}} 1',
+            f'http_request_duration_seconds_bucket{{{labels},le="0.5"}} 2',
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+            f'http_request_duration_seconds_sum{{{labels}}} 0.303000',
+            f'http_request_duration_seconds_count{{{labels}}} 2',
+            '# TYPE http_request_db_queries histogram',
+            f'http_request_db_queries_bucket{{{labels},le="2"}} 1',
+            f'http_request_db_queries_bucket{{{labels},le="20"}} 2',
+            '# TYPE http_request_duration_seconds_window gauge',
+            f'http_request_duration_seconds_window{{{labels},quantile="0.99"}} 0.3',
+            '# TYPE http_responses_total counter',
+            f'http_responses_total{{{labels},status="200"}} 1',
+            f'http_responses_total{{{labels},status="500"}} 1',
+            'http_responses_total{endpoint="a\\"b",method="POST",status="201"} 1',
+            'extra 1',
+        ):
+            self.assertIn(line, lines)
+        # Her metrik adının HELP/TYPE başlığı bir kez yazılır
+        headers = [line for line in lines if line.startswith('# TYPE')]
+        self.assertEqual(len(headers), len(set(headers)))
+
+    def test_endpoint_is_admin_only(self):
+        self.client.get('/api/products/products/')
+        self.assertEqual(self.client.get('/api/_metrics').status_code, 401)
+        self.client.force_authenticate(User.objects.create_user(username='u', email='u@example.com', password='x'))
+        self.assertEqual(self.client.get('/api/_metrics').status_code, 403)
+
+        self.client.force_authenticate(User.objects.create_user(
+            username='a', email='a@example.com', password='x', is_staff=True,
+        ))
+        response = self.client.get('/api/_metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn('http_request_duration_seconds_count{endpoint="product-list",method="GET"} 1', response.content.decode())
+
+    def test_slow_requests_are_profiled(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        def slow_view(request):
+            time.sleep(0.1)
+            return HttpResponse()
+
+        with override_settings(METRICS_SLOW_REQUEST_MS=20, METRICS_PROFILE_DIR=directory):
+            middleware = InstrumentationMiddleware(slow_view)
+            middleware(RequestFactory().get('/'))
+            middleware.profiler.threshold = 10  # hızlı istek: dosya yazılmaz
+            middleware(RequestFactory().get('/'))
+
+        [name] = os.listdir(directory)
+        self.assertTrue(name.startswith('unresolved-') and name.endswith('ms.folded'), name)
+        with open(os.path.join(directory, name), encoding='utf-8') as f:
+            stack, count = f.readline().rsplit(' ', 1)
+        self.assertIn('slow_view (tests.py:', stack)
+        self.assertGreater(int(count), 0)
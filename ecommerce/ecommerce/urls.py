@@ -5,8 +5,8 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from users.views import EmailTokenObtainPairView
-from django.conf.urls.static import static
-from django.conf import settings
+from ecommerce.metrics import MetricsView
+from ecommerce.media import media_urlpatterns
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -20,4 +20,6 @@ urlpatterns = [
     path('api/cart/', include('cart.urls')),
 
     path('api/orders/', include('orders.urls')),
-]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+    path('api/_metrics', MetricsView.as_view(), name='metrics'),
+] + media_urlpatterns()
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'queue', 'status', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'queue', 'task')
+    readonly_fields = ('attempts', 'locked_at', 'locked_by', 'last_error', 'created_at')
+    actions = ['retry_now']
+
+    @admin.action(description='Seçili işleri şimdi yeniden dene')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='pending', attempts=0, run_at=timezone.now(), last_error='',
+        )
+        self.message_user(request, f'{updated} iş kuyruğa alındı.')
@@ -0,0 +1,40 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import run_jobs, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        'Veritabanı iş kuyruğunu işleyen worker. İşleri toplu alır, görev bazında gruplayıp çalıştırır; '
+        'hata alan işler geri çekilmeyle yeniden denenir. SIGTERM/SIGINT ile mevcut parti bitince durur.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', default='default')
+        parser.add_argument('--batch-size', type=int, default=100, help='Tek seferde alınan en fazla iş')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Kuyruk boşken bekleme (saniye)')
+        parser.add_argument('--once', action='store_true', help='Hazır işleri bitirip çık (cron için)')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        worker = worker_name()
+        total = 0
+        while self.running:
+            processed = run_jobs(options['queue'], options['batch_size'], worker)
+            total += processed
+            close_old_connections()
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'{total} iş işlendi.'))
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,35 @@
+from django.db import models
+from django.utils import timezone
+
+
+# ---------------------------
+# Job Model
+# ---------------------------
+class Job(models.Model):
+    """Arka planda çalıştırılacak iş. Başarıyla biten işler silinir; kalıcı hatalar `failed` olarak kalır."""
+    STATUS_CHOICES = [
+        ('pending', 'Bekliyor'),
+        ('running', 'Çalışıyor'),
+        ('failed', 'Başarısız'),
+    ]
+
+    queue = models.CharField(max_length=50, default='default')
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Worker'ın sorgusu: kuyruk + durum eşitliği, run_at sırası
+            models.Index(fields=['queue', 'status', 'run_at'], name='job_queue_status_run_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
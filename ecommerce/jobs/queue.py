@@ -0,0 +1,149 @@
+import logging
+import os
+import random
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    __slots__ = ('name', 'func', 'queue', 'batch_size', 'max_attempts')
+
+    def __init__(self, name, func, queue, batch_size, max_attempts):
+        self.name = name
+        self.func = func
+        self.queue = queue
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    @property
+    def batched(self):
+        return self.batch_size > 1
+
+    def enqueue(self, run_at=None, **payload):
+        return enqueue(self.name, payload, run_at=run_at)
+
+
+_tasks = {}
+
+
+def task(name, queue='default', batch_size=1, max_attempts=None):
+    """
+    Bir fonksiyonu kuyruk işi olarak kaydeder. `batch_size > 1` ise fonksiyon payload listesi alır
+    ve aynı görevin en fazla o kadar işi tek çağrıda işlenir (örn. tek API isteğiyle toplu e-posta);
+    aksi halde payload anahtar kelime argümanı olarak verilir. Hata fırlatan işler geri çekilmeyle
+    yeniden denenir.
+    """
+    def decorator(func):
+        _tasks[name] = Task(
+            name, func, queue, batch_size,
+            max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 5),
+        )
+        func.enqueue = _tasks[name].enqueue
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _tasks.get(name)
+
+
+def enqueue(name, payload=None, run_at=None):
+    """
+    İşi kuyruğa yazar. Çağıranın transaction'ına dahildir: transaction geri alınırsa iş de
+    oluşmaz, worker ise işi ancak commit sonrasında görür.
+    """
+    registered = _tasks[name]
+    return Job.objects.create(
+        queue=registered.queue, task=name, payload=payload or {},
+        max_attempts=registered.max_attempts, run_at=run_at or timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """Üstel geri çekilme (JOB_RETRY_BASE_SECONDS * 2^(n-1), üst sınırlı) + %10'a kadar rastgele sapma."""
+    base = getattr(settings, 'JOB_RETRY_BASE_SECONDS', 30)
+    ceiling = getattr(settings, 'JOB_RETRY_MAX_SECONDS', 3600)
+    delay = min(base * 2 ** max(attempts - 1, 0), ceiling)
+    return timedelta(seconds=delay * (1 + random.random() * 0.1))
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(queue='default', limit=100, worker=None):
+    """
+    Çalışma zamanı gelmiş en fazla `limit` işi bu worker'a kilitler. PostgreSQL'de
+    `SKIP LOCKED` sayesinde eşzamanlı worker'lar aynı işi almaz; kilidi JOB_LOCK_TIMEOUT'tan
+    uzun süredir tutulan (çökmüş worker) işler yeniden kuyruğa döner.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'JOB_LOCK_TIMEOUT', 300))
+    Job.objects.filter(queue=queue, status='running', locked_at__lt=stale).update(status='pending', locked_by='')
+    with transaction.atomic():
+        ids = list(
+            Job.objects.filter(queue=queue, status='pending', run_at__lte=now)
+            .order_by('run_at', 'id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status='pending').update(
+            status='running', locked_at=now, locked_by=worker or worker_name(), attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(id__in=ids, status='running').order_by('run_at', 'id'))
+
+
+def _finish(jobs, error=None):
+    if error is None:
+        Job.objects.filter(id__in=[job.id for job in jobs]).delete()
+        return
+    message = f'{type(error).__name__}: {error}'
+    now = timezone.now()
+    for job in jobs:
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(status='failed', locked_by='', last_error=message)
+            logger.error('İş kalıcı olarak başarısız: %s (%s)', job, message)
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status='pending', locked_by='', last_error=message, run_at=now + retry_delay(job.attempts),
+            )
+            logger.warning('İş yeniden denenecek: %s (%s)', job, message)
+
+
+def run_jobs(queue='default', limit=100, worker=None):
+    """Bir kez iş alır ve çalıştırır; işlenen iş sayısını döndürür."""
+    jobs = claim(queue, limit, worker)
+    by_task = {}
+    for job in jobs:
+        by_task.setdefault(job.task, []).append(job)
+
+    for name, group in by_task.items():
+        registered = get_task(name)
+        if registered is None:
+            Job.objects.filter(id__in=[job.id for job in group]).update(
+                status='failed', locked_by='', last_error=f'Kayıtlı olmayan görev: {name}',
+            )
+            continue
+        chunks = [group[i:i + registered.batch_size] for i in range(0, len(group), registered.batch_size)]
+        for chunk in chunks:
+            try:
+                if registered.batched:
+                    registered.func([job.payload for job in chunk])
+                else:
+                    registered.func(**chunk[0].payload)
+            except Exception as exc:
+                _finish(chunk, exc)
+            else:
+                _finish(chunk)
+    return len(jobs)
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim, enqueue, run_jobs, task
+
+calls = []
+
+
+@task('tests.record', batch_size=3)
+def record(payloads):
+    calls.append([p['n'] for p in payloads])
+
+
+@task('tests.flaky', max_attempts=2)
+def flaky(fail):
+    if fail:
+        raise RuntimeError('sağlayıcı yanıt vermedi')
+
+
+@override_settings(JOB_RETRY_BASE_SECONDS=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_batched_task_runs_in_chunks_and_deletes_done_jobs(self):
+        for n in range(7):
+            record.enqueue(n=n)
+        self.assertEqual(run_jobs(), 7)
+        self.assertEqual(calls, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_job_backs_off_then_fails_permanently(self):
+        job = flaky.enqueue(fail=True)
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertIn('sağlayıcı yanıt vermedi', job.last_error)
+        self.assertGreaterEqual(job.run_at, timezone.now() + timedelta(seconds=55))
+        self.assertEqual(run_jobs(), 0)  # geri çekilme süresi dolmadı
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+    def test_future_and_stale_jobs(self):
+        enqueue('tests.flaky', {'fail': False}, run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(claim(), [])
+
+        stale = flaky.enqueue(fail=False)
+        Job.objects.filter(pk=stale.pk).update(status='running', locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual([job.pk for job in claim()], [stale.pk])
+
+    def test_unknown_task_is_marked_failed(self):
+        job = Job.objects.create(task='tests.missing')
+        run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
@@ -4,7 +4,7 @@ from .models import Order, OrderItem
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ('product', 'quantity', 'price')
+    readonly_fields = ('product', 'variation', 'quantity', 'price')
 
 
 @admin.register(Order)
@@ -13,7 +13,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ('created_at', 'user')
     search_fields = ('user__username',)
     inlines = [OrderItemInline]
-    readonly_fields = ('total_price', 'created_at')
+    readonly_fields = ('total_price', 'created_at', 'reserved_until')
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
@@ -0,0 +1,138 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from orders.models import Order, OrderItem
+from orders.views import CreateOrderView
+from products.models import Brands, Categories, Product
+from users.models import Address, PaymentCard
+
+
+class Command(BaseCommand):
+    help = (
+        'Sipariş oluşturma (checkout) gecikmesini satır sayısına göre ve aynı ürünler üzerinde '
+        'eşzamanlı checkout altında ölçer. Eşzamanlı istekler ayrı bağlantılar kullandığından '
+        'veriler commit edilir ve sonunda silinir; boş/test veritabanında çalıştırın.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[1, 10, 50, 200])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--hot-skus', type=int, default=5, help='Eşzamanlı testte paylaşılan ürün sayısı')
+
+    def handle(self, *args, **options):
+        self.tag = uuid.uuid4().hex[:8]
+        self.factory = APIRequestFactory()
+        self.view = CreateOrderView.as_view()
+        self.users = []
+        try:
+            self._seed(max(options['lines']), max(options['concurrency']))
+            self._bench_lines(options['lines'], options['repeat'])
+            self._bench_concurrency(options['concurrency'], options['hot_skus'])
+        finally:
+            self._cleanup()
+
+    def _seed(self, product_count, user_count):
+        category = Categories.objects.create(name=f'Bench {self.tag}')
+        brand = Brands.objects.create(name=f'Bench {self.tag}')
+        Product.objects.bulk_create([
+            Product(
+                name=f'Bench {self.tag} {i}', description='', price=100, stock=1_000_000,
+                slug=f'bench-{self.tag}-{i}', category=category, brand=brand,
+            )
+            for i in range(product_count)
+        ])
+        self.products = list(Product.objects.filter(slug__startswith=f'bench-{self.tag}-').order_by('id'))
+        User = get_user_model()
+        for i in range(user_count):
+            user = User.objects.create_user(
+                username=f'bench-{self.tag}-{i}', email=f'bench-{self.tag}-{i}@example.com', password=None,
+            )
+            Address.objects.create(
+                user=user, title='Ev', address_line='-', city='-', district='-',
+                postal_code='00000', country='TR', is_primary=True,
+            )
+            PaymentCard.objects.create(
+                user=user, card_number='4111111111111111', card_holder_name='Bench',
+                expiry_month=12, expiry_year=2099, cvv='000', is_primary=True,
+            )
+            self.users.append(user)
+
+    def _checkout(self, user, products, quantity=1):
+        payload = {'items': [{'product_id': p.id, 'quantity': quantity} for p in products]}
+        request = self.factory.post('/api/orders/create/', payload, format='json')
+        force_authenticate(request, user=user)
+        start = time.perf_counter()
+        response = self.view(request)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    def _bench_lines(self, line_counts, repeat):
+        self.stdout.write(f"{'satır':>8} {'medyan ms':>10} {'p95 ms':>10}")
+        user = self.users[0]
+        for count in line_counts:
+            samples = [self._checkout(user, self.products[:count])[0] for _ in range(repeat)]
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+            self.stdout.write(f'{count:>8} {statistics.median(samples):>10.2f} {p95:>10.2f}')
+
+    def _bench_concurrency(self, levels, hot_skus):
+        hot = self.products[:hot_skus]
+        self.stdout.write(f"\n{'eşzamanlı':>10} {'medyan ms':>10} {'max ms':>10} {'başarılı':>9} {'hata':>6} {'sipariş/sn':>11}")
+        for level in levels:
+            results = []
+            barrier = threading.Barrier(level)
+
+            def worker(user):
+                try:
+                    barrier.wait()
+                    results.append(self._checkout(user, hot))
+                except Exception:
+                    results.append((0, None))  # SQLite eşzamanlı yazımı kilit hatasıyla reddedebilir
+                finally:
+                    connection.close()
+
+            threads = [threading.Thread(target=worker, args=(user,)) for user in self.users[:level]]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            latencies = [ms for ms, code in results if code == 201]
+            errors = len(results) - len(latencies)
+            median = statistics.median(latencies) if latencies else 0
+            peak = max(latencies) if latencies else 0
+            self.stdout.write(
+                f'{level:>10} {median:>10.2f} {peak:>10.2f} {len(latencies):>9} {errors:>6} {len(latencies) / elapsed:>11.1f}'
+            )
+        self._verify_stock()
+
+    def _verify_stock(self):
+        """Düşülen stok, oluşturulan sipariş kalemleriyle birebir tutmalı (kayıp güncelleme yok)."""
+        sold = dict(
+            OrderItem.objects.filter(product__in=self.products)
+            .values_list('product_id').annotate(total=Sum('quantity'))
+        )
+        drift = [
+            p.id for p in Product.objects.filter(pk__in=[p.pk for p in self.products])
+            if p.stock != 1_000_000 - sold.get(p.id, 0)
+        ]
+        if drift:
+            self.stdout.write(self.style.ERROR(f'Stok tutarsız: {drift}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Stok düşümleri sipariş kalemleriyle tutarlı.'))
+
+    def _cleanup(self):
+        Order.objects.filter(user__in=self.users).delete()
+        Product.objects.filter(slug__startswith=f'bench-{self.tag}-').delete()
+        Categories.objects.filter(name=f'Bench {self.tag}').delete()
+        Brands.objects.filter(name=f'Bench {self.tag}').delete()
+        get_user_model().objects.filter(pk__in=[u.pk for u in self.users]).delete()
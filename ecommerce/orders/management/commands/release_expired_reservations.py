@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.reservations import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Süresi dolan bekleyen siparişleri iptal eder ve rezerve edilen stoğu geri verir (cron ile dakikalık çalıştırın).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        released = release_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{released} sipariş rezervasyonu serbest bırakıldı.'))
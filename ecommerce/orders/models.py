@@ -1,6 +1,6 @@
 from django.db import models
 from django.conf import settings
-from products.models import Product
+from products.models import Product, Variations
 from users.models import PaymentCard,Address
 
 class Order(models.Model):
@@ -15,6 +15,16 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     address = models.ForeignKey(Address, on_delete=models.SET_NULL, null=True, blank=True)
     payment_card = models.ForeignKey(PaymentCard, on_delete=models.SET_NULL, null=True, blank=True)
+    # Bekleyen siparişin stok rezervasyonunun bitişi; tamamlanınca/iptalde boşaltılır (bkz. orders/reservations.py)
+    reserved_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Cursor sayfalama: tüm siparişler ve kullanıcı siparişleri (-created_at, -id)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='order_created_id_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_id_idx'),
+            models.Index(fields=['status', 'reserved_until'], name='order_status_reserved_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email}"
@@ -22,6 +32,7 @@ class Order(models.Model):
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    variation = models.ForeignKey(Variations, on_delete=models.SET_NULL, null=True, blank=True)
     quantity = models.IntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
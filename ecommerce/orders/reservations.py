@@ -0,0 +1,174 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from cart.models import CartItem
+from products.cache import bump_version
+from products.models import Product, Variations
+
+from .models import Order, OrderItem
+
+
+class CheckoutError(Exception):
+    """Sipariş satırları karşılanamadığında fırlatılır; view 4xx yanıtına çevirir."""
+
+    def __init__(self, message, product_ids=(), status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.product_ids = sorted(product_ids)
+        self.status_code = status_code
+
+
+class InsufficientStock(CheckoutError):
+    def __init__(self, product_ids):
+        super().__init__('Yetersiz stok.', product_ids, status_code=409)
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, 'ORDER_RESERVATION_TTL', 15 * 60))
+
+
+def resolve_lines(lines):
+    """
+    (product_id, variation_id, adet) satırlarını fiyatlandırır. Fiyatlar istemciden değil
+    ürün/varyasyonun `price`/`discount_price` alanlarından gelir.
+    Dönüş: ([(product_id, variation_id, adet, birim fiyat)], toplam)
+    """
+    products = Product.objects.filter(isActive=True).only('id', 'price', 'discount_price').in_bulk(
+        {product_id for product_id, _, _ in lines}
+    )
+    variations = Variations.objects.filter(isActive=True).only('id', 'product_id', 'price', 'discount_price').in_bulk(
+        {variation_id for _, variation_id, _ in lines if variation_id}
+    )
+
+    missing = set()
+    priced = []
+    for product_id, variation_id, quantity in lines:
+        product = products.get(product_id)
+        variation = variations.get(variation_id) if variation_id else None
+        if product is None or (variation_id and (variation is None or variation.product_id != product_id)):
+            missing.add(product_id)
+            continue
+        priced.append((product_id, variation_id, quantity, (variation or product).unit_price))
+    if missing:
+        raise CheckoutError('Ürün bulunamadı.', missing)
+
+    total = sum((price * quantity for _, _, quantity, price in priced), Decimal('0.00'))
+    return priced, total
+
+
+def _decrement(model, quantities):
+    """
+    Koşullu düşüm: `UPDATE … SET stock = stock - n WHERE id = … AND stock >= n`.
+    Okuma-sonra-yazma olmadığı için kayıp güncelleme olmaz; satırlar id sırasıyla
+    güncellenir, böylece çok ürünlü eşzamanlı siparişler kilitleri aynı sırada alır.
+    """
+    short = [
+        pk for pk, quantity in sorted(quantities.items())
+        if not model.objects.filter(pk=pk, stock__gte=quantity).update(stock=F('stock') - quantity)
+    ]
+    if short:
+        raise InsufficientStock(short)
+
+
+def _increment(model, quantities):
+    for pk, quantity in sorted(quantities.items()):
+        model.objects.filter(pk=pk).update(stock=F('stock') + quantity)
+
+
+def _stock_quantities(items):
+    """Varyasyonlu satırlar varyasyon stoğundan, diğerleri ürün stoğundan düşülür."""
+    products, variations = defaultdict(int), defaultdict(int)
+    for product_id, variation_id, quantity in items:
+        if variation_id:
+            variations[variation_id] += quantity
+        else:
+            products[product_id] += quantity
+    return products, variations
+
+
+def place_order(user, lines, address, payment_card):
+    """
+    Stoğu rezerve ederek bekleyen sipariş oluşturur ve kullanıcının sepetini boşaltır.
+    Rezervasyon `reserved_until`'e kadar geçerlidir; sipariş tamamlanmazsa iptal veya
+    `release_expired_reservations` komutuyla geri verilir.
+    """
+    priced, total = resolve_lines(lines)
+    products, variations = _stock_quantities((p, v, q) for p, v, q, _ in priced)
+
+    # Fiyatlar işlem dışında okundu. Stok düşümü en sona bırakılır: sıcak ürünün satır kilidi
+    # sadece düşüm ile commit arasında tutulur, eşzamanlı siparişler kuyrukta beklemez.
+    with transaction.atomic():
+        order = Order.objects.create(
+            user=user,
+            total_price=total,
+            address=address,
+            payment_card=payment_card,
+            status='pending',
+            reserved_until=timezone.now() + reservation_ttl(),
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, variation_id=variation_id, quantity=quantity, price=price)
+            for product_id, variation_id, quantity, price in priced
+        ])
+        CartItem.objects.filter(cart__user=user).delete()
+        _decrement(Product, products)
+        _decrement(Variations, variations)
+        # Koşullu update sinyal üretmez; stok gösteren katalog cache'ini elle geçersiz kıl
+        touched = {product_id for product_id, _, _, _ in priced}
+        transaction.on_commit(lambda: bump_version(Product, touched))
+    return order
+
+
+def release(order, status='cancelled'):
+    """
+    Bekleyen siparişi verilen duruma çeker ve rezerve stoğu geri verir. Durum geçişi koşullu
+    update ile yapılır; aynı sipariş iki kez (iptal + süre dolumu) serbest bırakılamaz.
+    Rezervasyonsuz eski siparişlerde (`reserved_until` boş) stok değişmez.
+    """
+    with transaction.atomic():
+        held = Order.objects.filter(pk=order.pk, status='pending', reserved_until__isnull=False).update(
+            status=status, reserved_until=None
+        )
+        if not held:
+            Order.objects.filter(pk=order.pk, status='pending').update(status=status)
+        else:
+            items = list(order.items.values_list('product_id', 'variation_id', 'quantity'))
+            products, variations = _stock_quantities(items)
+            _increment(Product, products)
+            _increment(Variations, variations)
+            touched = {product_id for product_id, _, _ in items}
+            transaction.on_commit(lambda: bump_version(Product, touched))
+    order.refresh_from_db(fields=['status', 'reserved_until'])
+    return bool(held)
+
+
+def confirm(order):
+    """Rezervasyonu kalıcı satışa çevirir. Süresi dolmuş rezervasyon önce serbest bırakılır."""
+    now = timezone.now()
+    confirmed = Order.objects.filter(pk=order.pk, status='pending').exclude(reserved_until__lt=now).update(
+        status='completed', reserved_until=None
+    )
+    if not confirmed and order.status == 'pending' and order.reserved_until and order.reserved_until < now:
+        release(order)
+    order.refresh_from_db(fields=['status', 'reserved_until'])
+    return bool(confirmed)
+
+
+def release_expired(now=None, batch_size=500):
+    """Süresi dolan bekleyen siparişleri iptal eder; serbest bırakılan sipariş sayısını döndürür."""
+    now = now or timezone.now()
+    released = 0
+    expired = Order.objects.filter(status='pending', reserved_until__lt=now).order_by('reserved_until')
+    while True:
+        batch = list(expired[:batch_size])
+        if not batch:
+            return released
+        released += sum(release(order) for order in batch)
+        if len(batch) < batch_size:
+            return released
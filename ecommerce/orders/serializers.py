@@ -1,18 +1,21 @@
 from rest_framework import serializers
 from .models import Order, OrderItem
 from products.models import Product
+from ecommerce.fieldsets import SparseFieldsetSerializerMixin
+from ecommerce.images import SrcsetField
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_image = serializers.ImageField(source='product.image', read_only=True)
+    product_image_srcset = SrcsetField(source='product.image_derivatives')
 
     class Meta:
         model = OrderItem
-        fields = ['id', 'product', 'product_name', 'product_image', 'quantity', 'price']
+        fields = ['id', 'product', 'product_name', 'product_image', 'product_image_srcset', 'quantity', 'price']
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     address = serializers.StringRelatedField()
     payment_card = serializers.StringRelatedField()
@@ -24,21 +27,37 @@ class OrderSerializer(serializers.ModelSerializer):
             'status', 'items', 'address', 'payment_card'
         ]
         read_only_fields = ['user', 'created_at', 'status', 'total_price']
+        # Address/PaymentCard.__str__ kullanıcı e-postasını okur
+        select_related = ['address__user', 'payment_card__user']
+        field_presets = {
+            'card': ['id', 'created_at', 'total_price', 'status'],
+            'detail': [
+                'id', 'created_at', 'total_price', 'status', 'address', 'payment_card',
+                'items.product', 'items.product_name', 'items.product_image_srcset', 'items.quantity', 'items.price',
+            ],
+            'admin': '__all__',
+        }
 
 
 
 class OrderItemDetailSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_image = serializers.ImageField(source='product.image', read_only=True)
+    product_image_srcset = SrcsetField(source='product.image_derivatives')
 
     class Meta:
         model = OrderItem
-        fields = ['product_name', 'product_image', 'quantity', 'price']
+        fields = ['product_name', 'product_image', 'product_image_srcset', 'quantity', 'price']
 
 
-class OrderListSerializer(serializers.ModelSerializer):
+class OrderListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     items = OrderItemDetailSerializer(many=True, read_only=True)
 
     class Meta:
         model = Order
         fields = ['id', 'status', 'total_price', 'created_at', 'items']
+        field_presets = {
+            'card': ['id', 'status', 'total_price', 'created_at'],
+            'detail': '__all__',
+            'admin': '__all__',
+        }
@@ -1,3 +1,242 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ecommerce.pagination import RequiredCursorPagination
+from ecommerce.testing import QueryCountMixin
+from products.models import Brands, Categories, Product
+from users.models import Address, PaymentCard, User
+from .models import Order, OrderItem
+from .reservations import release_expired
+
+
+def make_customer(username, **extra):
+    user = User.objects.create_user(username=username, email=username, password=None, **extra)
+    Address.objects.create(
+        user=user, title='Ev', address_line='Sokak 1', city='İstanbul',
+        district='Kadıköy', postal_code='34000', country='TR', is_primary=True,
+    )
+    PaymentCard.objects.create(
+        user=user, card_number='4111111111111111', card_holder_name='A B',
+        expiry_month=1, expiry_year=2030, cvv='123', is_primary=True,
+    )
+    return user
+
+
+class OrderListQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='a@example.com', email='a@example.com', password='x', is_staff=True)
+        self.client.force_authenticate(self.user)
+        self.address = Address.objects.create(
+            user=self.user, title='Ev', address_line='Sokak 1', city='İstanbul',
+            district='Kadıköy', postal_code='34000', country='TR', is_primary=True,
+        )
+        self.card = PaymentCard.objects.create(
+            user=self.user, card_number='4111111111111111', card_holder_name='A B',
+            expiry_month=1, expiry_year=2030, cvv='123', is_primary=True,
+        )
+        category = Categories.objects.create(name='Elektronik')
+        brand = Brands.objects.create(name='Marka')
+        self.products = [
+            Product.objects.create(name=f'Ürün {i}', description='-', price=10, stock=5, category=category, brand=brand)
+            for i in range(3)
+        ]
+
+    def grow_orders(self, size):
+        while Order.objects.count() < size:
+            order = Order.objects.create(
+                user=self.user, total_price=Decimal('20.00'), address=self.address, payment_card=self.card,
+            )
+            for product in self.products[:2]:
+                OrderItem.objects.create(order=order, product=product, quantity=1, price=Decimal('10.00'))
+
+    def test_my_orders_query_count_is_constant(self):
+        self.assertConstantQueries('/api/orders/my-orders/', self.grow_orders)
+
+    def test_uncompleted_orders_query_count_is_constant(self):
+        self.assertConstantQueries('/api/orders/uncompleted/', self.grow_orders)
+
+    def test_all_orders_query_count_is_constant(self):
+        self.assertConstantQueries('/api/orders/all-orders/', self.grow_orders)
+
+    def test_all_orders_is_always_paginated(self):
+        self.grow_orders(5)
+        with mock.patch.object(RequiredCursorPagination, 'page_size', 2):
+            data = self.client.get('/api/orders/all-orders/').json()
+            self.assertEqual(len(data['results']), 2)
+            self.assertIsNone(data['previous'])
+            seen = [row['id'] for row in data['results']]
+            while data['next']:
+                data = self.client.get(data['next']).json()
+                seen += [row['id'] for row in data['results']]
+        self.assertEqual(seen, list(Order.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)))
+
+        self.client.force_authenticate(make_customer('b@example.com'))
+        self.assertEqual(self.client.get('/api/orders/all-orders/').status_code, 403)
+
+    def test_sparse_fieldset_trims_output_and_columns(self):
+        self.assertConstantQueries('/api/orders/my-orders/?fields=detail', self.grow_orders)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/my-orders/?fields=id,items.product_name')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0], {'id': response.data[0]['id'], 'items': [{'product_name': 'Ürün 0'}, {'product_name': 'Ürün 1'}]})
+        # Ürün açıklaması (TextField) seçili alanlarca okunmadığı için SELECT'e girmez
+        self.assertFalse(any('"description"' in query['sql'] for query in queries.captured_queries))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/my-orders/?fields=card')
+        self.assertEqual(set(response.data[0]), {'id', 'created_at', 'total_price', 'status'})
+        self.assertEqual(len(queries), 1)  # items prefetch'i ve adres/kart JOIN'leri yok
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+
+class CheckoutQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(make_customer('q@example.com'))
+        self.products = [
+            Product.objects.create(name=f'Ürün {i}', description='-', price=10 + i, stock=20) for i in range(10)
+        ]
+
+    def checkout(self, lines):
+        payload = {'items': [{'product_id': p.id, 'quantity': q} for p, q in lines]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/orders/create/', payload, format='json')
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_lines_are_fetched_and_inserted_in_bulk(self):
+        response, small = self.checkout([(self.products[0], 1)])
+        self.assertEqual(response.status_code, 201, response.content)
+        response, large = self.checkout([(p, 1) for p in self.products])
+        self.assertEqual(response.status_code, 201, response.content)
+
+        # Ürünler tek sorguyla okunur, kalemler tek INSERT'le yazılır; satır başına yalnızca
+        # stok düşümü (koşullu UPDATE) eklenir
+        self.assertEqual(len(large) - len(small), len(self.products) - 1)
+        self.assertEqual(sum(sql.startswith('INSERT INTO "orders_orderitem"') for sql in large), 1)
+        self.assertEqual(sum(sql.startswith('UPDATE "products_product"') for sql in large), len(self.products))
+
+    def test_repeated_products_are_merged(self):
+        product = self.products[0]
+        response, _ = self.checkout([(product, 2), (self.products[1], 1), (product, 3)])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Decimal(response.data['total_price']), Decimal('61.00'))
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 15)
+
+    def test_unknown_products_write_nothing(self):
+        response, queries = self.checkout([(self.products[0], 1), (Product(pk=999999), 1)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['product_ids'], [999999])
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(any(sql.startswith(('INSERT', 'UPDATE')) for sql in queries))
+
+
+class CheckoutReservationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = make_customer('c@example.com')
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(name='Kulaklık', description='-', price=100, discount_price=80, stock=3)
+        self.other = Product.objects.create(name='Kablo', description='-', price=15, stock=10)
+
+    def checkout(self, *lines, **extra):
+        payload = {'items': [{'product_id': p.id, 'quantity': q, 'price': '0.01'} for p, q in lines], **extra}
+        return self.client.post('/api/orders/create/', payload, format='json')
+
+    def test_prices_are_resolved_server_side(self):
+        response = self.checkout((self.product, 2), (self.other, 1), total_amount='1.00')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Decimal(response.data['total_price']), Decimal('175.00'))
+        self.assertEqual(
+            sorted(Decimal(item['price']) for item in response.data['items']),
+            [Decimal('15.00'), Decimal('80.00')],
+        )
+
+    def test_insufficient_stock_rolls_back_whole_order(self):
+        response = self.checkout((self.other, 1), (self.product, 4))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['product_ids'], [self.product.id])
+        self.assertFalse(Order.objects.exists())
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.stock, 10)
+
+    def test_cancel_releases_reservation_once(self):
+        order_id = self.checkout((self.product, 3)).data['id']
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+
+        for _ in range(2):
+            response = self.client.put(f'/api/orders/{order_id}/cancel/')
+            self.assertEqual(response.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+
+    def test_expired_reservation_is_released(self):
+        order_id = self.checkout((self.product, 2)).data['id']
+        Order.objects.filter(pk=order_id).update(reserved_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(release_expired(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+        self.assertEqual(Order.objects.get(pk=order_id).status, 'cancelled')
+        response = self.client.put(f'/api/orders/{order_id}/complete/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_complete_keeps_stock_consumed(self):
+        order_id = self.checkout((self.product, 2)).data['id']
+        self.assertEqual(self.client.put(f'/api/orders/{order_id}/complete/').status_code, 200)
+        self.assertEqual(release_expired(now=timezone.now() + timedelta(days=1)), 0)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    """Tek sıcak ürün üzerinde eşzamanlı checkout: stok asla eksiye düşmemeli, kayıp güncelleme olmamalı."""
+    buyers = 40
+    stock = 15
+
+    def test_hot_sku_is_never_oversold(self):
+        product = Product.objects.create(name='Flaş', description='-', price=10, stock=self.stock)
+        users = [make_customer(f'buyer{i}@example.com') for i in range(self.buyers)]
+        barrier = threading.Barrier(self.buyers)
+        statuses = []
+
+        def buy(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                response = client.post(
+                    '/api/orders/create/', {'items': [{'product_id': product.id, 'quantity': 1}]}, format='json',
+                )
+                statuses.append(response.status_code)
+            except Exception:
+                # SQLite eşzamanlı yazımı kilit hatasıyla reddeder; değişmezler yine de korunmalı
+                statuses.append(None)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        product.refresh_from_db()
+        sold = OrderItem.objects.filter(product=product).count()
+        self.assertGreaterEqual(product.stock, 0)
+        self.assertEqual(product.stock + sold, self.stock)
+        self.assertEqual(Order.objects.count(), sold)
+        self.assertLessEqual(statuses.count(201), sold)
+        if connection.vendor == 'postgresql':
+            # Satır kilidi sadece düşüm ile commit arasında: hepsi ya satın alır ya 409 alır
+            self.assertEqual(sold, self.stock)
+            self.assertEqual(statuses.count(409), self.buyers - self.stock)
@@ -1,23 +1,27 @@
 from rest_framework import generics, permissions,status
-from .models import Order,OrderItem
+from .models import Order
 from .serializers import OrderListSerializer
 from django.shortcuts import get_object_or_404
 from .serializers import OrderSerializer
-from cart.models import CartItem
 from rest_framework.response import Response
-from decimal import Decimal, ROUND_HALF_UP
-from django.db import transaction
+from ecommerce.pagination import RequiredCursorPagination
+from ecommerce.fieldsets import SparseFieldsetMixin
+from ecommerce.prefetch import apply_prefetch_plan
+from .reservations import CheckoutError, confirm, place_order, release
 
-class UserOrdersView(generics.ListAPIView):
+class UserOrdersView(SparseFieldsetMixin, generics.ListAPIView):
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).order_by('-created_at')
+        return super().get_queryset().filter(user=self.request.user).order_by('-created_at')
 
-class AllOrdersView(generics.ListAPIView):
+class AllOrdersView(SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAdminUser]
+    # Tüm siparişler tablosu tek yanıtta dönmesin diye her zaman sayfalanır
+    pagination_class = RequiredCursorPagination
 
     queryset = Order.objects.all().order_by('-created_at')
 
@@ -25,12 +29,13 @@ class OrderCreateView(generics.CreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class UncompletedOrdersView(generics.ListAPIView):
+class UncompletedOrdersView(SparseFieldsetMixin, generics.ListAPIView):
+    queryset = Order.objects.all()
     serializer_class = OrderListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user, status='pending')
+        return super().get_queryset().filter(user=self.request.user, status='pending')
 
 class CreateOrderView(generics.CreateAPIView):
     serializer_class = OrderSerializer
@@ -55,40 +60,33 @@ class CreateOrderView(generics.CreateAPIView):
         if not payment_card:
             return Response({"error": "Lütfen önce bir ödeme kartı ekleyin veya primary kart belirleyin."}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Fiyat ve toplam istemciden alınmaz (gönderilirse yok sayılır); sunucuda hesaplanır
+        lines = []
         try:
-            with transaction.atomic():
-                total_price = Decimal(str(data.get('total_amount', '0.00')))
-                
-                order = Order.objects.create(
-                    user=user,
-                    total_price=total_price,
-                    address=address,
-                    payment_card=payment_card,
-                    status='pending'
-                )
-
-                for item_data in items:
-                    from products.models import Product
-                    product = Product.objects.get(id=item_data['product_id'])
-                    
-                    OrderItem.objects.create(
-                        order=order,
-                        product=product,
-                        quantity=item_data['quantity'],
-                        price=Decimal(str(item_data['price']))
-                    )
-
-                CartItem.objects.filter(cart__user=user).delete()
-
-            return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
-        
+            for item_data in items:
+                variation_id = item_data.get('variation_id')
+                lines.append((
+                    int(item_data['product_id']),
+                    int(variation_id) if variation_id else None,
+                    int(item_data['quantity']),
+                ))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return Response({"error": "Sipariş ürünleri geçersiz."}, status=status.HTTP_400_BAD_REQUEST)
+        if any(quantity < 1 for _, _, quantity in lines):
+            return Response({"error": "Ürün adedi en az 1 olmalı."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            order = place_order(user, lines, address, payment_card)
+        except CheckoutError as e:
+            return Response({"error": e.message, "product_ids": e.product_ids}, status=e.status_code)
         except Exception as e:
             return Response(
                 {"error": f"Sipariş oluşturulurken hata oluştu: {str(e)}"}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-
+        order = apply_prefetch_plan(Order.objects.filter(pk=order.pk), OrderSerializer).get()
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
 
 
 class CompleteOrderView(generics.UpdateAPIView):
@@ -103,8 +101,8 @@ class CompleteOrderView(generics.UpdateAPIView):
         if order.status == 'cancelled':
             return Response({"detail": "Cancelled orders cannot be completed."}, status=status.HTTP_400_BAD_REQUEST)
 
-        order.status = 'completed'
-        order.save()
+        if not confirm(order) and order.status == 'cancelled':
+            return Response({"detail": "Rezervasyon süresi doldu, sipariş iptal edildi."}, status=status.HTTP_400_BAD_REQUEST)
         return Response({"message": "Ödeme başarılı, sipariş tamamlandı!"})
 
 class CancelOrderView(generics.UpdateAPIView):
@@ -119,6 +117,5 @@ class CancelOrderView(generics.UpdateAPIView):
         if order.status == 'completed':
             return Response({"detail": "Completed orders cannot be canceled."}, status=status.HTTP_400_BAD_REQUEST)
 
-        order.status = 'cancelled'
-        order.save()
+        release(order)
         return Response(OrderSerializer(order).data)
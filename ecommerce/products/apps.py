@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        from . import search  # noqa: F401  (arama indeksi sinyallerini bağlar)
+        from . import cache  # noqa: F401  (cache sürüm sinyallerini bağlar)
+        from . import facets  # noqa: F401  (facet yenileme sinyali ve işi)
+        from . import index  # noqa: F401  (katalog indeksi değişiklik günlüğü sinyali)
+
+        from ecommerce.images import track
+        from .models import Brands, Product, Variations
+        for model in (Product, Brands, Variations):
+            track(model)
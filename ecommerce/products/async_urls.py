@@ -0,0 +1,20 @@
+from django.urls import path
+
+from . import async_views
+
+# ASGI'de products.urls'ten önce denenir (bkz. ecommerce/asgi_urls.py); eşleşmeyenler DRF router'ına düşer
+urlpatterns = [
+    path('products/', async_views.ProductListView.as_view(), name='product-list'),
+    path('products/featured/', async_views.FeaturedProductsView.as_view(), name='product-featured'),
+    path('products/on_sale/', async_views.OnSaleProductsView.as_view(), name='product-on-sale'),
+    path('products/top_rated/', async_views.TopRatedProductsView.as_view(), name='product-top-rated'),
+    path('products/filter_options/', async_views.FilterOptionsView.as_view(), name='product-filter-options'),
+    path('products/<int:pk>/', async_views.ProductDetailView.as_view(), name='product-detail'),
+    path('categories/', async_views.CategoryListView.as_view(), name='categories-list'),
+    path('categories/tree/', async_views.CategoryTreeView.as_view(), name='categories-tree'),
+    path('categories/<int:pk>/', async_views.CategoryDetailView.as_view(), name='categories-detail'),
+    path('categories/<int:pk>/products/', async_views.CategoryProductsView.as_view(), name='categories-products'),
+    path('brands/', async_views.BrandListView.as_view(), name='brands-list'),
+    path('brands/<int:pk>/', async_views.BrandDetailView.as_view(), name='brands-detail'),
+    path('brands/<int:pk>/products/', async_views.BrandProductsView.as_view(), name='brands-products'),
+]
@@ -0,0 +1,274 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from ecommerce.aio import gather_queries
+from ecommerce.fieldsets import fieldset_from_request
+from ecommerce.pagination import KeysetCursorPagination
+from ecommerce.prefetch import apply_prefetch_plan
+from .cache import NotModified, aconditional_response, acached_response
+from .models import Brands, Categories, Product, ProductRating
+from .search import SearchRankOrderingFilter
+from .serializers import BrandSerializer, CategorySerializer, ProductSerializer
+from .tree import get_category_tree
+from .facets import FACETS_VERSION, aget_facets
+from .filters import filter_products
+from .index import apaginate_with_index
+from .views import ProductViewSet
+
+CATALOG_MODELS = (Product, Categories, Brands, ProductRating)
+
+
+class AsyncCatalogView(View):
+    """
+    Herkese açık katalog GET endpoint'lerinin async karşılıkları (ASGI'de `ecommerce.asgi_urls`
+    ile aynı URL'lere bağlanır). Yanıtlar DRF view'larıyla aynı serializer, sayfalama ve cache
+    anahtarlarını kullanır; GET dışındaki metodlar senkron DRF view'ına (`fallback`) devredilir.
+    """
+    view_is_async = True  # metod handler'ları yerine tek bir async dispatch kullanılır
+    fallback = None
+    serializer_class = None
+    validators = None  # cache dekoratörleri doldurur (ETag, Surrogate-Key)
+    renderer_class = api_settings.DEFAULT_RENDERER_CLASSES[0]
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            if self.fallback is None:
+                return HttpResponseNotAllowed(['GET', 'HEAD'])
+            return await sync_to_async(self.fallback)(request, *args, **kwargs)
+        self.request = request = Request(request)
+        try:
+            data = await self.get_data(request, *args, **kwargs)
+        except NotModified:
+            return self.validators.not_modified_response(HttpResponse)
+        except Http404 as exc:
+            return self.render({'detail': str(exc) or str(NotFound.default_detail)}, status=404)
+        except APIException as exc:
+            # DRF exception_handler ile aynı gövde: geçersiz ?fields=/filtre parametresi (400), bozuk cursor (404)
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return self.render(data, status=exc.status_code)
+        response = self.render(data)
+        if self.validators is not None:
+            self.validators.apply(response)
+        return response
+
+    async def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer_class().render(data), status=status, content_type='application/json')
+
+    def not_found(self, model):
+        # get_object() / get_object_or_404 ile aynı mesaj
+        return Http404(f'No {model._meta.object_name} matches the given query.')
+
+    def get_fieldset(self, request):
+        return fieldset_from_request(self.serializer_class, request)
+
+    def serialize(self, request, rows, many=True):
+        return self.serializer_class(
+            rows, many=many, context={'request': request}, fields=self.get_fieldset(request),
+        ).data
+
+    async def paginate(self, paginator, queryset, request):
+        return await paginator.apaginate_queryset(queryset, request, view=self)
+
+    async def list_data(self, request, queryset):
+        """DRF `list` ile aynı: sayfalama parametresi varsa {next, previous, results}, yoksa dizi."""
+        paginator = KeysetCursorPagination()
+        rows = await self.paginate(paginator, queryset, request)
+        if rows is not None:
+            return paginator.get_paginated_data(self.serialize(request, rows))
+        return self.serialize(request, [row async for row in queryset])
+
+
+class ProductQuerysetMixin:
+    serializer_class = ProductSerializer
+    filterset_fields = ProductViewSet.filterset_fields
+    ordering_fields = ProductViewSet.ordering_fields
+    ordering = ProductViewSet.ordering
+
+    async def get_queryset(self, request):
+        # Kategori ağacı gerekiyorsa cache/DB okuması thread'de yapılır
+        tree = await sync_to_async(get_category_tree)() if request.query_params.get('category') else None
+        queryset = filter_products(Product.objects.filter(isActive=True), request.query_params, tree)
+        return apply_prefetch_plan(queryset, ProductSerializer, self.get_fieldset(request))
+
+    async def filter_queryset(self, request, queryset):
+        """
+        DRF `filter_queryset`'in DjangoFilterBackend adımı (list ve retrieve'de olduğu gibi): geçersiz
+        `brand`/`isActive` 400 döner. Filterset doğrulaması marka satırını okuduğu için thread'de çalışır.
+        """
+        return await sync_to_async(DjangoFilterBackend().filter_queryset)(request, queryset, self)
+
+
+class ProductListView(ProductQuerysetMixin, AsyncCatalogView):
+    fallback = staticmethod(ProductViewSet.as_view({'get': 'list', 'post': 'create'}))
+
+    @aconditional_response(*CATALOG_MODELS)
+    async def get_data(self, request):
+        queryset = await self.filter_queryset(request, await self.get_queryset(request))
+        queryset = SearchRankOrderingFilter().filter_queryset(request, queryset, self)
+        return await self.list_data(request, queryset)
+
+    async def paginate(self, paginator, queryset, request):
+        return await apaginate_with_index(paginator, queryset, request, view=self)
+
+
+class ProductDetailView(ProductQuerysetMixin, AsyncCatalogView):
+    fallback = staticmethod(ProductViewSet.as_view({
+        'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+    }))
+
+    @acached_response(Categories, Brands, obj=Product)
+    async def get_data(self, request, pk):
+        try:
+            product = await (await self.filter_queryset(request, await self.get_queryset(request))).aget(pk=pk)
+        except Product.DoesNotExist:
+            raise self.not_found(Product)
+        return self.serialize(request, product, many=False)
+
+
+class FeaturedProductsView(ProductQuerysetMixin, AsyncCatalogView):
+    @acached_response(*CATALOG_MODELS)
+    async def get_data(self, request):
+        return await self.list_data(request, (await self.get_queryset(request)).filter(main_window_display=True))
+
+
+class OnSaleProductsView(ProductQuerysetMixin, AsyncCatalogView):
+    @acached_response(*CATALOG_MODELS)
+    async def get_data(self, request):
+        return await self.list_data(request, (await self.get_queryset(request)).filter(discount_price__isnull=False))
+
+
+class TopRatedProductsView(ProductQuerysetMixin, AsyncCatalogView):
+    @acached_response(*CATALOG_MODELS)
+    async def get_data(self, request):
+        queryset = (await self.get_queryset(request)).filter(rating_count__gt=0).order_by('-rating_average')
+        return await self.list_data(request, queryset)
+
+
+class FilterOptionsView(AsyncCatalogView):
+    @acached_response(Product, Categories, Brands, FACETS_VERSION)
+    async def get_data(self, request):
+        """Facet sayıları; bağımsız gruplu sorgular eşzamanlı çalışır (bkz. products/facets.py)."""
+        return await aget_facets(request.query_params)
+
+
+class TaxonomyListView(AsyncCatalogView):
+    model = None
+
+    async def get_data(self, request):
+        queryset = apply_prefetch_plan(
+            self.model.objects.filter(isActive=True), self.serializer_class, self.get_fieldset(request),
+        )
+        return await self.list_data(request, queryset)
+
+
+class TaxonomyDetailView(AsyncCatalogView):
+    model = None
+
+    async def get_data(self, request, pk):
+        try:
+            instance = await apply_prefetch_plan(
+                self.model.objects.filter(isActive=True), self.serializer_class, self.get_fieldset(request),
+            ).aget(pk=pk)
+        except self.model.DoesNotExist:
+            raise self.not_found(self.model)
+        return self.serialize(request, instance, many=False)
+
+
+class TaxonomyProductsView(AsyncCatalogView):
+    """Kategori/marka ürünleri: varlık kontrolü ile ürün sayfası eşzamanlı sorgulanır."""
+    model = None
+    lookup = None
+    serializer_class = ProductSerializer
+    ordering = ProductViewSet.ordering
+
+    async def product_filter(self, pk):
+        return {self.lookup: pk}
+
+    async def get_data(self, request, pk):
+        products = apply_prefetch_plan(
+            Product.objects.filter(isActive=True, **await self.product_filter(pk)), ProductSerializer,
+            self.get_fieldset(request),
+        )
+        paginator = KeysetCursorPagination()
+        page = paginator.prepare_page(products, request, view=self)
+        exists, rows = await gather_queries(
+            lambda: self.model.objects.filter(isActive=True, pk=pk).exists(),
+            lambda: list(products if page is None else page),
+        )
+        if not exists:
+            raise self.not_found(self.model)
+        if page is None:
+            return self.serialize(request, rows)
+        return paginator.get_paginated_data(self.serialize(request, paginator.finish_page(rows)))
+
+
+class CategoryListView(TaxonomyListView):
+    model = Categories
+    serializer_class = CategorySerializer
+
+    @acached_response(Categories)
+    async def get_data(self, request):
+        return await super().get_data(request)
+
+
+class CategoryDetailView(TaxonomyDetailView):
+    model = Categories
+    serializer_class = CategorySerializer
+
+    @acached_response(obj=Categories)
+    async def get_data(self, request, pk):
+        return await super().get_data(request, pk)
+
+
+class CategoryTreeView(AsyncCatalogView):
+    @acached_response(Categories)
+    async def get_data(self, request):
+        return (await sync_to_async(get_category_tree)()).as_nested()
+
+
+class CategoryProductsView(TaxonomyProductsView):
+    model = Categories
+
+    async def product_filter(self, pk):
+        # Alt kategorilerin ürünleri de dahil
+        return {'category_id__in': (await sync_to_async(get_category_tree)()).descendant_ids(pk)}
+
+    # Gövde alt ağaca bağlı: alt kategori ekleme/taşıma yalnızca kategori liste sürümünü artırır
+    @acached_response(Product, Categories, Brands, ProductRating, obj=Categories)
+    async def get_data(self, request, pk):
+        return await super().get_data(request, pk)
+
+
+class BrandListView(TaxonomyListView):
+    model = Brands
+    serializer_class = BrandSerializer
+
+    @acached_response(Brands)
+    async def get_data(self, request):
+        return await super().get_data(request)
+
+
+class BrandDetailView(TaxonomyDetailView):
+    model = Brands
+    serializer_class = BrandSerializer
+
+    @acached_response(obj=Brands)
+    async def get_data(self, request, pk):
+        return await super().get_data(request, pk)
+
+
+class BrandProductsView(TaxonomyProductsView):
+    model = Brands
+    lookup = 'brand_id'
+
+    @acached_response(Product, Categories, ProductRating, obj=Brands)
+    async def get_data(self, request, pk):
+        return await super().get_data(request, pk)
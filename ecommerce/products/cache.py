@@ -0,0 +1,299 @@
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.response import Response
+
+from ecommerce.cdn import purge
+from .models import Brands, Categories, Product, ProductRating
+
+KEY_PREFIX = 'catalog'
+
+# bump_version sonrası gönderilir (sender: model, pks, version: yeni liste sürümü); türetilmiş katmanlar (örn. facet'ler) dinler
+version_bumped = Signal()
+
+# Hit/miss sayaçları süreç içinde tutulur; her istekte cache'e ek bir yazım yapılmaz
+_stats = defaultdict(lambda: {'hit': 0, 'miss': 0, 'not_modified': 0})
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def list_key(model):
+    """Modelin herhangi bir satırı değişince değişen sürüm / surrogate key (örn. `product-list`)."""
+    return f'{model._meta.model_name}-list'
+
+
+def all_key(model):
+    """Hangi satırların değiştiği bilinmeyen toplu yazımlarda değişen sürüm (örn. `product-all`)."""
+    return f'{model._meta.model_name}-all'
+
+
+def object_key(model, pk):
+    return f'{model._meta.model_name}-{pk}'
+
+
+def _version_key(name):
+    return f'{KEY_PREFIX}:version:{name}'
+
+
+def _modified_key(name):
+    return f'{KEY_PREFIX}:modified:{name}'
+
+
+def _fresh_version():
+    # Sürüm anahtarı cache'ten düşerse 1'den başlamak eski girdileri geri getirebilir;
+    # zaman damgası her zaman öncekilerden büyük olur
+    return int(time.time() * 1000)
+
+
+def get_versions(names):
+    """
+    Sürüm adlarının (list_key/all_key/object_key) güncel sürümleri ve son değişim zamanları.
+    Cache'te olmayan sürüm yeni bir zaman damgasıyla başlatılır.
+    """
+    cache = get_cache()
+    keys = [_version_key(n) for n in names] + [_modified_key(n) for n in names]
+    stored = cache.get_many(keys)
+    now = time.time()
+    for name in names:
+        if _version_key(name) not in stored:
+            cache.add(_version_key(name), _fresh_version(), timeout=None)
+            stored[_version_key(name)] = cache.get(_version_key(name))
+        if _modified_key(name) not in stored:
+            cache.add(_modified_key(name), now, timeout=None)
+            stored[_modified_key(name)] = cache.get(_modified_key(name), now)
+    return [stored[_version_key(n)] for n in names], max(stored[_modified_key(n)] for n in names)
+
+
+def bump_version(model, pks=None):
+    """
+    Modele bağlı cache girdilerini ve istemci/CDN doğrulayıcılarını (ETag, Surrogate-Key)
+    geçersiz kılar; queryset.update gibi sinyalsiz yazımlarda da çağrılır. `pks` verilirse yalnız
+    o satırların detay yanıtları, verilmezse modelin tüm detay yanıtları etkilenir.
+    """
+    names = [list_key(model)]
+    names += [object_key(model, pk) for pk in pks] if pks is not None else [all_key(model)]
+    versions = bump_names(names)
+    version_bumped.send(sender=model, pks=pks, version=versions[list_key(model)])
+
+
+def bump_names(names):
+    """
+    Sürüm adlarını artırır ve aynı surrogate key'leri CDN'den düşürür (model dışı adlar dahil).
+    Yeni sürümleri döndürür: {ad: sürüm}.
+    """
+    cache = get_cache()
+    now = time.time()
+    versions = {}
+    for name in names:
+        try:
+            versions[name] = cache.incr(_version_key(name))
+        except ValueError:
+            versions[name] = _fresh_version()
+            cache.set(_version_key(name), versions[name], timeout=None)
+    cache.set_many({_modified_key(name): now for name in names}, timeout=None)
+    purge(names)
+    return versions
+
+
+def _record(endpoint, outcome):
+    with _stats_lock:
+        _stats[endpoint][outcome] += 1
+
+
+def get_stats():
+    """Endpoint bazında hit/miss sayaçları (bu süreç için)."""
+    with _stats_lock:
+        snapshot = {endpoint: dict(counts) for endpoint, counts in _stats.items()}
+    for counts in snapshot.values():
+        total = counts['hit'] + counts['miss']
+        counts['hit_ratio'] = round(counts['hit'] / total, 4) if total else 0
+    return snapshot
+
+
+class Validators:
+    """
+    Bir yanıtın gövdesi üretilmeden hesaplanan doğrulayıcıları: bağlı sürümlerden türeyen ETag,
+    Last-Modified ve yanıtı CDN'de etiketleyen surrogate key'ler (sürüm adlarıyla aynı).
+    """
+    __slots__ = ('cache_key', 'etag', 'last_modified', 'surrogate_keys')
+
+    def __init__(self, request, endpoint, models, obj=None, pk=None):
+        # Model yerine doğrudan sürüm adı da verilebilir (örn. facets.FACETS_VERSION).
+        # `obj` modeli ayrıca listede verilirse yanıt o modelin liste sürümüne de bağlanır
+        # (örn. kategori ürünleri: alt ağaçtaki herhangi bir kategori değişince geçersizleşir).
+        names = [m if isinstance(m, str) else list_key(m) for m in models]
+        if obj is not None:
+            names += [object_key(obj, pk), all_key(obj)]
+        params = sorted(
+            (name, sorted(v for v in request.query_params.getlist(name) if v != ''))
+            for name in request.query_params
+        )
+        params = [p for p in params if p[1]]
+        raw = json.dumps([request.get_host(), request.path, params], separators=(',', ':'))
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        versions, modified = get_versions(names)
+        versions = '.'.join(str(v) for v in versions)
+        self.cache_key = f'{KEY_PREFIX}:response:{endpoint}:{digest}:{versions}'
+        # Aynı URL farklı biçimde (JSON / browsable API) farklı gövde üretir
+        media_type = getattr(getattr(request, 'accepted_renderer', None), 'media_type', '')
+        self.etag = quote_etag(hashlib.sha1(f'{self.cache_key}:{media_type}'.encode()).hexdigest()[:32])
+        self.last_modified = int(modified)
+        self.surrogate_keys = names
+
+    def not_modified(self, request):
+        """If-None-Match (öncelikli) ya da If-Modified-Since karşılanıyorsa True."""
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return if_none_match.strip() == '*' or self.etag in (
+                tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+            )
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return since is not None and self.last_modified <= since
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        response['Last-Modified'] = http_date(self.last_modified)
+        # Tarayıcı her seferinde doğrular (304 ucuz); CDN purge edilene kadar saklar
+        response['Cache-Control'] = f"public, max-age={getattr(settings, 'CATALOG_BROWSER_MAX_AGE', 0)}"
+        response['Surrogate-Control'] = f"max-age={getattr(settings, 'CATALOG_CDN_MAX_AGE', 86400)}"
+        response['Surrogate-Key'] = ' '.join(self.surrogate_keys)
+        return response
+
+    def not_modified_response(self, response_class=Response):
+        return self.apply(response_class(status=304))
+
+
+def conditional_response(*models, obj=None):
+    """
+    Herkese açık GET aksiyonlarına ETag/Last-Modified/Cache-Control/Surrogate-Key ekler ve
+    koşullu isteği serializer'a inmeden 304 ile yanıtlar. `obj`, URL'deki `pk`'nin modelidir:
+    detay yanıtı o satırın kendi sürümüne bağlanır, diğer satırların yazımları ETag'i değiştirmez.
+    """
+    def decorator(method):
+        endpoint = method.__qualname__
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            validators = Validators(request, endpoint, models, obj, kwargs.get('pk'))
+            if validators.not_modified(request):
+                return validators.not_modified_response()
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                validators.apply(response)
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_response(*models, obj=None):
+    """
+    conditional_response'a ek olarak yanıt verisini cache'ler. Girdi, bağlı sürümlerden biri
+    artınca (post_save/post_delete, bump_version) kendiliğinden geçersiz olur; TTL kullanılmaz.
+    """
+    def decorator(method):
+        endpoint = method.__qualname__
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            validators = Validators(request, endpoint, models, obj, kwargs.get('pk'))
+            if validators.not_modified(request):
+                _record(endpoint, 'not_modified')
+                return validators.not_modified_response()
+            cache = get_cache()
+            data = cache.get(validators.cache_key)
+            if data is not None:
+                _record(endpoint, 'hit')
+                return validators.apply(Response(data))
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(validators.cache_key, response.data, timeout=None)
+                validators.apply(response)
+            _record(endpoint, 'miss')
+            return response
+        return wrapper
+    return decorator
+
+
+class NotModified(Exception):
+    """Async view'larda koşullu isteğin 304 ile kısa devre edilmesi (bkz. AsyncCatalogView.dispatch)."""
+
+
+def aconditional_response(*models, obj=None):
+    """conditional_response'un async view karşılığı (gövde cache'lenmez)."""
+    def decorator(method):
+        endpoint = method.__qualname__
+
+        @wraps(method)
+        async def wrapper(self, request, *args, **kwargs):
+            self.validators = await sync_to_async(Validators)(request, endpoint, models, obj, kwargs.get('pk'))
+            if self.validators.not_modified(request):
+                raise NotModified
+            return await method(self, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def acached_response(*models, obj=None):
+    """
+    cached_response'un async view karşılığı. Sarılan metot Response değil yanıt verisini
+    döndürür; doğrulayıcılar `view.validators`'a yazılır, koşullu istek NotModified fırlatır.
+    """
+    def decorator(method):
+        endpoint = method.__qualname__
+
+        @wraps(method)
+        async def wrapper(self, request, *args, **kwargs):
+            cache = get_cache()
+
+            def lookup():
+                validators = Validators(request, endpoint, models, obj, kwargs.get('pk'))
+                if validators.not_modified(request):
+                    return validators, None
+                return validators, cache.get(validators.cache_key)
+
+            # Sürüm okuması ve girdi tek thread geçişinde (Redis çağrıları event loop'u bloklamaz)
+            validators, data = await sync_to_async(lookup)()
+            self.validators = validators
+            if validators.not_modified(request):
+                _record(endpoint, 'not_modified')
+                raise NotModified
+            if data is not None:
+                _record(endpoint, 'hit')
+                return data
+            data = await method(self, request, *args, **kwargs)
+            await cache.aset(validators.cache_key, data, timeout=None)
+            _record(endpoint, 'miss')
+            return data
+        return wrapper
+    return decorator
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Categories)
+@receiver([post_save, post_delete], sender=Brands)
+@receiver([post_save, post_delete], sender=ProductRating)
+def bump_catalog_version(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pk = instance.pk  # post_delete sonrası örneğin pk'si None olur
+    transaction.on_commit(lambda: bump_version(sender, [pk]))
+    if sender is ProductRating:
+        # Puan sayaçları ürün satırında; ürünün detay yanıtı da değişir
+        transaction.on_commit(lambda: bump_version(Product, [instance.product_id]))
@@ -0,0 +1,241 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, Min, Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ecommerce.aio import gather_queries
+from jobs.queue import task
+from .cache import KEY_PREFIX, bump_names, get_cache, version_bumped
+from .filters import IN_STOCK, ON_SALE, product_filters
+from .models import Brands, Product
+from .search import search_condition
+from .tree import get_category_tree
+
+# filter_options yanıtlarının bağlı olduğu sürüm: önceden hesaplanan katman yenilenince artar
+FACETS_VERSION = 'product-facets'
+GLOBAL_KEY = f'{KEY_PREFIX}:facets:global'
+PENDING_KEY = f'{KEY_PREFIX}:facets:pending'
+
+# Fiyatı, stok ve indirim filtreleri aynı sorguda koşullu sayımla hesaplanır
+TOGGLES = ('price', 'in_stock', 'on_sale')
+STEP_MULTIPLIERS = (1, 2, Decimal('2.5'), 5, 10)
+MIN_STEP = Decimal('0.01')
+
+
+def facet_filters(params, tree):
+    """Liste filtreleri + arama koşulu; boşsa istek filtresizdir (önceden hesaplanan katman)."""
+    filters = product_filters(params, tree)
+    search = search_condition(params.get('search') or '')
+    if search:
+        filters['search'] = search
+    return filters
+
+
+def _where(filters, *excluded):
+    condition = Q(isActive=True)
+    for name, value in filters.items():
+        if name not in excluded:
+            condition &= value
+    return condition
+
+
+def _count(condition):
+    return Count('pk', filter=condition) if condition else Count('pk')
+
+
+def price_buckets(low, high, count):
+    """
+    [low, high] aralığını yaklaşık `count` eşit dilime böler; dilim genişliği 1, 2, 2.5, 5 × 10^n
+    değerlerinden seçilir ki sınırlar yuvarlak olsun. [(alt, üst), ...]; üst sınır hariçtir.
+    """
+    if low is None or high is None:
+        return []
+    low, high = Decimal(low), Decimal(high)
+    raw = (high - low) / count
+    step = MIN_STEP
+    if raw > MIN_STEP:
+        magnitude = Decimal(1).scaleb(raw.adjusted())
+        step = next(m * magnitude for m in STEP_MULTIPLIERS if m * magnitude >= raw)
+    buckets, lower = [], (low // step) * step
+    while lower <= high:
+        buckets.append((lower, lower + step))
+        lower += step
+    return buckets
+
+
+def first_pass(filters):
+    """
+    Birbirinden bağımsız üç sorgu: marka ve kategori GROUP BY'ları ile toplam/stok/indirim/fiyat
+    aralığı. Her boyut kendi filtresi dışarıda bırakılarak sayılır (disjunctive facet): bir marka
+    seçiliyken diğer markaların sayıları da görünür.
+    """
+    toggles = {name: filters[name] for name in TOGGLES if name in filters}
+
+    def without(name):
+        condition = Q()
+        for other, value in toggles.items():
+            if other != name:
+                condition &= value
+        return condition
+
+    def brands():
+        rows = Product.objects.filter(_where(filters, 'brand')).values('brand_id').annotate(count=Count('pk'))
+        return {row['brand_id']: row['count'] for row in rows.order_by()}
+
+    def categories():
+        rows = Product.objects.filter(_where(filters, 'category')).values('category_id').annotate(count=Count('pk'))
+        return {row['category_id']: row['count'] for row in rows.order_by()}
+
+    def stats():
+        return Product.objects.filter(_where(filters, *TOGGLES)).aggregate(
+            total=_count(without(None)),
+            in_stock=_count(without('in_stock') & IN_STOCK),
+            on_sale=_count(without('on_sale') & ON_SALE),
+            min_price=Min('price', filter=without('price') or None),
+            max_price=Max('price', filter=without('price') or None),
+        )
+
+    return brands, categories, stats
+
+
+def histogram_pass(filters, stats):
+    """Fiyat dilimleri (fiyat filtresi hariç); sınırlar ilk geçişteki min/max fiyattan türetilir."""
+    buckets = price_buckets(
+        stats['min_price'], stats['max_price'], getattr(settings, 'CATALOG_FACETS_PRICE_BUCKETS', 10),
+    )
+
+    def histogram():
+        if not buckets:
+            return []
+        counts = Product.objects.filter(_where(filters, 'price')).aggregate(**{
+            f'b{i}': Count('pk', filter=Q(price__gte=lower, price__lt=upper))
+            for i, (lower, upper) in enumerate(buckets)
+        })
+        return [(lower, upper, counts[f'b{i}']) for i, (lower, upper) in enumerate(buckets)]
+
+    return histogram
+
+
+def count_facets(filters):
+    """Ham facet sayıları; toplam 4 sorgu (ilk geçiş + fiyat dilimleri)."""
+    brands, categories, stats = (query() for query in first_pass(filters))
+    return {'brands': brands, 'categories': categories, **stats, 'histogram': histogram_pass(filters, stats)()}
+
+
+def active_brands():
+    return dict(Brands.objects.filter(isActive=True).values_list('id', 'name'))
+
+
+def format_facets(counts, tree, brand_names):
+    """
+    Ham sayıları yanıta çevirir. Ürün yalnızca yaprağa bağlı olsa da kategori sayıları ağaç
+    boyunca üstlere toplanır; pasif ya da pasif bir üstün altındaki kategoriler ve eşleşmesi
+    olmayan kategori/markalar listelenmez.
+    """
+    category_counts = defaultdict(int)
+    for pk, count in counts['categories'].items():
+        row = tree.by_id.get(pk)
+        for ancestor in ([int(p) for p in row['path'].split('/') if p] if row else [pk]):
+            category_counts[ancestor] += count
+
+    def visible(row):
+        return all(tree.by_id.get(int(p), {'isActive': False})['isActive'] for p in row['path'].split('/') if p)
+
+    categories = [
+        {'id': row['id'], 'name': row['name'], 'parent': row['mainCategory_id'], 'count': category_counts[row['id']]}
+        # Menüdeki gibi derinlik, sonra id sırası (bkz. CategoryTree.as_nested)
+        for row in sorted(tree.rows, key=lambda r: (r['depth'], r['id']))
+        if category_counts.get(row['id']) and visible(row)
+    ]
+    brands = sorted(
+        (
+            {'id': pk, 'name': brand_names[pk], 'count': count}
+            for pk, count in counts['brands'].items() if pk in brand_names and count
+        ),
+        key=lambda brand: (-brand['count'], brand['name']),
+    )
+    return {
+        'categories': categories,
+        'brands': brands,
+        'price_range': {'min_price': counts['min_price'], 'max_price': counts['max_price']},
+        'price_histogram': [
+            {'min': lower, 'max': upper, 'count': count} for lower, upper, count in counts['histogram']
+        ],
+        'total': counts['total'],
+        'in_stock': counts['in_stock'],
+        'on_sale': counts['on_sale'],
+    }
+
+
+def store_global_counts():
+    """Filtresiz katalog sayılarını hesaplayıp cache'e yazar."""
+    cache = get_cache()
+    cache.delete(PENDING_KEY)  # hesaplama sırasındaki yazımlar yeni bir yenileme planlayabilsin
+    counts = count_facets({})
+    cache.set(GLOBAL_KEY, counts, timeout=None)
+    return counts
+
+
+def refresh_global_counts():
+    """Katmanı yeniler ve filter_options yanıtlarının sürümünü artırır (cache, ETag, CDN)."""
+    counts = store_global_counts()
+    bump_names([FACETS_VERSION])
+    return counts
+
+
+def get_global_counts():
+    """Önceden hesaplanmış filtresiz sayılar; cache'te yoksa (ilk istek, cache temizliği) hesaplanır."""
+    counts = get_cache().get(GLOBAL_KEY)
+    return store_global_counts() if counts is None else counts
+
+
+def get_facets(params, tree=None):
+    """
+    Verilen liste filtreleri için facet yanıtı. Filtresiz istek önceden hesaplanan katmandan,
+    filtreli istek 4 gruplu sorgu + marka adlarıyla hesaplanır.
+    """
+    tree = tree or get_category_tree()
+    filters = facet_filters(params, tree)
+    counts = count_facets(filters) if filters else get_global_counts()
+    return format_facets(counts, tree, active_brands())
+
+
+async def aget_facets(params):
+    """get_facets'in async karşılığı; bağımsız sorgular eşzamanlı çalışır."""
+    tree = await sync_to_async(get_category_tree)()
+    filters = facet_filters(params, tree)
+    if not filters:
+        counts, brand_names = await gather_queries(get_global_counts, active_brands)
+        return format_facets(counts, tree, brand_names)
+    brands, categories, stats, brand_names = await gather_queries(*first_pass(filters), active_brands)
+    (histogram,) = await gather_queries(histogram_pass(filters, stats))
+    counts = {'brands': brands, 'categories': categories, **stats, 'histogram': histogram}
+    return format_facets(counts, tree, brand_names)
+
+
+@task('catalog.refresh_facets', batch_size=100)
+def refresh_facets(payloads):
+    # Kuyrukta biriken yenileme istekleri tek hesaplamayla karşılanır
+    refresh_global_counts()
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+@receiver(version_bumped, sender=Product)
+def schedule_facet_refresh(sender, **kwargs):
+    """
+    Ürün yazımlarından sonra filtresiz sayıları yeniler. Her yazımda tam tarama yapılmasın diye
+    yenileme CATALOG_FACETS_MAX_AGE saniye ertelenir ve bu sürede tek iş planlanır; 0 ise hemen
+    (senkron) yenilenir.
+    """
+    max_age = getattr(settings, 'CATALOG_FACETS_MAX_AGE', 60)
+    if max_age <= 0:
+        refresh_global_counts()
+    elif get_cache().add(PENDING_KEY, True, timeout=max_age * 10):
+        refresh_facets.enqueue(run_at=timezone.now() + timedelta(seconds=max_age))
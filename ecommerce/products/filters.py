@@ -0,0 +1,76 @@
+import math
+
+from django.db.models import Q
+
+from .search import search_products
+from .tree import get_category_tree
+
+IN_STOCK = Q(stock__gt=0)
+ON_SALE = Q(discount_price__isnull=False)
+
+
+def is_true(value):
+    return bool(value) and value.lower() == 'true'
+
+
+def parse_price(value):
+    """Fiyat parametresini float'a çevirir; geçersiz ve sonlu olmayan (nan, inf) değerler için None."""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if math.isfinite(price) else None
+
+
+def product_filters(params, tree=None):
+    """
+    Arama dışındaki liste filtrelerini adlarıyla birlikte koşul olarak döndürür: {ad: Q}.
+    Yalnızca istekte verilen filtreler yer alır; facet sayımı her boyutu kendi filtresi
+    olmadan hesaplayabilsin diye ayrı tutulur (bkz. products/facets.py).
+    """
+    filters = {}
+
+    # Kategori filtresi: alt kategorilerin ürünleri de dahil (bkz. products/tree.py)
+    category = params.get('category')
+    if category:
+        filters['category'] = Q(category_id__in=(tree or get_category_tree()).descendant_ids(category))
+
+    # Marka filtresi
+    brand = params.get('brand')
+    if brand:
+        try:
+            filters['brand'] = Q(brand_id=int(brand))
+        except ValueError:
+            pass
+
+    # Fiyat aralığı filtresi (geçersiz değerler yok sayılır)
+    price = Q()
+    for name, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+        value = parse_price(params.get(name))
+        if value is not None:
+            price &= Q(**{lookup: value})
+    if price:
+        filters['price'] = price
+
+    # Stok durumu, indirim ve ana sayfa gösterimi
+    if is_true(params.get('in_stock')):
+        filters['in_stock'] = IN_STOCK
+    if is_true(params.get('on_sale')):
+        filters['on_sale'] = ON_SALE
+    if is_true(params.get('main_window')):
+        filters['main_window'] = Q(main_window_display=True)
+
+    return filters
+
+
+def filter_products(queryset, params, tree=None):
+    """
+    Ürün listesi query parametrelerini uygular (senkron ve async view'lar ortak kullanır).
+    `tree` verilmezse kategori ağacı burada okunur; async view'lar önceden thread'de okuyup geçer.
+    """
+    search = params.get('search')
+    if search:
+        queryset = search_products(queryset, search)
+    for condition in product_filters(params, tree).values():
+        queryset = queryset.filter(condition)
+    return queryset
@@ -0,0 +1,567 @@
+import logging
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.dispatch import receiver
+
+from ecommerce.metrics import registry
+from .cache import KEY_PREFIX, get_cache, get_versions, list_key, version_bumped
+from .filters import is_true, parse_price
+from .models import Product
+from .tree import get_category_tree
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_TTL = 3600
+MAX_JOURNAL_GAP = 1000
+# Günlükte eksik sürüm bu kadar saniye sonra da gelmediyse (cache'ten düşmüş) indeks yeniden kurulur
+JOURNAL_STALL_SECONDS = 5
+
+# İndeksin yanıtlayabildiği parametreler; başka bir filtre (search, isActive …) gelirse ORM kullanılır
+FILTER_PARAMS = {'category', 'brand', 'min_price', 'max_price', 'in_stock', 'on_sale', 'main_window'}
+PASSIVE_PARAMS = {'ordering', 'cursor', 'page_size', 'fields', 'omit'}
+SORT_FIELDS = ('created_at', 'price', 'rating_average')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ROW_FIELDS = (
+    'id', 'price', 'stock', 'rating_average', 'created_at', 'discount_price', 'main_window_display',
+    'category_id', 'brand_id',
+)
+# Slot başına sütun baytları: id, fiyat (kuruş), oluşturma (µs) 8'er; stok, kategori, marka 4'er;
+# puan×100 2; üç sıralama dizisi 4'er
+ROW_BYTES = 3 * 8 + 3 * 4 + 2 + 3 * 4
+UNBOUNDED = 1 << 62
+
+_NONZERO = re.compile(rb'[^\x00]')
+
+
+def _cents(value):
+    return int(value * 100)
+
+
+def _micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _journal_key(version):
+    return f'{KEY_PREFIX}:index:change:{version}'
+
+
+def _bitmap(slots):
+    """`slots` konumlarındaki bitleri 1 olan int bitmap."""
+    if not slots:
+        return 0
+    buffer = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _iter_bits(bitmap):
+    """Bitmap'teki 1 bitlerin konumları (sıfır baytlar C'de atlanır)."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    for match in _NONZERO.finditer(data):
+        base, byte = match.start() * 8, data[match.start()]
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield base + bit
+
+
+class IndexQuery:
+    """İstek parametrelerinin indeks karşılığı; ürün listesi filtreleriyle (products/filters.py) aynı anlam."""
+    __slots__ = ('categories', 'brand', 'min_cents', 'max_cents', 'in_stock', 'on_sale', 'main_window')
+
+    def __init__(self):
+        self.categories = self.brand = None
+        self.min_cents, self.max_cents = -UNBOUNDED, UNBOUNDED
+        self.in_stock = self.on_sale = self.main_window = False
+
+    @classmethod
+    def from_params(cls, params, tree=None):
+        """Desteklenmeyen parametre varsa None (örn. arama, `isActive`)."""
+        if {name for name in params if params.get(name) != ''} - FILTER_PARAMS - PASSIVE_PARAMS:
+            return None
+        query = cls()
+        category = params.get('category')
+        if category:
+            query.categories = (tree or get_category_tree()).descendant_ids(category)
+        brand = params.get('brand')
+        if brand:
+            try:
+                query.brand = int(brand)
+            except ValueError:
+                return None  # DjangoFilterBackend 400 döndürür
+        for name, attr, rounding in (('min_price', 'min_cents', 'ROUND_CEILING'), ('max_price', 'max_cents', 'ROUND_FLOOR')):
+            # ORM filtresiyle aynı ayrıştırma (parse_price); geçersiz değer yok sayılır
+            value = parse_price(params.get(name))
+            if value is not None:
+                setattr(query, attr, int((Decimal(repr(value)) * 100).to_integral_value(rounding)))
+        query.in_stock = is_true(params.get('in_stock'))
+        query.on_sale = is_true(params.get('on_sale'))
+        query.main_window = is_true(params.get('main_window'))
+        return query
+
+    @property
+    def price_bounded(self):
+        return self.min_cents != -UNBOUNDED or self.max_cents != UNBOUNDED
+
+
+class ColumnStore:
+    """
+    Aktif ürünlerin sütun deposu. Her ürün bir slot'tur: fiyat (kuruş), stok, puan×100, oluşturma
+    zamanı (µs), kategori ve marka `array` sütunlarında; kategori/marka/stok/indirim/ana sayfa
+    kümeleri slot başına bir bit olan int bitmap'lerde, sıralamalar (değer, id) sıralı slot
+    dizilerinde tutulur. Silinen ürünün slot'u boş kalır (tombstone); yeniden kurulumda sıkıştırılır.
+    """
+    __slots__ = (
+        'ids', 'columns', 'stock', 'category', 'brand', 'orders', 'categories', 'brands',
+        'alive', 'in_stock', 'on_sale', 'main_window', 'late', 'removed',
+    )
+
+    def __init__(self):
+        self.ids = array('q')
+        self.columns = {'price': array('q'), 'rating_average': array('h'), 'created_at': array('q')}
+        self.stock, self.category, self.brand = array('l'), array('l'), array('l')
+        self.orders = {field: array('l') for field in SORT_FIELDS}
+        self.categories, self.brands = {}, {}
+        self.alive = self.in_stock = self.on_sale = self.main_window = 0
+        self.late = {}  # id sırasını bozan (sonradan eklenen küçük id'li) ürünlerin slot'ları
+        self.removed = 0
+
+    @classmethod
+    def load(cls, rows, max_bytes):
+        """id sıralı satırlardan kurar; tahmini bellek `max_bytes`'ı aşarsa None."""
+        store = cls()
+        groups = {'category': {}, 'brand': {}, 'in_stock': [], 'on_sale': [], 'main_window': []}
+        for slot, row in enumerate(rows):
+            _, _, stock, _, _, discount, main_window, category, brand = row
+            store._append(row)
+            groups['category'].setdefault(category or 0, []).append(slot)
+            groups['brand'].setdefault(brand or 0, []).append(slot)
+            if stock > 0:
+                groups['in_stock'].append(slot)
+            if discount is not None:
+                groups['on_sale'].append(slot)
+            if main_window:
+                groups['main_window'].append(slot)
+        count = len(store.ids)
+        if cls.estimate(count, len(groups['category']) + len(groups['brand'])) > max_bytes:
+            return None
+        store.alive = (1 << count) - 1
+        store.categories = {key: _bitmap(slots) for key, slots in groups['category'].items()}
+        store.brands = {key: _bitmap(slots) for key, slots in groups['brand'].items()}
+        store.in_stock = _bitmap(groups['in_stock'])
+        store.on_sale = _bitmap(groups['on_sale'])
+        store.main_window = _bitmap(groups['main_window'])
+        # Slot'lar id sırasında; kararlı sıralama eşit değerlerde id sırasını korur
+        for field in SORT_FIELDS:
+            store.orders[field] = array('l', sorted(range(count), key=store.columns[field].__getitem__))
+        return store
+
+    @staticmethod
+    def estimate(count, keys):
+        # Her kategori/marka ve dört küme bitmap'i en kötü durumda slot sayısı kadar bit tutar
+        return count * ROW_BYTES + (keys + 4) * (count // 8 + 1)
+
+    def nbytes(self):
+        arrays = [self.ids, self.stock, self.category, self.brand, *self.columns.values(), *self.orders.values()]
+        bitmaps = [self.alive, self.in_stock, self.on_sale, self.main_window, *self.categories.values(), *self.brands.values()]
+        return (
+            sum(a.itemsize * len(a) for a in arrays)
+            + sum((bitmap.bit_length() + 7) // 8 for bitmap in bitmaps)
+            + 100 * len(self.late)
+        )
+
+    @property
+    def size(self):
+        return len(self.orders['price'])
+
+    def _append(self, row):
+        pk, price, stock, rating, created, _, _, category, brand = row
+        self.ids.append(pk)
+        self.columns['price'].append(_cents(price))
+        self.columns['rating_average'].append(_cents(rating))
+        self.columns['created_at'].append(_micros(created))
+        self.stock.append(stock)
+        self.category.append(category or 0)
+        self.brand.append(brand or 0)
+
+    def _slot(self, pk):
+        if pk in self.late:
+            return self.late[pk]
+        position = bisect_left(self.ids, pk)
+        if position < len(self.ids) and self.ids[position] == pk:
+            return position
+        return None
+
+    def sort_key(self, field):
+        column, ids = self.columns[field], self.ids
+        return lambda slot: (column[slot], ids[slot])
+
+    def _unlink(self, slot):
+        """Slot'u sıralama dizilerinden ve bitmap'lerden çıkarır."""
+        for field in SORT_FIELDS:
+            order = self.orders[field]
+            position = bisect_left(order, self.sort_key(field)(slot), key=self.sort_key(field))
+            if position < len(order) and order[position] == slot:
+                del order[position]
+        clear = ~(1 << slot)
+        self.categories[self.category[slot]] &= clear
+        self.brands[self.brand[slot]] &= clear
+        self.alive &= clear
+        self.in_stock &= clear
+        self.on_sale &= clear
+        self.main_window &= clear
+
+    def _link(self, slot, row):
+        _, price, stock, rating, created, discount, main_window, category, brand = row
+        self.columns['price'][slot] = _cents(price)
+        self.columns['rating_average'][slot] = _cents(rating)
+        self.columns['created_at'][slot] = _micros(created)
+        self.stock[slot] = stock
+        self.category[slot], self.brand[slot] = category or 0, brand or 0
+        bit = 1 << slot
+        self.categories[category or 0] = self.categories.get(category or 0, 0) | bit
+        self.brands[brand or 0] = self.brands.get(brand or 0, 0) | bit
+        self.alive |= bit
+        if stock > 0:
+            self.in_stock |= bit
+        if discount is not None:
+            self.on_sale |= bit
+        if main_window:
+            self.main_window |= bit
+        for field in SORT_FIELDS:
+            order, key = self.orders[field], self.sort_key(field)
+            order.insert(bisect_left(order, key(slot), key=key), slot)
+
+    def upsert(self, pk, row):
+        """Ürünü günceller; `row` None ise (silinmiş ya da pasif) çıkarır."""
+        slot = self._slot(pk)
+        alive = slot is not None and self.alive >> slot & 1
+        if alive:
+            self._unlink(slot)
+        if row is None:
+            self.removed += bool(alive)
+            return
+        if slot is None:
+            slot = len(self.ids)
+            if self.ids and pk < self.ids[-1]:
+                self.late[pk] = slot
+            self._append(row)
+        elif not alive:
+            self.removed -= 1
+        self._link(slot, row)
+
+    def mask(self, query):
+        bitmap = self.alive
+        if query.categories is not None:
+            selected = 0
+            for pk in query.categories:
+                selected |= self.categories.get(pk, 0)
+            bitmap &= selected
+        if query.brand is not None:
+            bitmap &= self.brands.get(query.brand, 0)
+        if query.in_stock:
+            bitmap &= self.in_stock
+        if query.on_sale:
+            bitmap &= self.on_sale
+        if query.main_window:
+            bitmap &= self.main_window
+        return bitmap
+
+    def page(self, query, field, descending, start, limit):
+        """
+        `field` sırasında (eşitlikte id), `start` (değer, id) anahtarından sonraki en fazla `limit`
+        eşleşen ürünün id'leri.
+        """
+        bitmap = self.mask(query)
+        count = bitmap.bit_count()
+        if not count:
+            return []
+        order, key = self.orders[field], self.sort_key(field)
+        prices = self.columns['price']
+        low, high = query.min_cents, query.max_cents
+
+        # Yürünecek aralık: cursor'dan sonrası; fiyat sıralamasında fiyat aralığıyla da daraltılır
+        begin, end = 0, len(order)
+        density = count / len(order)
+        if query.price_bounded:
+            price_order, price_key = self.orders['price'], self.sort_key('price')
+            first = bisect_left(price_order, (low, -1), key=price_key)
+            last = bisect_right(price_order, (high, UNBOUNDED), key=price_key)
+            if field == 'price':
+                begin, end = first, last
+            else:
+                density *= (last - first) / len(order)  # bağımsızlık varsayımıyla
+        if start is not None:
+            if descending:
+                end = min(end, bisect_left(order, start, key=key))
+            else:
+                begin = max(begin, bisect_right(order, start, key=key))
+        if begin >= end:
+            return []
+
+        # Seçici filtrelerde sıralı diziyi yürümek yerine eşleşen slot'lar toplanıp sıralanır
+        if count < min(end - begin, limit / density if density else UNBOUNDED):
+            slots = [slot for slot in _iter_bits(bitmap) if low <= prices[slot] <= high]
+            if start is not None:
+                slots = [slot for slot in slots if (key(slot) < start if descending else key(slot) > start)]
+            slots.sort(key=key, reverse=descending)
+            return [self.ids[slot] for slot in slots[:limit]]
+
+        mask = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+        size, ids, found = len(mask), self.ids, []
+        for position in (range(end - 1, begin - 1, -1) if descending else range(begin, end)):
+            slot = order[position]
+            if slot >> 3 < size and mask[slot >> 3] >> (slot & 7) & 1 and low <= prices[slot] <= high:
+                found.append(ids[slot])
+                if len(found) == limit:
+                    break
+        return found
+
+
+class CatalogIndex:
+    """
+    Ürün listesinin en sık sorgu şekli (kategori, marka, fiyat aralığı, stok, indirim, ana sayfa
+    filtreleri + created_at/price/rating_average sıralaması + cursor) için süreç içi indeks.
+    Filtre ve sıralama bellekte çözülür; sonuç sayfanın id listesidir, satırlar veritabanından
+    `pk IN (...)` ile okunur.
+
+    Yazımlar `bump_version(Product, pks)` ile sürüm başına günlüğe (paylaşılan cache) yazılır; her
+    süreç sorgudan önce kaçırdığı sürümlerin ürünlerini tek sorguda okuyup uygular. Kurulum arka
+    planda yapılır ve o sırada liste ORM ile sunulur. Tahmini bellek CATALOG_INDEX_MAX_BYTES'ı
+    aşarsa indeks kapanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._building = False
+        self._stalled_since = None
+        self.store = None
+        self.version = None
+        self.disabled_reason = ''
+        self.builds = 0
+        self.lookups = {'hit': 0, 'fallback': 0}
+
+    @property
+    def max_bytes(self):
+        return getattr(settings, 'CATALOG_INDEX_MAX_BYTES', 64 * 1024 * 1024)
+
+    def _disable(self, reason):
+        with self._lock:
+            self.store = None
+            self.disabled_reason = reason
+        logger.warning('Katalog indeksi kapatıldı: %s', reason)
+
+    def rebuild(self):
+        """İndeksi veritabanından baştan kurar; kurulum sırasında eski depo kullanılmaya devam eder."""
+        (version,), _ = get_versions([list_key(Product)])
+        rows = Product.objects.filter(isActive=True).order_by('id').values_list(*ROW_FIELDS)
+        store = ColumnStore.load(rows.iterator(chunk_size=10000), self.max_bytes)
+        if store is None:
+            self._disable('tahmini bellek CATALOG_INDEX_MAX_BYTES sınırını aşıyor')
+            return False
+        with self._lock:
+            self.store, self.version, self.disabled_reason = store, version, ''
+            self._stalled_since = None
+            self.builds += 1
+        logger.info('Katalog indeksi kuruldu: %d ürün, ~%d bayt', store.size, store.nbytes())
+        return True
+
+    def apply(self, pks):
+        """Verilen ürünleri veritabanından yeniden okuyup uygular (silinen/pasif olanlar çıkarılır)."""
+        rows = {row[0]: row for row in Product.objects.filter(pk__in=pks, isActive=True).values_list(*ROW_FIELDS)}
+        with self._lock:
+            if self.store is None:
+                return
+            for pk in pks:
+                self.store.upsert(pk, rows.get(pk))
+            if self.store.nbytes() > self.max_bytes:
+                self._disable('bellek kullanımı CATALOG_INDEX_MAX_BYTES sınırını aştı')
+
+    def catch_up(self):
+        """
+        Paylaşılan sürüm günlüğünden kaçırılan yazımları uygular. Günlük kopuksa (cache temizliği,
+        toplu yazım, çok geride kalma) False döner; indeks yeniden kurulmalıdır.
+        """
+        (current,), _ = get_versions([list_key(Product)])
+        version = self.version
+        if current == version:
+            return True
+        if current < version or current - version > MAX_JOURNAL_GAP:
+            return False
+        versions = range(version + 1, current + 1)
+        entries = get_cache().get_many([_journal_key(v) for v in versions])
+        pks, applied = set(), version
+        for v in versions:
+            entry = entries.get(_journal_key(v))
+            if entry == '*':
+                return False
+            if entry is None:
+                # Yazan süreç günlüğü sürüm artışının hemen ardından yazar; kısa bir gecikme beklenir
+                self._stalled_since = self._stalled_since or time.monotonic()
+                if time.monotonic() - self._stalled_since > JOURNAL_STALL_SECONDS:
+                    return False
+                break
+            pks.update(entry)
+            applied = v
+        else:
+            self._stalled_since = None
+        if pks:
+            self.apply(sorted(pks))
+        with self._lock:
+            if self.version == version:
+                self.version = applied
+        return True
+
+    def ensure_ready(self):
+        """Hazırsa günlüğü uygular ve True döner; değilse arka planda kurulumu başlatır."""
+        if self.disabled_reason:
+            return False
+        if self.store is not None and self.catch_up():
+            if self.store is not None and self.store.removed > self.store.size // 4:
+                self.build_in_background()  # tombstone'lar çoğaldı; bu arada indeks kullanılmaya devam eder
+            return self.store is not None
+        with self._lock:
+            self.store = None
+        self.build_in_background()
+        return False
+
+    def build_in_background(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+
+        def build():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('Katalog indeksi kurulamadı')
+            finally:
+                self._building = False
+                close_old_connections()
+
+        threading.Thread(target=build, name='catalog-index', daemon=True).start()
+
+    def page_ids(self, query, ordering, cursor_values, reverse, limit):
+        """
+        `ordering` (örn. ['-created_at', '-pk']) sırasında, cursor'dan sonraki en fazla `limit` ürün
+        id'si; KeysetCursorPagination'ın veritabanına göndereceği sorguyla aynı sıra ve küme.
+        `cursor_values` sayfalayıcının alan tiplerine çevirdiği değerlerdir (datetime, Decimal, int).
+        Sıralama desteklenmiyorsa None.
+        """
+        if len(ordering) != 2 or ordering[0].lstrip('-') not in SORT_FIELDS:
+            return None
+        field = ordering[0].lstrip('-')
+        start = None
+        if cursor_values is not None:
+            try:
+                value = cursor_values[0]
+                value = _micros(value) if field == 'created_at' else _cents(value)
+                start = (value, int(cursor_values[1]))
+            except (TypeError, ValueError, ArithmeticError):
+                return None
+        with self._lock:
+            if self.store is None:
+                return None
+            return self.store.page(query, field, ordering[0].startswith('-') != reverse, start, limit)
+
+    def lookup(self, params, paginator):
+        """
+        Hazırlanmış (prepare_page) sayfalayıcı için sayfa id'leri; indeks hazır değilse ya da
+        istek desteklenmiyorsa None (çağıran ORM'e döner).
+        """
+        query = IndexQuery.from_params(params)
+        ids = None
+        if query is not None and self.ensure_ready():
+            cursor = paginator.cursor['v'] if paginator.cursor else None
+            ids = self.page_ids(query, paginator.ordering, cursor, paginator.reverse, paginator.page_size + 1)
+        with self._lock:
+            self.lookups['fallback' if ids is None else 'hit'] += 1
+        return ids
+
+    def collect(self):
+        with self._lock:
+            store = self.store
+            lines = [
+                '# HELP catalog_index_products İndeksteki aktif ürün sayısı',
+                '# TYPE catalog_index_products gauge',
+                f'catalog_index_products {store.size if store else 0}',
+                '# HELP catalog_index_bytes İndeksin tahmini bellek kullanımı',
+                '# TYPE catalog_index_bytes gauge',
+                f'catalog_index_bytes {store.nbytes() if store else 0}',
+                '# HELP catalog_index_lookups_total Sayfalı ürün listesinde indeks kullanımı ya da ORM\'e dönüş',
+                '# TYPE catalog_index_lookups_total counter',
+            ]
+            lines += [f'catalog_index_lookups_total{{result="{name}"}} {count}' for name, count in self.lookups.items()]
+        return lines
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_catalog_index():
+    """CATALOG_INDEX_ENABLED ise süreç başına tek indeks, değilse None."""
+    global _index
+    if not getattr(settings, 'CATALOG_INDEX_ENABLED', False):
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CatalogIndex()
+                registry.add_collector(_index.collect)
+    return _index
+
+
+def _ordered(rows, ids):
+    by_pk = {row.pk: row for row in rows}
+    # İndeks bu sürecin henüz görmediği bir yazımın gerisindeyse satır filtreye artık uymayabilir; atlanır
+    return [by_pk[pk] for pk in ids if pk in by_pk]
+
+
+def paginate_with_index(paginator, queryset, request, view=None):
+    """
+    `paginator.paginate_queryset` karşılığı: sayfa id'leri indeksten, satırlar (prefetch planıyla)
+    tek `pk IN (...)` sorgusuyla okunur. İndeks kullanılamazsa normal sayfa sorgusu çalışır.
+    """
+    page = paginator.prepare_page(queryset, request, view)
+    if page is None:
+        return None
+    index = get_catalog_index()
+    ids = index.lookup(request.query_params, paginator) if index is not None else None
+    if ids is None:
+        return paginator.finish_page(list(page))
+    return paginator.finish_page(_ordered(queryset.filter(pk__in=ids).order_by(), ids))
+
+
+async def apaginate_with_index(paginator, queryset, request, view=None):
+    """paginate_with_index'in async karşılığı."""
+    page = paginator.prepare_page(queryset, request, view)
+    if page is None:
+        return None
+    index = get_catalog_index()
+    ids = await sync_to_async(index.lookup)(request.query_params, paginator) if index is not None else None
+    if ids is None:
+        return paginator.finish_page([row async for row in page])
+    return paginator.finish_page(_ordered([row async for row in queryset.filter(pk__in=ids).order_by()], ids))
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+@receiver(version_bumped, sender=Product)
+def journal_product_changes(sender, pks=None, version=None, **kwargs):
+    """Ürün yazımlarını sürüm numarasıyla günlüğe yazar; süreçler indekslerini buradan günceller."""
+    if not getattr(settings, 'CATALOG_INDEX_ENABLED', False) or version is None:
+        return
+    get_cache().set(_journal_key(version), sorted(pks) if pks is not None else '*', timeout=JOURNAL_TTL)
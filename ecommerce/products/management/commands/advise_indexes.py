@@ -0,0 +1,274 @@
+import hashlib
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.db.migrations import AddIndex, Migration
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.db.models.lookups import Exact, GreaterThan, GreaterThanOrEqual, IsNull, LessThan, LessThanOrEqual
+from django.db.models.sql.where import AND
+from rest_framework.test import APIClient
+
+from ecommerce.pagination import record_page_querysets
+from products.models import Brands, Categories
+
+RANGE_LOOKUPS = (GreaterThan, GreaterThanOrEqual, LessThan, LessThanOrEqual)
+
+# Katalog ve sipariş view'larının gerçek filtre kombinasyonları; {category}, {brand} veritabanından doldurulur
+SHAPES = [
+    ('ürünler', '/api/products/products/', {}),
+    ('ürünler: kategori', '/api/products/products/', {'category': '{category}'}),
+    ('ürünler: kategori, fiyat sıralı', '/api/products/products/', {'category': '{category}', 'ordering': 'price'}),
+    ('ürünler: kategori, stokta', '/api/products/products/', {'category': '{category}', 'in_stock': 'true'}),
+    ('ürünler: marka', '/api/products/products/', {'brand': '{brand}'}),
+    ('ürünler: fiyat aralığı', '/api/products/products/', {'min_price': '100', 'max_price': '500', 'ordering': 'price'}),
+    ('ürünler: puan sıralı', '/api/products/products/', {'ordering': '-rating_average'}),
+    ('ürünler: indirimli', '/api/products/products/', {'on_sale': 'true'}),
+    ('ürünler: ana sayfa', '/api/products/products/', {'main_window': 'true'}),
+    ('featured', '/api/products/products/featured/', {}),
+    ('on_sale', '/api/products/products/on_sale/', {}),
+    ('top_rated', '/api/products/products/top_rated/', {}),
+    ('kategori ürünleri', '/api/products/categories/{category}/products/', {}),
+    ('marka ürünleri', '/api/products/brands/{brand}/products/', {}),
+    ('siparişlerim', '/api/orders/my-orders/', {}),
+    ('bekleyen siparişler', '/api/orders/uncompleted/', {}),
+    ('bildirimler', '/api/users/notifications/', {}),
+]
+
+
+def _predicates(query):
+    """
+    Sorgunun ana tablosuna ait AND'lenmiş koşulları sınıflandırır:
+    sabit boolean/isnull koşulları (kısmi indeks koşulu), eşitlikler ve aralıklar.
+    """
+    alias = query.get_initial_alias()
+    partial, equality, ranges = {}, [], []
+
+    def walk(node):
+        if node.connector != AND or node.negated:
+            return
+        for child in node.children:
+            if hasattr(child, 'children'):
+                walk(child)
+                continue
+            lhs = getattr(child, 'lhs', None)
+            if getattr(lhs, 'alias', None) != alias or not hasattr(lhs, 'target'):
+                continue
+            field = lhs.target
+            if isinstance(child, IsNull) or (isinstance(child, Exact) and isinstance(field, models.BooleanField)):
+                lookup = 'isnull' if isinstance(child, IsNull) else 'exact'
+                partial[f'{field.name}__{lookup}' if lookup == 'isnull' else field.name] = child.rhs
+            elif isinstance(child, Exact):
+                equality.append(field.name)
+            elif isinstance(child, RANGE_LOOKUPS):
+                ranges.append(field.name)
+
+    walk(query.where)
+    return partial, list(dict.fromkeys(equality)), list(dict.fromkeys(ranges))
+
+
+def _ordering(query):
+    fields = []
+    for item in query.order_by:
+        if not isinstance(item, str) or '__' in item:
+            return []
+        descending = item.startswith('-')
+        name = item.lstrip('-')
+        name = 'id' if name == 'pk' else name
+        fields.append(f"{'-' if descending else ''}{name}")
+    return fields
+
+
+def propose_index(queryset):
+    """
+    Koşul ve sıralamadan bir bileşik/kısmi indeks önerir: (eşitlikler, sıralama) ya da sıralama
+    yoksa (eşitlikler, ilk aralık). Sabit boolean/isnull koşulları indeksin WHERE'ine taşınır.
+    """
+    query = queryset.query
+    partial, equality, ranges = _predicates(query)
+    ordering = _ordering(query)
+    fields = [*equality, *(ordering or ranges[:1])]
+    if not fields:
+        return None
+    condition = models.Q(**dict(sorted(partial.items()))) if partial else None
+    model = queryset.model
+    digest = hashlib.md5(f'{fields}{sorted(partial.items())}'.encode()).hexdigest()[:6]
+    name = f'{model._meta.model_name[:12]}_{digest}_adv_idx'
+    return model, models.Index(fields=fields, condition=condition, name=name)
+
+
+def _columns(fields):
+    return [f.lstrip('-') for f in fields]
+
+
+def is_covered(model, index):
+    """Mevcut bir indeks (veya önceki öneri) bu indeksin alanlarıyla başlıyorsa öneri gereksizdir."""
+    wanted = list(index.fields)
+    flipped = [f[1:] if f.startswith('-') else f'-{f}' for f in wanted]
+    for existing in model._meta.indexes:
+        if existing.condition is not None and existing.condition != index.condition:
+            continue
+        prefix = list(existing.fields[:len(wanted)])
+        if prefix in (wanted, flipped):
+            return True
+    for constraint in model._meta.constraints:
+        if getattr(constraint, 'fields', None) and list(constraint.fields[:len(wanted)]) == _columns(wanted):
+            return True
+    if len(wanted) == 1:
+        field = model._meta.get_field(wanted[0].lstrip('-'))
+        return field.primary_key or field.unique or field.db_index
+    return False
+
+
+def explain_flags(queryset):
+    """EXPLAIN çıktısından tam tablo taraması ve ayrı sıralama adımını tespit eder."""
+    plan = queryset.explain()
+    table = queryset.model._meta.db_table
+    flags = []
+    if connection.vendor == 'postgresql':
+        if f'Seq Scan on {table}' in plan:
+            flags.append('seq-scan')
+        if 'Sort' in plan:
+            flags.append('sort')
+    else:
+        for line in plan.splitlines():
+            if f'SCAN {table}' in line and 'USING' not in line:
+                flags.append('seq-scan')
+            if 'TEMP B-TREE FOR ORDER BY' in line:
+                flags.append('sort')
+    return flags, plan
+
+
+def timed(queryset, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(queryset.values_list('pk', flat=True))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+class Command(BaseCommand):
+    help = (
+        'Katalog ve sipariş endpoint\'lerinin sorgu şekillerini gerçek view\'lar üzerinden tekrar oynatır, '
+        'EXPLAIN ile tam tarama/sıralama adımlarını bulur ve bileşik/kısmi indeks önerir.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Kullanıcıya özel endpoint\'ler için e-posta (varsayılan: en çok siparişi olan)')
+        parser.add_argument('--benchmark', action='store_true',
+                            help='Önerileri bir transaction içinde geçici oluşturup önce/sonra sürelerini ölçer, sonra geri alır')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--write-migrations', action='store_true', help='Öneriler için AddIndex migration\'ları yazar')
+        parser.add_argument('--verbose-plans', action='store_true')
+
+    def handle(self, *args, **options):
+        shapes = self.replay(options['user'])
+        proposals = {}
+        rows = []
+        for label, queryset in shapes:
+            flags, plan = explain_flags(queryset)
+            if options['verbose_plans']:
+                self.stdout.write(f'\n-- {label}\n{plan}')
+            proposal = propose_index(queryset) if flags else None
+            if proposal:
+                model, index = proposal
+                key = (model, tuple(index.fields), str(index.condition))
+                if is_covered(model, index):
+                    proposal = None
+                else:
+                    proposal = proposals.setdefault(key, proposal)
+            rows.append((label, queryset, flags, proposal))
+
+        self.report(rows)
+        if options['benchmark'] and rows:
+            self.benchmark(rows, list(proposals.values()), options['repeat'])
+        if options['write_migrations'] and proposals:
+            self.write_migrations(list(proposals.values()))
+
+    def replay(self, email):
+        """Endpoint'leri test istemcisiyle çağırır, sayfalanan queryset'leri kaydeder."""
+        User = get_user_model()
+        if email:
+            user = User.objects.get(email=email)
+        else:
+            user = User.objects.annotate(n=models.Count('order')).order_by('-n').first()
+        client = APIClient()
+        if user:
+            client.force_authenticate(user)
+        values = {
+            'category': Categories.objects.filter(isActive=True).values_list('pk', flat=True).first(),
+            'brand': Brands.objects.filter(isActive=True).values_list('pk', flat=True).first(),
+        }
+
+        shapes = []
+        for label, url, params in SHAPES:
+            if any(f'{{{k}}}' in url + ''.join(params.values()) and v is None for k, v in values.items()):
+                continue
+            url = url.format(**values)
+            params = {k: v.format(**values) for k, v in params.items()}
+            # page_size sayfalamayı zorlar; benzersiz parametre katalog cache'ini atlatır
+            params.update(page_size=24, _advisor=uuid.uuid4().hex)
+            with record_page_querysets() as recorded:
+                response = client.get(url, params)
+            if response.status_code != 200 or not recorded:
+                self.stderr.write(f'{label}: atlandı ({response.status_code})')
+                continue
+            shapes.append((label, recorded[-1]))
+        return shapes
+
+    def report(self, rows):
+        self.stdout.write(f"{'sorgu':<34} {'plan':<16} öneri")
+        for label, _, flags, proposal in rows:
+            suggestion = self.describe(*proposal) if proposal else ('-' if not flags else 'mevcut indeks yeterli')
+            self.stdout.write(f"{label:<34} {','.join(flags) or 'indeks':<16} {suggestion}")
+
+    def describe(self, model, index):
+        condition = f', condition={index.condition!r}' if index.condition else ''
+        return f'{model.__name__}: models.Index(fields={list(index.fields)!r}{condition}, name={index.name!r})'
+
+    def benchmark(self, rows, proposals, repeat):
+        before = {label: timed(qs, repeat) for label, qs, _, _ in rows}
+        with transaction.atomic():
+            # Şema düzenleyicisine girmeden sadece CREATE INDEX SQL'i üretilir (SQLite'ta
+            # schema_editor açık bir transaction içinde kullanılamaz)
+            editor = connection.schema_editor()
+            with connection.cursor() as cursor:
+                for model, index in proposals:
+                    cursor.execute(str(index.create_sql(model, editor)))
+                cursor.execute('ANALYZE')
+            after = {label: timed(qs, repeat) for label, qs, _, _ in rows}
+            plans = {label: explain_flags(qs)[0] for label, qs, _, _ in rows}
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"\n{'sorgu':<34} {'önce ms':>9} {'sonra ms':>9} {'kat':>6}  plan (sonra)")
+        for label, _, _, _ in rows:
+            ratio = before[label] / after[label] if after[label] else 0
+            self.stdout.write(
+                f"{label:<34} {before[label]:>9.2f} {after[label]:>9.2f} {ratio:>6.1f}  {','.join(plans[label]) or 'indeks'}"
+            )
+
+    def write_migrations(self, proposals):
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        by_app = defaultdict(list)
+        for model, index in proposals:
+            by_app[model._meta.app_label].append((model, index))
+        for app_label, items in by_app.items():
+            leaf = loader.graph.leaf_nodes(app_label)[0]
+            number = int(leaf[1].split('_')[0]) + 1
+            migration = type('Migration', (Migration,), {
+                'dependencies': [leaf],
+                'operations': [AddIndex(model_name=model._meta.model_name, index=index) for model, index in items],
+            })(f'{number:04d}_advised_indexes', app_label)
+            writer = MigrationWriter(migration)
+            with open(writer.path, 'w', encoding='utf-8') as f:
+                f.write(writer.as_string())
+            self.stdout.write(self.style.SUCCESS(f'{writer.path} yazıldı.'))
+        self.stdout.write(self.style.WARNING(
+            'Aynı indeksleri modellerin Meta.indexes listesine ekleyin; aksi halde makemigrations onları kaldırmak ister.'
+        ))
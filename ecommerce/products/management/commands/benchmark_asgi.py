@@ -0,0 +1,189 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from products.models import Categories, Product
+
+# {product}, {category} veritabanından doldurulur; page_size büyük katalogda tüm tabloyu dökmeyi önler
+ENDPOINTS = [
+    ('ürünler', '/api/products/products/?page_size=24'),
+    ('featured', '/api/products/products/featured/?page_size=24'),
+    ('filter_options', '/api/products/products/filter_options/'),
+    ('ürün detayı', '/api/products/products/{product}/'),
+    ('kategori ürünleri', '/api/products/categories/{category}/products/?page_size=24'),
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    headers = {}
+    for line in head.split(b'\r\n')[1:]:
+        if b':' in line:
+            name, value = line.split(b':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if b'content-length' in headers:
+        await reader.readexactly(int(headers[b'content-length']))
+    elif headers.get(b'transfer-encoding') == b'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status, headers.get(b'connection') != b'close'
+
+
+async def _connection_loop(port, path, deadline, bust_cache, latencies, errors):
+    """Tek keep-alive bağlantı üzerinden süre dolana kadar ardışık GET gönderir."""
+    reader = writer = None
+    counter = 0
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            counter += 1
+            target = path
+            if bust_cache:
+                # Benzersiz parametre katalog cache'ini atlatır; ölçülen yol veritabanıdır
+                target += f"{'&' if '?' in path else '?'}_bench={id(latencies)}-{counter}"
+            start = time.perf_counter()
+            writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n'.encode())
+            status, keep_alive = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors[status] = errors.get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def _load(port, path, connections, duration, bust_cache):
+    latencies, errors = [], {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _connection_loop(port, path, deadline, bust_cache, latencies, errors) for _ in range(connections)
+    ))
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Herkese açık katalog endpoint\'lerini WSGI (gunicorn) ve ASGI (uvicorn) altında aynı worker '
+        'sayısıyla ayağa kaldırır ve çok sayıda eşzamanlı keep-alive bağlantıyla yükleyerek req/s ile '
+        'p50/p99 gecikmeyi karşılaştırır. Mevcut veritabanını kullanır; veri yazmaz.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--duration', type=float, default=10, help='Endpoint başına ölçüm süresi (saniye)')
+        parser.add_argument('--warmup', type=float, default=2)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8, help='WSGI (gthread) worker başına thread')
+        parser.add_argument('--servers', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+        parser.add_argument('--cached', action='store_true',
+                            help='Katalog cache\'ini atlatmadan ölç (varsayılan: her istek cache miss)')
+
+    def handle(self, *args, **options):
+        product = Product.objects.filter(isActive=True).values_list('pk', flat=True).first()
+        category = Categories.objects.filter(isActive=True).values_list('pk', flat=True).first()
+        if product is None or category is None:
+            raise CommandError('Ölçüm için en az bir aktif ürün ve kategori gerekli.')
+        endpoints = [(label, path.format(product=product, category=category)) for label, path in ENDPOINTS]
+
+        results = {}
+        for server in options['servers']:
+            port = _free_port()
+            process = self.start_server(server, port, options)
+            try:
+                self.wait_ready(process, port, endpoints[0][1])
+                for label, path in endpoints:
+                    asyncio.run(_load(port, path, min(options['connections'], 50), options['warmup'], True))
+                    latencies, errors, elapsed = asyncio.run(
+                        _load(port, path, options['connections'], options['duration'], not options['cached'])
+                    )
+                    results[(server, label)] = (latencies, errors, elapsed)
+                    self.stdout.write(f'{server} {label}: {len(latencies)} istek')
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        self.report(endpoints, options['servers'], results, options['connections'])
+
+    def start_server(self, server, port, options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'ecommerce.settings'))
+        bind = f'127.0.0.1:{port}'
+        if server == 'wsgi':
+            env['DJANGO_ROOT_URLCONF'] = 'ecommerce.urls'
+            command = [
+                sys.executable, '-m', 'gunicorn', 'ecommerce.wsgi:application', '--bind', bind,
+                '--workers', str(options['workers']), '--worker-class', 'gthread',
+                '--threads', str(options['threads']), '--keep-alive', '60', '--backlog', '4096',
+                '--log-level', 'warning',
+            ]
+        else:
+            env['DJANGO_ROOT_URLCONF'] = 'ecommerce.asgi_urls'
+            command = [
+                sys.executable, '-m', 'uvicorn', 'ecommerce.asgi:application', '--host', '127.0.0.1',
+                '--port', str(port), '--workers', str(options['workers']), '--timeout-keep-alive', '60',
+                '--backlog', '4096', '--no-access-log', '--log-level', 'warning',
+            ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+    def wait_ready(self, process, port, path, timeout=30):
+        async def probe():
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+            status, _ = await _read_response(reader)
+            writer.close()
+            return status
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Sunucu başlatılamadı (çıkış kodu {process.returncode}).')
+            try:
+                status = asyncio.run(probe())
+            except (OSError, asyncio.IncompleteReadError):
+                time.sleep(0.2)
+                continue
+            if status != 200:
+                raise CommandError(f'{path} {status} döndürdü.')
+            return
+        raise CommandError('Sunucu zamanında hazır olmadı.')
+
+    def report(self, endpoints, servers, results, connections):
+        self.stdout.write(f'\n{connections} eşzamanlı bağlantı')
+        self.stdout.write(f"{'endpoint':<20} {'sunucu':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}  hatalar")
+        for label, _ in endpoints:
+            for server in servers:
+                latencies, errors, elapsed = results[(server, label)]
+                if len(latencies) > 1:
+                    cuts = statistics.quantiles(latencies, n=100)
+                    p50, p99 = cuts[49] * 1000, cuts[98] * 1000
+                else:
+                    p50 = p99 = float('nan')
+                failed = ', '.join(f'{k}: {v}' for k, v in sorted(errors.items(), key=str)) or '-'
+                self.stdout.write(
+                    f'{label:<20} {server:<6} {len(latencies) / elapsed:>9.1f} {p50:>9.1f} {p99:>9.1f}  {failed}'
+                )
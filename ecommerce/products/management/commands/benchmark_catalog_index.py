@@ -0,0 +1,119 @@
+import random
+import statistics
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ecommerce.pagination import KeysetCursorPagination
+from products.cache import get_cache
+from products.filters import filter_products
+from products.index import CatalogIndex
+from products.models import Brands, Categories, Product
+from products.tree import get_category_tree
+
+
+def _median_us(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings), result
+
+
+class Command(BaseCommand):
+    help = (
+        'Bellek içi katalog indeksini (products/index.py) ORM yoluyla karşılaştırır: tipik filtre + sıralama '
+        'kombinasyonlarında ilk ve derin (cursor ile) sayfanın id\'lerini iki yoldan da çözer, medyan µs ve '
+        'sonuçların eşitliğini yazar. Ürünler, kategoriler ve markalar geçici olarak eklenir ve geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200_000)
+        parser.add_argument('--brands', type=int, default=200)
+        parser.add_argument('--roots', type=int, default=10, help='Kök kategori sayısı (her birinin 5 alt kategorisi olur)')
+        parser.add_argument('--page-size', type=int, default=24)
+        parser.add_argument('--depth', type=int, default=1000, help='Derin sayfanın başladığı satır')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+        get_cache().clear()  # geri alınan verinin ağacı ve sürümleri cache'te kalmasın
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        roots = [Categories.objects.create(name=f'İndeks ölçüm {i}') for i in range(options['roots'])]
+        leaves = [
+            Categories.objects.create(name=f'İndeks ölçüm {root.pk}-{j}', mainCategory=root)
+            for root in roots for j in range(5)
+        ]
+        brands = Brands.objects.bulk_create([Brands(name=f'İndeks ölçüm {i}') for i in range(options['brands'])])
+        batch, total = 10_000, options['products']
+        for offset in range(0, total, batch):
+            Product.objects.bulk_create([
+                Product(
+                    name=f'İndeks ölçüm ürünü {i}', description='-', price=rng.randint(100, 500_000) / 100,
+                    discount_price=rng.randint(50, 1000) / 10 if rng.random() < 0.2 else None,
+                    stock=rng.choice((0, 0, 3, 10, 50)), rating_average=rng.randint(0, 500) / 100,
+                    main_window_display=rng.random() < 0.1, slug=f'indeks-olcum-{i}',
+                    category=rng.choice(leaves), brand=rng.choice(brands),
+                )
+                for i in range(offset, min(offset + batch, total))
+            ])
+        get_cache().clear()
+        get_category_tree()
+
+        index = CatalogIndex()
+        start = time.perf_counter()
+        if not index.rebuild():
+            self.stdout.write(self.style.ERROR(f'İndeks kurulamadı: {index.disabled_reason}'))
+            return
+        self.stdout.write(
+            f'{index.store.size} ürün; kurulum {time.perf_counter() - start:.1f} sn, '
+            f'~{index.store.nbytes() / 1024 / 1024:.1f} MiB (sınır {index.max_bytes / 1024 / 1024:.0f} MiB)'
+        )
+
+        root, leaf, brand = roots[0].pk, leaves[0].pk, brands[0].pk
+        scenarios = [
+            ('varsayılan (-created_at)', {}),
+            ('kök kategori, fiyat', {'category': root, 'ordering': 'price'}),
+            ('marka + stok, -puan', {'brand': brand, 'in_stock': 'true', 'ordering': '-rating_average'}),
+            ('fiyat aralığı + indirim', {'min_price': 100, 'max_price': 1000, 'on_sale': 'true'}),
+            ('yaprak + marka + vitrin', {'category': leaf, 'brand': brand, 'main_window': 'true', 'ordering': 'price'}),
+        ]
+        factory = APIRequestFactory()
+        self.stdout.write(f"{'senaryo':<28} {'sayfa':<6} {'ORM µs':>10} {'indeks µs':>10} {'hız':>7}  eşit")
+        for label, params in scenarios:
+            params = {**params, 'page_size': options['page_size']}
+            queryset = filter_products(Product.objects.filter(isActive=True), params)
+            if 'ordering' in params:
+                queryset = queryset.order_by(params['ordering'])
+            pages = [('ilk', params)]
+            deep = list(queryset.order_by(*self.ordering(queryset))[options['depth']:options['depth'] + 1])
+            if deep:
+                paginator = KeysetCursorPagination()
+                paginator.prepare_page(queryset, Request(factory.get('/', params)))
+                cursor = parse_qs(urlsplit(paginator.encode_cursor(deep[0])).query)['cursor'][0]
+                pages.append(('derin', {**params, 'cursor': cursor}))
+
+            for page_label, page_params in pages:
+                request = Request(factory.get('/', page_params))
+                paginator = KeysetCursorPagination()
+                page = paginator.prepare_page(queryset, request)
+                orm_us, orm_ids = _median_us(lambda: list(page.values_list('pk', flat=True)), options['repeat'])
+                index_us, index_ids = _median_us(lambda: index.lookup(request.query_params, paginator), options['repeat'])
+                self.stdout.write(
+                    f'{label:<28} {page_label:<6} {orm_us:>10.0f} {index_us:>10.0f} {orm_us / index_us:>6.0f}x  '
+                    f"{'evet' if orm_ids == index_ids else 'HAYIR'}"
+                )
+
+    @staticmethod
+    def ordering(queryset):
+        return KeysetCursorPagination().get_ordering(None, queryset, None)
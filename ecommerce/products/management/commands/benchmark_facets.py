@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+
+from products.cache import get_cache
+from products.facets import GLOBAL_KEY, get_facets
+from products.models import Brands, Categories, Product
+from products.tree import get_category_tree
+
+
+def _measure(fn, repeat):
+    """Medyan ms ve son çalıştırmanın sorgu sayısı."""
+    timings = []
+    for _ in range(repeat):
+        connection.queries_log.clear()  # ekleme sorguları günlüğü (9000 sınırı) doldurmuş olabilir
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(queries)
+
+
+class Command(BaseCommand):
+    help = (
+        'filter_options facet hesaplamasını N ürünlük katalogda ölçer: filtresiz istek (önceden hesaplanan '
+        'katman soğuk/sıcak) ve tipik filtre kombinasyonları için medyan ms ve sorgu sayısı. Ürünler, '
+        'kategori ağacı (kök + alt kategoriler) ve markalar geçici olarak eklenir ve geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1_000_000)
+        parser.add_argument('--brands', type=int, default=200)
+        parser.add_argument('--roots', type=int, default=10, help='Kök kategori sayısı (her birinin 5 alt kategorisi olur)')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+        get_cache().clear()  # geri alınan verinin sayıları ve ağacı cache'te kalmasın
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        roots = [Categories.objects.create(name=f'Facet ölçüm {i}') for i in range(options['roots'])]
+        leaves = [
+            Categories.objects.create(name=f'Facet ölçüm {root.pk}-{j}', mainCategory=root)
+            for root in roots for j in range(5)
+        ]
+        brands = Brands.objects.bulk_create([Brands(name=f'Facet ölçüm {i}') for i in range(options['brands'])])
+
+        start = time.perf_counter()
+        batch, total = 10_000, options['products']
+        for offset in range(0, total, batch):
+            Product.objects.bulk_create([
+                Product(
+                    name=f'Facet ölçüm ürünü {i}', description='-', price=rng.randint(100, 500_000) / 100,
+                    discount_price=rng.randint(50, 1000) / 10 if rng.random() < 0.2 else None,
+                    stock=rng.choice((0, 0, 3, 10, 50)), slug=f'facet-olcum-{i}',
+                    category=rng.choice(leaves), brand=rng.choice(brands),
+                )
+                for i in range(offset, min(offset + batch, total))
+            ])
+        self.stdout.write(f'{total} ürün eklendi ({time.perf_counter() - start:.1f} sn)')
+
+        cache = get_cache()
+        cache.clear()
+        get_category_tree()
+
+        root, brand = roots[0].pk, brands[0].pk
+        scenarios = [
+            ('filtresiz (katman soğuk)', '', lambda: cache.delete(GLOBAL_KEY)),
+            ('filtresiz (katman sıcak)', '', None),
+            ('kök kategori', f'category={root}', None),
+            ('marka', f'brand={brand}', None),
+            ('fiyat + stok', 'min_price=100&max_price=1000&in_stock=true', None),
+            ('kategori + marka + indirim', f'category={root}&brand={brand}&on_sale=true', None),
+        ]
+        self.stdout.write(f"{'senaryo':<28} {'ms':>10} {'sorgu':>6}")
+        for label, query, before in scenarios:
+            params = QueryDict(query)
+
+            def facets():
+                if before is not None:
+                    before()
+                return get_facets(params)
+
+            ms, queries = _measure(facets, options['repeat'])
+            self.stdout.write(f'{label:<28} {ms:>10.1f} {queries:>6}')
@@ -0,0 +1,112 @@
+import io
+import json
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from PIL import Image, ImageDraw, ImageFilter
+from rest_framework.test import APIRequestFactory
+
+from ecommerce.images import generate_derivatives
+from products.models import Product
+from products.serializers import ProductSerializer
+
+
+class LegacyProductSerializer(ProductSerializer):
+    """Önceki liste yanıtı: yalnızca orijinal görsel."""
+
+    class Meta(ProductSerializer.Meta):
+        fields = [f for f in ProductSerializer.Meta.fields if f != 'image_srcset']
+
+
+def _photo(width, height, seed):
+    """Fotoğrafa benzer (yumuşak geçişli, dokulu) sentetik görsel; düz renk gerçekçi olmayacak kadar iyi sıkışır."""
+    rng = random.Random(seed)
+    image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for _ in range(60):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(width // 20, width // 4)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    image = image.filter(ImageFilter.GaussianBlur(6))
+    noise = Image.effect_noise((width, height), 24).convert('RGB')
+    image = Image.blend(image, noise, 0.12)
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def _pick(srcset, target):
+    """İstemcinin seçeceği türev: hedef genişliği karşılayan en küçük boyut (yoksa en büyüğü)."""
+    candidates = sorted((int(w), path) for w, path in srcset.items())
+    for width, path in candidates:
+        if width >= target:
+            return path
+    return candidates[-1][1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Bir ürün liste sayfasının istemciye maliyetini (JSON + küçük resim baytları) orijinal görsellerle '
+        've üretilen türevlerle karşılaştırır. Sentetik ürünler ve görseller geçici bir MEDIA_ROOT\'a '
+        'yazılır; veritabanı değişiklikleri geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=24)
+        parser.add_argument('--source-size', type=int, nargs=2, default=[2400, 1800], metavar=('W', 'H'))
+        parser.add_argument('--display-width', type=int, default=100, help='Liste hücresindeki görsel genişliği (CSS px)')
+        parser.add_argument('--dpr', type=float, default=2, help='Cihaz piksel oranı')
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp(prefix='bench-images-')
+        try:
+            with override_settings(MEDIA_ROOT=media_root), transaction.atomic():
+                self.run(options)
+                transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def run(self, options):
+        width, height = options['source_size']
+        products = []
+        for i in range(options['page_size']):
+            product = Product(name=f'Görsel ölçüm {i}', description='-', price=100, stock=1)
+            product.image.save(f'bench-{i}.jpg', ContentFile(_photo(width, height, i)), save=False)
+            product.save()
+            products.append(product)
+
+        started = time.perf_counter()
+        for product in products:
+            generate_derivatives(model='products.product', pk=product.pk, field='image', source=product.image.name)
+        elapsed = time.perf_counter() - started
+
+        request = APIRequestFactory().get('/api/products/products/')
+        rows = list(Product.objects.filter(pk__in=[p.pk for p in products]).order_by('pk'))
+        target = int(options['display_width'] * options['dpr'])
+        storage = rows[0].image.storage
+
+        legacy_json = json.dumps(LegacyProductSerializer(rows, many=True, context={'request': request}).data).encode()
+        current_json = json.dumps(ProductSerializer(rows, many=True, context={'request': request}).data).encode()
+        scenarios = [('orijinal (önce)', len(legacy_json), sum(row.image.size for row in rows))]
+        for fmt in rows[0].image_derivatives['formats']:
+            image_bytes = sum(storage.size(_pick(row.image_derivatives['formats'][fmt], target)) for row in rows)
+            scenarios.append((f'srcset {fmt} (sonra)', len(current_json), image_bytes))
+
+        self.stdout.write(
+            f"{options['page_size']} ürün, kaynak {width}x{height}, hücre {options['display_width']}px @{options['dpr']:g}x "
+            f'→ {target}px türev; üretim {elapsed / len(products) * 1000:.0f} ms/görsel (istek dışında)'
+        )
+        self.stdout.write(f"{'senaryo':<22} {'JSON KB':>9} {'görsel KB':>11} {'toplam KB':>11}")
+        baseline = scenarios[0][1] + scenarios[0][2]
+        for label, json_bytes, image_bytes in scenarios:
+            total = json_bytes + image_bytes
+            self.stdout.write(
+                f'{label:<22} {json_bytes / 1024:>9.1f} {image_bytes / 1024:>11.1f} {total / 1024:>11.1f}'
+                f'  ({total / baseline:.1%})'
+            )
@@ -0,0 +1,89 @@
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from ecommerce.compression import CODECS, DEFAULT_LEVELS
+from ecommerce.renderers import ORJSONParser, ORJSONRenderer
+from products.models import Brands, Categories, Product
+from products.serializers import ProductSerializer
+
+DESCRIPTION = (
+    'Yumuşak dokulu, nefes alan kumaştan üretilmiş ürün günlük kullanım için tasarlanmıştır. '
+    'Makinede 30 derecede yıkanabilir, ütü gerektirmez ve uzun süre formunu korur. '
+)
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+class Command(BaseCommand):
+    help = (
+        'N ürünlük liste yanıtını (ProductSerializer, açıklamalar dahil) DRF JSONRenderer ve orjson '
+        'renderer\'ı ile render edip geri çözer, ardından gzip/brotli/zstd ile sıkıştırır; her adımın '
+        'medyan ms ve bayt değerlerini yazar. Veritabanında yeterli ürün yoksa geçici ürünler eklenir '
+        've geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options['products'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def run(self, count, repeat):
+        missing = count - Product.objects.count()
+        if missing > 0:
+            category = Categories.objects.create(name='JSON ölçüm')
+            brand = Brands.objects.create(name='JSON ölçüm')
+            Product.objects.bulk_create([
+                Product(
+                    name=f'JSON ölçüm ürünü {i}', description=DESCRIPTION * 3, price='1299.90',
+                    discount_price='999.90', stock=i % 50, slug=f'json-olcum-{i}', category=category, brand=brand,
+                )
+                for i in range(missing)
+            ])
+
+        request = APIRequestFactory().get('/api/products/products/')
+        rows = list(Product.objects.select_related('category', 'brand').order_by('pk')[:count])
+        serialize_ms, data = _median_ms(
+            lambda: ProductSerializer(rows, many=True, context={'request': request}).data, max(repeat // 4, 1),
+        )
+        self.stdout.write(f'{len(rows)} ürün; serializer (referans, iki renderer için ortak): {serialize_ms:.1f} ms')
+
+        self.stdout.write(f"{'renderer':<12} {'render ms':>10} {'parse ms':>10} {'bayt':>10}")
+        bodies = {}
+        for label, renderer, parser in (
+            ('JSONRenderer', JSONRenderer(), JSONParser()),
+            ('orjson', ORJSONRenderer(), ORJSONParser()),
+        ):
+            render_ms, body = _median_ms(lambda: renderer.render(data), repeat)
+            parse_ms, _ = _median_ms(lambda: parser.parse(io.BytesIO(body)), repeat)
+            bodies[label] = body
+            self.stdout.write(f'{label:<12} {render_ms:>10.2f} {parse_ms:>10.2f} {len(body):>10}')
+        if bodies['JSONRenderer'] != bodies['orjson']:
+            self.stdout.write(self.style.WARNING('Uyarı: iki renderer\'ın çıktısı farklı.'))
+
+        body = bodies['orjson']
+        self.stdout.write(f"\n{'kodlama':<12} {'seviye':>6} {'ms':>10} {'bayt':>10} {'oran':>8}")
+        self.stdout.write(f"{'identity':<12} {'-':>6} {0:>10.2f} {len(body):>10} {1:>8.1%}")
+        for name, level in DEFAULT_LEVELS.items():
+            codec = CODECS[name](level)
+            compress_ms, compressed = _median_ms(lambda: codec.compress(body), repeat)
+            self.stdout.write(
+                f'{name:<12} {level:>6} {compress_ms:>10.2f} {len(compressed):>10} {len(compressed) / len(body):>8.1%}'
+            )
@@ -0,0 +1,94 @@
+import asyncio
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.urls import include, path, re_path
+from django.views.static import serve
+from PIL import Image
+
+from .benchmark_asgi import Command as AsgiBenchmarkCommand, _free_port, _load
+
+THUMBNAIL = 'derivatives/be/bench/160.jpg'
+
+# "önce" senaryosunun URL yapılandırması: medya django.views.static.serve ile (ETag/Range/sendfile yok)
+urlpatterns = [
+    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': os.environ.get('DJANGO_MEDIA_ROOT', '')}),
+    path('', include('ecommerce.urls')),
+]
+
+SCENARIOS = [
+    ('static.serve (önce)', {'DJANGO_ROOT_URLCONF': __name__}),
+    ('FileResponse+sendfile', {'MEDIA_ACCEL': ''}),
+    # Gövdeyi nginx gönderir; burada yalnızca uygulama katmanının payı (boş gövdeli yanıt) ölçülür
+    ('X-Accel-Redirect', {'MEDIA_ACCEL': 'nginx'}),
+]
+
+
+class Command(AsgiBenchmarkCommand):
+    help = (
+        'Tek bir küçük resmi (160px) çok sayıda eşzamanlı keep-alive bağlantıyla gunicorn (gthread) '
+        'üzerinden çeker; eski static.serve, sendfile\'lı FileResponse ve X-Accel-Redirect yollarının '
+        'req/s ve p50/p99 gecikmesini karşılaştırır. Görsel geçici bir MEDIA_ROOT\'a yazılır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=1000)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--warmup', type=float, default=2)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp(prefix='bench-media-')
+        try:
+            os.makedirs(os.path.join(media_root, os.path.dirname(THUMBNAIL)))
+            image = Image.effect_noise((160, 120), 40).convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=80)
+            with open(os.path.join(media_root, THUMBNAIL), 'wb') as f:
+                f.write(buffer.getvalue())
+            size = len(buffer.getvalue())
+
+            url = f'{settings.MEDIA_URL}{THUMBNAIL}'
+            results = []
+            for label, env in SCENARIOS:
+                port = _free_port()
+                process = self.start(port, media_root, env, options)
+                try:
+                    self.wait_ready(process, port, url)
+                    asyncio.run(_load(port, url, min(options['connections'], 50), options['warmup'], False))
+                    results.append((label, *asyncio.run(
+                        _load(port, url, options['connections'], options['duration'], False)
+                    )))
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        self.stdout.write(f"\n{options['connections']} eşzamanlı bağlantı, {size} baytlık küçük resim")
+        self.stdout.write(f"{'yol':<24} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}  hatalar")
+        for label, latencies, errors, elapsed in results:
+            cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [float('nan')] * 99
+            failed = ', '.join(f'{k}: {v}' for k, v in sorted(errors.items(), key=str)) or '-'
+            self.stdout.write(
+                f'{label:<24} {len(latencies) / elapsed:>9.1f} {cuts[49] * 1000:>9.1f} {cuts[98] * 1000:>9.1f}  {failed}'
+            )
+
+    def start(self, port, media_root, env, options):
+        env = dict(
+            os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'ecommerce.settings'),
+            DJANGO_MEDIA_ROOT=media_root, **env,
+        )
+        command = [
+            sys.executable, '-m', 'gunicorn', 'ecommerce.wsgi:application', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(options['workers']), '--worker-class', 'gthread', '--threads', str(options['threads']),
+            '--keep-alive', '60', '--backlog', '4096', '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
@@ -0,0 +1,86 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from products.models import Brands, Categories, Product
+from products.search import rebuild_index, search_products
+
+WORDS = [
+    'telefon', 'kılıf', 'şarj', 'kablo', 'kulaklık', 'bluetooth', 'akıllı', 'saat', 'çanta', 'deri',
+    'ayakkabı', 'spor', 'koşu', 'gömlek', 'pamuklu', 'kışlık', 'mont', 'bilgisayar', 'klavye', 'mouse',
+    'oyuncu', 'monitör', 'kamera', 'lens', 'tablet', 'ekran', 'koruyucu', 'hızlı', 'kablosuz', 'hoparlör',
+]
+QUERIES = ['telefon', 'kablosuz kulaklık', 'deri çanta', 'spor ayakkabılar', 'klav', 'monitör']
+
+
+class Command(BaseCommand):
+    help = (
+        'Tam metin arama ile eski icontains aramasını sentetik katalog üzerinde karşılaştırır. '
+        'Veriler işlem sonunda geri alınır; yine de boş/test veritabanında çalıştırın.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=24)
+
+    def handle(self, *args, **options):
+        self.page_size = options['page_size']
+        repeat = options['repeat']
+        self.stdout.write(f"{'ürün':>10} {'sorgu':<20} {'icontains ms':>14} {'fts ms':>10} {'sonuç':>8}")
+        for size in options['sizes']:
+            with transaction.atomic():
+                self._seed(size)
+                rebuild_index(batch_size=5000)
+                for query in QUERIES:
+                    legacy = self._time(lambda: self._legacy(query), repeat)
+                    fts = self._time(lambda: self._fts(query), repeat)
+                    hits = search_products(Product.objects.filter(isActive=True), query).count()
+                    self.stdout.write(f'{size:>10} {query:<20} {legacy:>14.2f} {fts:>10.2f} {hits:>8}')
+                transaction.set_rollback(True)
+
+    def _seed(self, size):
+        rng = random.Random(size)
+        categories = [Categories.objects.create(name=f'Kategori {i}') for i in range(20)]
+        brands = [Brands.objects.create(name=f'Marka {i}') for i in range(50)]
+        batch = []
+        for i in range(size):
+            words = rng.sample(WORDS, 3)
+            batch.append(Product(
+                name=' '.join(words).title(),
+                description=' '.join(rng.choices(WORDS, k=40)),
+                price=rng.randint(10, 5000),
+                stock=rng.randint(0, 100),
+                slug=f'bench-{size}-{i}',
+                category=rng.choice(categories),
+                brand=rng.choice(brands),
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+
+    def _legacy(self, query):
+        queryset = Product.objects.filter(isActive=True).filter(
+            Q(name__icontains=query) |
+            Q(description__icontains=query) |
+            Q(category__name__icontains=query) |
+            Q(brand__name__icontains=query)
+        ).order_by('-created_at')
+        return list(queryset.values_list('id', flat=True)[:self.page_size])
+
+    def _fts(self, query):
+        queryset = search_products(Product.objects.filter(isActive=True), query).order_by('-search_rank', '-created_at')
+        return list(queryset.values_list('id', flat=True)[:self.page_size])
+
+    def _time(self, fn, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
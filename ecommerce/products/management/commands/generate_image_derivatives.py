@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ecommerce.images import enqueue_missing, tracked_fields
+from jobs.queue import run_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Görseli olup türevi eksik ya da eskimiş kayıtlar (ürün, marka, varyasyon, profil fotoğrafı) için '
+        'türev üretim işlerini kuyruğa alır. Toplu içe aktarmalardan ve boyut/biçim ayarı değişikliklerinden '
+        'sonra çalıştırılmalıdır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true', help='İşleri worker beklemeden bu süreçte çalıştır')
+
+    def handle(self, *args, **options):
+        total = 0
+        for model, field in tracked_fields():
+            count = enqueue_missing(model, field)
+            total += count
+            self.stdout.write(f'{model._meta.label}.{field}: {count}')
+        if options['now']:
+            while run_jobs():
+                pass
+        self.stdout.write(self.style.SUCCESS(f'{total} görsel için türev işi oluşturuldu.'))
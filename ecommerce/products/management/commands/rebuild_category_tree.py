@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products.cache import bump_version
+from products.models import Categories
+from products.tree import compute_paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Kategorilerin materyalize yollarını (path, depth) mainCategory ilişkisinden yeniden hesaplar. '
+        'Sinyal üretmeyen yazımlardan (queryset.update, loaddata, SQL ile içe aktarma) sonra çalıştırılmalıdır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Sadece sapmaları raporla, yazma')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            categories = list(Categories.objects.select_for_update().only('pk', 'mainCategory_id', 'path', 'depth'))
+            paths = compute_paths([(c.pk, c.mainCategory_id) for c in categories])
+            drifted = []
+            for category in categories:
+                path = paths[category.pk]
+                if category.path != path or category.depth != path.count('/') - 1:
+                    category.path, category.depth = path, path.count('/') - 1
+                    drifted.append(category)
+            if drifted and not options['dry_run']:
+                Categories.objects.bulk_update(drifted, ['path', 'depth'], batch_size=500)
+
+        if drifted and not options['dry_run']:
+            bump_version(Categories)  # bulk_update sinyal üretmez; ağaç ve katalog cache'i yenilensin
+
+        verb = 'sapma bulundu' if options['dry_run'] else 'kategori onarıldı'
+        self.stdout.write(self.style.SUCCESS(f'{len(categories)} kategori kontrol edildi, {len(drifted)} {verb}.'))
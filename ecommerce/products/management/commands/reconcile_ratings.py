@@ -0,0 +1,75 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from products.cache import bump_version
+from products.models import Product, ProductRating
+
+COUNTER_FIELDS = ['rating_count', 'rating_sum', 'rating_average'] + [f'rating_{s}_count' for s in range(1, 6)]
+
+
+def expected_counters(product_ids):
+    """Verilen ürünler için ProductRating üzerinden gerçek sayaçları tek gruplu sorguyla hesaplar."""
+    rows = (
+        ProductRating.objects.filter(product_id__in=product_ids)
+        .values('product_id')
+        .annotate(
+            rating_count=Count('id'),
+            rating_sum=Sum('stars'),
+            **{f'rating_{s}_count': Count('id', filter=Q(stars=s)) for s in range(1, 6)},
+        )
+    )
+    expected = {}
+    for row in rows:
+        product_id = row.pop('product_id')
+        row['rating_average'] = (Decimal(row['rating_sum']) / row['rating_count']).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP
+        )
+        expected[product_id] = row
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    empty['rating_average'] = Decimal('0.00')
+    return {pk: expected.get(pk, empty) for pk in product_ids}
+
+
+class Command(BaseCommand):
+    help = 'Ürün puan sayaçlarını (toplam, adet, ortalama, yıldız dağılımı) ProductRating ile karşılaştırıp onarır.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Sadece sapmaları raporla, yazma')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = repaired = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Satırlar kilitli: eşzamanlı puan yazımları bu parçanın onarımından sonra uygulanır
+                products = list(
+                    Product.objects.select_for_update()
+                    .filter(pk__gt=last_pk).order_by('pk')
+                    .only('pk', *COUNTER_FIELDS)[:batch_size]
+                )
+                if not products:
+                    break
+                expected = expected_counters([p.pk for p in products])
+                drifted = []
+                for product in products:
+                    values = expected[product.pk]
+                    if any(getattr(product, f) != values[f] for f in COUNTER_FIELDS):
+                        for field in COUNTER_FIELDS:
+                            setattr(product, field, values[field])
+                        drifted.append(product)
+                if drifted and not options['dry_run']:
+                    Product.objects.bulk_update(drifted, COUNTER_FIELDS)
+                checked += len(products)
+                repaired += len(drifted)
+                last_pk = products[-1].pk
+
+        if repaired and not options['dry_run']:
+            bump_version(Product)  # bulk_update sinyal üretmez; katalog cache'ini elle geçersiz kıl
+
+        verb = 'sapma bulundu' if options['dry_run'] else 'ürün onarıldı'
+        self.stdout.write(self.style.SUCCESS(f'{checked} ürün kontrol edildi, {repaired} {verb}.'))
@@ -0,0 +1,170 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:32
+
+import re
+import unicodedata
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# products.search'teki tokenizer'ın bu migration yazıldığı andaki kopyası; sonraki değişiklikler
+# bu migration'ın doldurduğu veriyi etkilemesin diye içe alınmıştır (yeniden indeksleme için
+# `rebuild_search_index` kullanılır).
+WEIGHT_NAME = 4
+WEIGHT_TAXONOMY = 2
+WEIGHT_DESCRIPTION = 1
+
+MIN_STEM_LENGTH = 4
+MAX_TERM_LENGTH = 64
+
+_TURKISH_FOLD = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u',
+})
+
+_SUFFIXES = sorted({
+    'lar', 'ler',
+    'lari', 'leri', 'larin', 'lerin', 'lara', 'lere', 'larda', 'lerde', 'lardan', 'lerden',
+    'nin', 'nun', 'in', 'un',
+    'da', 'de', 'ta', 'te',
+    'dan', 'den', 'tan', 'ten',
+    'ya', 'ye', 'yi', 'yu',
+    'si', 'su',
+    'la', 'le', 'yla', 'yle',
+}, key=len, reverse=True)
+
+_STOPWORDS = {
+    've', 'veya', 'ile', 'icin', 'bir', 'bu', 'su', 'o', 'da', 'de', 'mi', 'mu', 'ama', 'en', 'cok',
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    if not text:
+        return ''
+    text = text.replace('I', 'ı').replace('İ', 'i').lower()
+    text = text.translate(_TURKISH_FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def stem(token):
+    if token.isdigit():
+        return token
+    changed = True
+    while changed:
+        changed = False
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                token = token[:-len(suffix)]
+                changed = True
+                break
+    return token
+
+
+def tokenize(text):
+    return [
+        stem(token)[:MAX_TERM_LENGTH]
+        for token in _TOKEN_RE.findall(normalize(text))
+        if token not in _STOPWORDS
+    ]
+
+
+def create_gin_index(apps, schema_editor):
+    # GIN indeksi yalnızca PostgreSQL'de anlamlı; SQLite ters indeks tablosunu kullanır
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS product_search_vector_gin '
+            'ON products_productsearchdocument USING gin (vector)'
+        )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS product_search_vector_gin')
+
+
+def backfill_documents(apps, schema_editor):
+    # Mevcut ürünler için dokümanları oluşturur; büyük kataloglarda `rebuild_search_index` tercih edilebilir
+    Product = apps.get_model('products', 'Product')
+    ProductSearchDocument = apps.get_model('products', 'ProductSearchDocument')
+    ProductSearchTerm = apps.get_model('products', 'ProductSearchTerm')
+    use_postgres = schema_editor.connection.vendor == 'postgresql'
+
+    for product in Product.objects.select_related('category', 'brand').iterator(chunk_size=1000):
+        taxonomy = ' '.join(filter(None, [
+            product.category.name if product.category_id else '',
+            product.brand.name if product.brand_id else '',
+        ]))
+        fields = {
+            'name_terms': tokenize(product.name),
+            'taxonomy_terms': tokenize(taxonomy),
+            'description_terms': tokenize(product.description),
+        }
+        document = ProductSearchDocument.objects.create(
+            product_id=product.pk, **{k: ' '.join(v) for k, v in fields.items()}
+        )
+        if use_postgres:
+            continue
+        weights = {}
+        for field, weight in (
+            ('description_terms', WEIGHT_DESCRIPTION),
+            ('taxonomy_terms', WEIGHT_TAXONOMY),
+            ('name_terms', WEIGHT_NAME),
+        ):
+            for term in fields[field]:
+                weights[term] = max(weights.get(term, 0), weight)
+        ProductSearchTerm.objects.bulk_create([
+            ProductSearchTerm(document=document, term=term, weight=weight) for term, weight in weights.items()
+        ])
+
+    if use_postgres:
+        schema_editor.execute(
+            "UPDATE products_productsearchdocument SET vector = "
+            "setweight(to_tsvector('simple', name_terms), 'A') || "
+            "setweight(to_tsvector('simple', taxonomy_terms), 'B') || "
+            "setweight(to_tsvector('simple', description_terms), 'C')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='products.product')),
+                ('name_terms', models.TextField(blank=True, default='')),
+                ('taxonomy_terms', models.TextField(blank=True, default='')),
+                ('description_terms', models.TextField(blank=True, default='')),
+                ('vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Search Document',
+                'verbose_name_plural': 'Product Search Documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='products.productsearchdocument')),
+            ],
+            options={
+                'verbose_name': 'Product Search Term',
+                'verbose_name_plural': 'Product Search Terms',
+                'indexes': [models.Index(fields=['term', 'document'], name='product_search_term_idx')],
+                'unique_together': {('document', 'term')},
+            },
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
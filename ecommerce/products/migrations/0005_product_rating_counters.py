@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:39
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_counters(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductRating = apps.get_model('products', 'ProductRating')
+    rows = ProductRating.objects.values('product_id').annotate(
+        total=Sum('stars'),
+        **{f'rating_{s}_count': Count('id', filter=Q(stars=s)) for s in range(1, 6)},
+    )
+    for row in rows.iterator():
+        product_id = row.pop('product_id')
+        Product.objects.filter(pk=product_id).update(rating_sum=row.pop('total'), **row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_rating_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('isActive', True)), fields=['category', '-created_at', '-id'], name='product_act_cat_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('isActive', True)), fields=['category', 'price', 'id'], name='product_act_cat_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('isActive', True)), fields=['brand', '-created_at', '-id'], name='product_act_brand_created_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:45
+
+from django.db import migrations, models
+
+
+def backfill_category_paths(apps, schema_editor):
+    Categories = apps.get_model('products', 'Categories')
+    rows = list(Categories.objects.values_list('pk', 'mainCategory_id'))
+    children = {}
+    for pk, parent in rows:
+        children.setdefault(parent, []).append(pk)
+    paths = {}
+    # Kökten ulaşılamayan kayıtlar (döngü) kök sayılır
+    for root in [pk for pk, parent in rows if parent is None] + [pk for pk, _ in rows]:
+        if root in paths:
+            continue
+        pending = [(root, '')]
+        while pending:
+            pk, prefix = pending.pop()
+            paths[pk] = f'{prefix}{pk}/'
+            pending.extend((child, paths[pk]) for child in children.get(pk, ()) if child not in paths)
+    for pk, path in paths.items():
+        Categories.objects.filter(pk=pk).update(path=path, depth=path.count('/') - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categories',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='categories',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='categories',
+            index=models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(backfill_category_paths, migrations.RunPython.noop),
+    ]
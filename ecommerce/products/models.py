@@ -1,4 +1,8 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat, Substr
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 
 # Create your models here.
@@ -13,14 +17,53 @@ class Categories(models.Model):
     seo_title = models.CharField(max_length=155, blank=True, null=True)
     seo_description = models.TextField(blank=True, null=True)
     slug = models.SlugField(max_length=155, unique=True, null=True, blank=True)
+    # Materyalize yol: kökten bu kategoriye id'ler ("1/5/12/"); alt ağaç = path__startswith (bkz. products/tree.py)
+    path = models.CharField(max_length=255, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name_plural = "Categories"
         verbose_name = "Category"
+        indexes = [
+            # PostgreSQL'de LIKE 'önek%' sorgusu için pattern_ops (diğer veritabanlarında düz indeks)
+            models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if self.pk and self.mainCategory_id:
+            parent_path = Categories.objects.filter(pk=self.mainCategory_id).values_list('path', flat=True).first()
+            if self.mainCategory_id == self.pk or f'/{self.pk}/' in f'/{parent_path or ""}':
+                raise ValidationError({'mainCategory': 'Kategori kendisinin ya da alt kategorisinin altına taşınamaz.'})
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'mainCategory' not in update_fields and self.path:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            paths = dict(Categories.objects.filter(pk__in=[self.pk, self.mainCategory_id]).values_list('pk', 'path'))
+            parent_path = paths.get(self.mainCategory_id, '') if self.mainCategory_id else ''
+            if self.pk and (self.mainCategory_id == self.pk or f'/{self.pk}/' in f'/{parent_path}'):
+                raise ValueError('Kategori kendisinin ya da alt kategorisinin altına taşınamaz.')
+            super().save(*args, **kwargs)
+            old_path, new_path = paths.get(self.pk, ''), f'{parent_path}{self.pk}/'
+            if old_path != new_path:
+                self._move(old_path, new_path)
+
+    def _move(self, old_path, new_path):
+        """Kategorinin ve (varsa) tüm alt ağacının yolunu tek UPDATE ile yeniden yazar."""
+        depth = new_path.count('/') - 1
+        if not old_path:  # yeni kayıt: alt ağacı yok
+            Categories.objects.filter(pk=self.pk).update(path=new_path, depth=depth)
+        else:
+            Categories.objects.filter(path__startswith=old_path).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1), output_field=models.CharField()),
+                depth=F('depth') + (depth - (old_path.count('/') - 1)),
+            )
+        self.path, self.depth = new_path, depth
+
 class Brands(models.Model):
     name = models.CharField(max_length=155)
     description = models.TextField(blank=True, null=True)
@@ -29,6 +72,7 @@ class Brands(models.Model):
     slug = models.SlugField(max_length=155, blank=True, null=True, unique=True)
     isActive = models.BooleanField(default=True)
     image = models.ImageField(upload_to='brands/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # bkz. ecommerce/images.py
 
     class Meta:
         verbose_name_plural = 'Brands'
@@ -37,6 +81,11 @@ class Brands(models.Model):
     def __str__(self):
         return self.name
 
+def unit_price_expression(prefix=''):
+    """`Product.unit_price` kuralının veritabanı karşılığı; `prefix` ilişki yolu içindir (örn. 'product__')."""
+    return Coalesce(f'{prefix}discount_price', f'{prefix}price')
+
+
 class Product(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
@@ -44,6 +93,7 @@ class Product(models.Model):
     stock = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # bkz. ecommerce/images.py
     isActive = models.BooleanField(default=True)
     main_window_display = models.BooleanField(default=True)
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
@@ -52,10 +102,31 @@ class Product(models.Model):
     brand = models.ForeignKey(Brands, on_delete=models.CASCADE,null=True,blank=True)
     rating_average = models.DecimalField(max_digits=3, decimal_places=2, default=0)
     rating_count = models.PositiveIntegerField(default=0)
+    # Puan toplamı ve yıldız dağılımı; ProductRating sinyallerinde F() ile artımlı güncellenir
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name_plural = 'Products'
         verbose_name = 'Product'
+        # Cursor sayfalama sıralamaları: (alan, id) — ProductViewSet.ordering_fields ile uyumlu
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+            models.Index(fields=['rating_average', 'id'], name='product_rating_id_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            # Kategori/marka listeleri; sadece aktif ürünler (bkz. advise_indexes)
+            models.Index(fields=['category', '-created_at', '-id'], condition=models.Q(isActive=True),
+                         name='product_act_cat_created_idx'),
+            models.Index(fields=['category', 'price', 'id'], condition=models.Q(isActive=True),
+                         name='product_act_cat_price_idx'),
+            models.Index(fields=['brand', '-created_at', '-id'], condition=models.Q(isActive=True),
+                         name='product_act_brand_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -66,6 +137,15 @@ class Product(models.Model):
         super(Product, self).save(*args, **kwargs)
         return self.slug
 
+    @property
+    def unit_price(self):
+        """Satış fiyatı: indirimli fiyat varsa o, yoksa liste fiyatı (sepet ve sipariş aynı kuralı kullanır)."""
+        return self.discount_price if self.discount_price is not None else self.price
+
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f'rating_{star}_count') for star in range(1, 6)}
+
 
 class Variations(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -76,6 +156,7 @@ class Variations(models.Model):
     stock = models.PositiveIntegerField(default=0)
     isActive = models.BooleanField(default=True)
     image = models.ImageField(upload_to='variations/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # bkz. ecommerce/images.py
 
     class Meta:
         verbose_name_plural = 'Variations'
@@ -84,11 +165,52 @@ class Variations(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.name}"
 
+    @property
+    def unit_price(self):
+        return self.discount_price if self.discount_price is not None else self.price
+
+
+class ProductSearchDocument(models.Model):
+    """Ürün başına normalize edilmiş arama dokümanı (bkz. products/search.py)."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    name_terms = models.TextField(blank=True, default='')
+    taxonomy_terms = models.TextField(blank=True, default='')
+    description_terms = models.TextField(blank=True, default='')
+    vector = SearchVectorField(null=True, blank=True)  # Sadece PostgreSQL'de doldurulur (GIN indeksli)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Product Search Documents'
+        verbose_name = 'Product Search Document'
+
+    def __str__(self):
+        return f"{self.product_id}: {self.name_terms}"
+
+
+class ProductSearchTerm(models.Model):
+    """PostgreSQL dışı backend'ler için yerel ters indeks (terim -> doküman)."""
+    document = models.ForeignKey(ProductSearchDocument, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('document', 'term')
+        indexes = [
+            models.Index(fields=['term', 'document'], name='product_search_term_idx'),
+        ]
+        verbose_name_plural = 'Product Search Terms'
+        verbose_name = 'Product Search Term'
+
+    def __str__(self):
+        return f"{self.term} -> {self.document_id}"
+
 
 # User model will be imported as string reference
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg, Count
-from django.db.models.signals import post_save, post_delete
+from decimal import Decimal
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Cast, Round
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 
 class ProductRating(models.Model):
@@ -107,18 +229,55 @@ class ProductRating(models.Model):
         return f"{self.product.name} - {self.user.email}: {self.stars}"
 
 
-def _recalculate_product_rating(product: Product) -> None:
-    agg = product.ratings.aggregate(avg=Avg('stars'), cnt=Count('id'))
-    product.rating_average = round((agg['avg'] or 0), 2) if agg['avg'] is not None else 0
-    product.rating_count = agg['cnt'] or 0
-    product.save(update_fields=['rating_average', 'rating_count'])
+def _apply_rating_delta(product_id, added=None, removed=None):
+    """
+    Ürünün puan sayaçlarını tek bir UPDATE ile atomik olarak günceller.
+    `added`/`removed` eklenen ve çıkarılan yıldız değeridir (puan değişiminde ikisi birden).
+    Tüm ifadeler satırın eski değerleri üzerinden hesaplandığı için eşzamanlı yazımlarda kayıp olmaz.
+    """
+    count_delta = (1 if added else 0) - (1 if removed else 0)
+    sum_delta = (added or 0) - (removed or 0)
+    new_count = F('rating_count') + count_delta
+    new_sum = F('rating_sum') + sum_delta
+
+    updates = {
+        'rating_count': new_count,
+        'rating_sum': new_sum,
+        'rating_average': Case(
+            When(rating_count__gt=-count_delta, then=Cast(
+                Round(Cast(new_sum, models.FloatField()) / new_count, 2),
+                models.DecimalField(max_digits=3, decimal_places=2),
+            )),
+            default=Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=3, decimal_places=2),
+        ),
+    }
+    if added:
+        updates[f'rating_{added}_count'] = F(f'rating_{added}_count') + 1
+    if removed:
+        updates[f'rating_{removed}_count'] = F(f'rating_{removed}_count') - 1
+    if added == removed:
+        updates.pop(f'rating_{added}_count', None)
+    Product.objects.filter(pk=product_id).update(**updates)
+
+
+@receiver(post_init, sender=ProductRating)
+def remember_original_stars(sender, instance: 'ProductRating', **kwargs):
+    # update_or_create yıldız değerini değiştirdiğinde eski değeri bilmek için
+    instance._original_stars = instance.stars if instance.pk else None
 
 
 @receiver(post_save, sender=ProductRating)
-def update_product_rating_on_save(sender, instance: 'ProductRating', **kwargs):
-    _recalculate_product_rating(instance.product)
+def update_product_rating_on_save(sender, instance: 'ProductRating', created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        _apply_rating_delta(instance.product_id, added=instance.stars)
+    elif instance._original_stars != instance.stars:
+        _apply_rating_delta(instance.product_id, added=instance.stars, removed=instance._original_stars)
+    instance._original_stars = instance.stars
 
 
 @receiver(post_delete, sender=ProductRating)
 def update_product_rating_on_delete(sender, instance: 'ProductRating', **kwargs):
-    _recalculate_product_rating(instance.product)
+    _apply_rating_delta(instance.product_id, removed=instance._original_stars or instance.stars)
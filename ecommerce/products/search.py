@@ -0,0 +1,272 @@
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework import filters
+
+from .models import Brands, Categories, Product, ProductSearchDocument, ProductSearchTerm
+
+# Ağırlıklar: ürün adı > kategori/marka > açıklama (PostgreSQL'de A/B/C)
+WEIGHT_NAME = 4
+WEIGHT_TAXONOMY = 2
+WEIGHT_DESCRIPTION = 1
+
+# Arama dokümanına giren Product alanları; bunlar değişmediyse indeks yeniden yazılmaz
+INDEXED_FIELDS = {'name', 'description', 'category', 'brand', 'isActive'}
+
+MIN_STEM_LENGTH = 4
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+_TURKISH_FOLD = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u',
+})
+
+# Çekim ekleri (ASCII katlanmış hâlleriyle), uzundan kısaya.
+# Yapım ekleri (-lık, -lı, -sız) anlamı değiştirdiği için bilerek atılmaz: "kablosuz" ayrı bir terim
+# olarak indekslenir ve "kablosuz" araması yalnızca "kablo" geçen ürünleri getirmez. Sorgu terimleri
+# önek olarak eşleştiğinden (yazarken arama) "kablo" araması ise "kablosuz" ürünleri de kapsar.
+_SUFFIXES = sorted({
+    'lar', 'ler',
+    'lari', 'leri', 'larin', 'lerin', 'lara', 'lere', 'larda', 'lerde', 'lardan', 'lerden',
+    'nin', 'nun', 'in', 'un',
+    'da', 'de', 'ta', 'te',
+    'dan', 'den', 'tan', 'ten',
+    'ya', 'ye', 'yi', 'yu',
+    'si', 'su',
+    'la', 'le', 'yla', 'yle',
+}, key=len, reverse=True)
+
+_STOPWORDS = {
+    've', 'veya', 'ile', 'icin', 'bir', 'bu', 'su', 'o', 'da', 'de', 'mi', 'mu', 'ama', 'en', 'cok',
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Türkçe büyük/küçük harf kurallarıyla küçültür ve aksanları ASCII'ye katlar."""
+    if not text:
+        return ''
+    text = text.replace('I', 'ı').replace('İ', 'i').lower()
+    text = text.translate(_TURKISH_FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def stem(token):
+    """Hafif Türkçe kök bulucu: sondaki çekim eklerini kök en az MIN_STEM_LENGTH kalana kadar atar."""
+    if token.isdigit():
+        return token
+    changed = True
+    while changed:
+        changed = False
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                token = token[:-len(suffix)]
+                changed = True
+                break
+    return token
+
+
+def tokenize(text):
+    """Metni normalize edilmiş, köklenmiş terim listesine çevirir (sıra korunur)."""
+    terms = []
+    for token in _TOKEN_RE.findall(normalize(text)):
+        if token in _STOPWORDS:
+            continue
+        terms.append(stem(token)[:MAX_TERM_LENGTH])
+    return terms
+
+
+def parse_query(query):
+    """Arama kutusundan gelen ifadeyi tekrarsız terimlere böler."""
+    terms = []
+    for term in tokenize(query):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def _document_fields(product):
+    taxonomy = ' '.join(filter(None, [
+        product.category.name if product.category_id else '',
+        product.brand.name if product.brand_id else '',
+    ]))
+    return {
+        'name_terms': ' '.join(tokenize(product.name)),
+        'taxonomy_terms': ' '.join(tokenize(taxonomy)),
+        'description_terms': ' '.join(tokenize(product.description)),
+    }
+
+
+def _postings(document):
+    weights = {}
+    for field, weight in (
+        ('description_terms', WEIGHT_DESCRIPTION),
+        ('taxonomy_terms', WEIGHT_TAXONOMY),
+        ('name_terms', WEIGHT_NAME),
+    ):
+        for term in getattr(document, field).split():
+            weights[term] = max(weights.get(term, 0), weight)
+    return [
+        ProductSearchTerm(document_id=document.product_id, term=term, weight=weight)
+        for term, weight in weights.items()
+    ]
+
+
+def _update_vectors(product_ids):
+    from django.contrib.postgres.search import SearchVector
+
+    ProductSearchDocument.objects.filter(product_id__in=product_ids).update(
+        vector=(
+            SearchVector('name_terms', weight='A', config='simple')
+            + SearchVector('taxonomy_terms', weight='B', config='simple')
+            + SearchVector('description_terms', weight='C', config='simple')
+        )
+    )
+
+
+def index_products(products):
+    """Verilen ürünlerin arama dokümanlarını (ve SQLite'ta ters indeksini) yeniden yazar."""
+    products = list(products)
+    if not products:
+        return 0
+    ids = [p.pk for p in products]
+    documents = [ProductSearchDocument(product_id=p.pk, **_document_fields(p)) for p in products]
+
+    with transaction.atomic():
+        ProductSearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['name_terms', 'taxonomy_terms', 'description_terms', 'updated_at'],
+        )
+        if uses_postgres():
+            _update_vectors(ids)
+        else:
+            ProductSearchTerm.objects.filter(document_id__in=ids).delete()
+            postings = []
+            for document in documents:
+                postings.extend(_postings(document))
+            ProductSearchTerm.objects.bulk_create(postings, batch_size=1000)
+    return len(documents)
+
+
+def reindex_queryset(queryset, batch_size=1000):
+    """Bir ürün kümesini id sırasıyla parça parça indeksler."""
+    queryset = queryset.select_related('category', 'brand').order_by('pk')
+    total = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return total
+        total += index_products(batch)
+        last_pk = batch[-1].pk
+
+
+def rebuild_index(batch_size=1000):
+    """Tüm katalog için arama indeksini sıfırdan kurar."""
+    with transaction.atomic():
+        ProductSearchTerm.objects.all().delete()
+        ProductSearchDocument.objects.all().delete()
+    return reindex_queryset(Product.objects.all(), batch_size=batch_size)
+
+
+def _fallback_matches(terms):
+    """SQLite için ters indeksten tüm terimleri önek olarak (PostgreSQL'deki `terim:*` gibi) içeren ürünleri ve skorlarını verir."""
+    any_term = Q()
+    matched = {}
+    for i, term in enumerate(terms):
+        # startswith yerine aralık sorgusu: terim indeksi her backend'de kullanılabilir
+        prefix = Q(term__gte=term, term__lt=term + '\uffff')
+        any_term |= prefix
+        matched[f'm{i}'] = Max(Case(When(prefix, then=Value(1)), default=Value(0), output_field=IntegerField()))
+    rows = (
+        ProductSearchTerm.objects.filter(any_term)
+        .values('document_id')
+        .annotate(score=Sum('weight'), **matched)
+    )
+    for i in range(len(terms)):
+        rows = rows.filter(**{f'm{i}': 1})
+    return rows
+
+
+def _search_parts(terms):
+    """Terimler için (filtre koşulu, alaka skoru ifadesi)."""
+    if uses_postgres():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        ts_query = SearchQuery(' & '.join(f'{t}:*' for t in terms), search_type='raw', config='simple')
+        return Q(search_document__vector=ts_query), SearchRank('search_document__vector', ts_query)
+
+    matches = _fallback_matches(terms)
+    score = matches.filter(document_id=OuterRef('pk')).values('score')[:1]
+    return Q(pk__in=matches.values('document_id')), Subquery(score, output_field=FloatField())
+
+
+def search_condition(query):
+    """Aramanın yalnızca filtre koşulu (skor hesaplanmaz; örn. facet sayımları için)."""
+    terms = parse_query(query)
+    return _search_parts(terms)[0] if terms else Q()
+
+
+def search_products(queryset, query):
+    """
+    Ürün kümesini tam metin aramasıyla süzer ve `search_rank` ile işaretler.
+    PostgreSQL'de tsvector/GIN, diğer backend'lerde yerel ters indeks kullanılır.
+    """
+    terms = parse_query(query)
+    if not terms:
+        # Sadece durak kelime/noktalama girildiyse filtre uygulanmaz
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    condition, rank = _search_parts(terms)
+    return queryset.filter(condition).annotate(search_rank=rank)
+
+
+class SearchRankOrderingFilter(filters.OrderingFilter):
+    """Arama yapılıp sıralama seçilmediyse sonuçları alaka düzeyine göre sıralar."""
+
+    def get_default_ordering(self, view):
+        ordering = super().get_default_ordering(view)
+        if view.request.query_params.get('search'):
+            return ['-search_rank', *(ordering or [])]
+        return ordering
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+# Silme işlemleri için ayrı sinyal gerekmez: doküman ve terimler Product'a CASCADE ile bağlı,
+# Categories/Brands silindiğinde de ürünler (dolayısıyla dokümanları) CASCADE ile silinir.
+@receiver(post_save, sender=Product)
+def index_product_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    products = Product.objects.select_related('category', 'brand').filter(pk=instance.pk)
+    transaction.on_commit(lambda: index_products(products))
+
+
+@receiver(post_save, sender=Categories)
+def reindex_category_products(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: reindex_queryset(Product.objects.filter(category=instance)))
+
+
+@receiver(post_save, sender=Brands)
+def reindex_brand_products(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: reindex_queryset(Product.objects.filter(brand=instance)))
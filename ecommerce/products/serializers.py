@@ -1,21 +1,37 @@
 from rest_framework import serializers
+
+from ecommerce.fieldsets import SparseFieldsetSerializerMixin
+from ecommerce.images import SrcsetField
 from .models import Product, ProductRating, Brands, Categories
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     rating_average = serializers.DecimalField(max_digits=3, decimal_places=2, read_only=True)
     rating_count = serializers.IntegerField(read_only=True)
+    rating_histogram = serializers.ReadOnlyField()
     brand = serializers.SlugRelatedField(read_only=True, slug_field='name')
     category = serializers.SlugRelatedField(read_only=True, slug_field='name')
     brand_id = serializers.PrimaryKeyRelatedField(queryset=Brands.objects.all(), source='brand', write_only=True, required=False, allow_null=True)
     category_id = serializers.PrimaryKeyRelatedField(queryset=Categories.objects.all(), source='category', write_only=True, required=False, allow_null=True)
+    image_srcset = SrcsetField(source='image_derivatives')
 
     class Meta:
         model = Product
         fields = [
-            'id', 'rating_average', 'rating_count', 'name', 'description', 'price', 'stock',
-            'created_at', 'image', 'isActive', 'main_window_display', 'discount_price', 'slug',
+            'id', 'rating_average', 'rating_count', 'rating_histogram', 'name', 'description', 'price', 'stock',
+            'created_at', 'image', 'image_srcset', 'isActive', 'main_window_display', 'discount_price', 'slug',
             'category', 'brand', 'category_id', 'brand_id'
         ]
+        # ?fields=card gibi adlandırılmış alan kümeleri (bkz. ecommerce/fieldsets.py)
+        field_presets = {
+            'card': ['id', 'name', 'slug', 'price', 'discount_price', 'image', 'image_srcset', 'rating_average', 'rating_count'],
+            'detail': [
+                'id', 'name', 'slug', 'description', 'price', 'discount_price', 'stock', 'image', 'image_srcset',
+                'rating_average', 'rating_count', 'rating_histogram', 'category', 'brand', 'created_at',
+            ],
+            'admin': '__all__',
+        }
+        # Model özelliklerinin okuduğu sütunlar (sorgu daraltma için)
+        field_sources = {'rating_histogram': [f'rating_{star}_count' for star in range(1, 6)]}
 
 
 class ProductRatingSerializer(serializers.ModelSerializer):
@@ -26,13 +42,27 @@ class ProductRatingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'user']
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    parent = serializers.PrimaryKeyRelatedField(source='mainCategory', read_only=True)
+
     class Meta:
         model = Categories
-        fields = ['id', 'name', 'slug', 'seo_title', 'seo_description', 'isActive']
+        fields = ['id', 'name', 'slug', 'parent', 'seo_title', 'seo_description', 'isActive']
+        field_presets = {
+            'card': ['id', 'name', 'slug', 'parent'],
+            'detail': ['id', 'name', 'slug', 'parent', 'seo_title', 'seo_description'],
+            'admin': '__all__',
+        }
+
 
+class BrandSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    image_srcset = SrcsetField(source='image_derivatives')
 
-class BrandSerializer(serializers.ModelSerializer):
     class Meta:
         model = Brands
-        fields = ['id', 'name', 'description', 'slug', 'seo_title', 'seo_description', 'isActive', 'image']
+        fields = ['id', 'name', 'description', 'slug', 'seo_title', 'seo_description', 'isActive', 'image', 'image_srcset']
+        field_presets = {
+            'card': ['id', 'name', 'slug', 'image', 'image_srcset'],
+            'detail': ['id', 'name', 'slug', 'description', 'seo_title', 'seo_description', 'image', 'image_srcset'],
+            'admin': '__all__',
+        }
@@ -1,3 +1,1008 @@
-from django.test import TestCase
+import base64
+import datetime
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+import brotli
+import zstandard
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from ecommerce.cdn import get_purger
+from ecommerce.images import available_formats
+from ecommerce.pagination import KeysetCursorPagination, record_page_querysets
+from ecommerce.renderers import ORJSONParser, ORJSONRenderer
+from ecommerce.testing import QueryCountMixin
+from jobs.models import Job
+from jobs.queue import run_jobs
+from users.models import User
+from .cache import bump_version, get_cache, get_stats
+from .facets import price_buckets
+from .index import get_catalog_index
+from .management.commands.advise_indexes import SHAPES, is_covered, propose_index
+from .models import Brands, Categories, Product, ProductRating
+from .search import normalize, parse_query, reindex_queryset, search_products, stem, tokenize
+from .tree import get_category_tree
+
+
+class ProductListQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.categories = [Categories.objects.create(name=f'Kategori {i}') for i in range(3)]
+        self.brands = [Brands.objects.create(name=f'Marka {i}') for i in range(3)]
+
+    def grow_products(self, size):
+        count = Product.objects.count()
+        # on_commit ile çalışan arama indeksi ve cache sürüm sinyalleri de tetiklensin
+        with self.captureOnCommitCallbacks(execute=True):
+            while count < size:
+                Product.objects.create(
+                    name=f'Ürün {count}', description='-', price=10, stock=5,
+                    category=self.categories[count % 3], brand=self.brands[count % 3],
+                )
+                count += 1
+
+    def test_product_list_query_count_is_constant(self):
+        self.assertConstantQueries('/api/products/products/', self.grow_products)
+
+    def test_featured_query_count_is_constant(self):
+        self.assertConstantQueries('/api/products/products/featured/', self.grow_products)
+
+    def test_category_products_query_count_is_constant(self):
+        url = f'/api/products/categories/{self.categories[0].pk}/products/'
+        get_category_tree()  # ağaç kategori sürümü başına bir kez kurulur
+        self.assertConstantQueries(url, self.grow_products)
+
+
+class KeysetPaginationTests(TestCase):
+    URL = '/api/products/products/'
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Categories.objects.create(name='Kategori')
+        brand = Brands.objects.create(name='Marka')
+        # Üç farklı fiyat, her fiyatta birden çok ürün: sayfa sınırları eşit değerlerin ortasına düşer
+        cls.products = [
+            Product.objects.create(
+                name=f'Ürün {i}', description='-', price=(10, 20, 30)[i % 3], stock=5, category=category, brand=brand,
+            )
+            for i in range(8)
+        ]
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+
+    def ids(self, data):
+        return [row['id'] for row in data['results']]
+
+    def test_links_walk_equal_sort_values_in_id_order(self):
+        for ordering, key in (('price', lambda p: (p.price, p.pk)), ('-price', lambda p: (-p.price, -p.pk))):
+            expected = [p.pk for p in sorted(self.products, key=key)]
+            pages, data = [], self.client.get(self.URL, {'ordering': ordering, 'page_size': 3}).json()
+            self.assertIsNone(data['previous'])
+            while True:
+                pages.append(self.ids(data))
+                if not data['next']:
+                    break
+                data = self.client.get(data['next']).json()
+            self.assertEqual(pages, [expected[:3], expected[3:6], expected[6:]])
+
+            # Son sayfadan geri dönüş aynı sayfaları verir
+            back = self.client.get(data['previous']).json()
+            self.assertEqual(self.ids(back), expected[3:6])
+            self.assertEqual(self.ids(self.client.get(back['previous']).json()), expected[:3])
+
+    def test_tampered_cursor_is_not_found(self):
+        cursor = parse_qs(urlsplit(self.client.get(self.URL, {'page_size': 3}).json()['next']).query)['cursor'][0]
+        payload = json.loads(base64.urlsafe_b64decode(cursor))
+        short = base64.urlsafe_b64encode(json.dumps({'v': payload['v'][:1]}).encode()).decode()
+        for cursor in ('bozuk!', cursor[:-4], base64.urlsafe_b64encode(b'[1, 2]').decode(), short):
+            response = self.client.get(self.URL, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+            self.assertEqual(response.json(), {'detail': 'Geçersiz cursor'})
+
+    def test_cursor_values_must_match_field_types(self):
+        def cursor(*values):
+            return base64.urlsafe_b64encode(json.dumps({'v': list(values)}).encode()).decode()
+
+        product = self.products[0]
+        created, price = product.created_at.isoformat(), str(product.price)
+        for ordering, values in (
+            ('-created_at', ('abc', product.pk)),
+            ('-created_at', ('2026-13-45T00:00:00', product.pk)),
+            ('-created_at', (None, product.pk)),
+            ('price', ('abc', product.pk)),
+            ('price', ('NaN', product.pk)),
+            ('price', ([1], product.pk)),
+            ('price', (price, 'abc')),
+            ('-created_at', (created, None)),
+            ('-created_at', (created, {'id': 1})),
+        ):
+            response = self.client.get(self.URL, {'ordering': ordering, 'cursor': cursor(*values)})
+            self.assertEqual(response.status_code, 404, (ordering, values))
+            self.assertEqual(response.json(), {'detail': 'Geçersiz cursor'})
+        # Elle yazılmış ama geçerli değerler sayfalanır
+        response = self.client.get(self.URL, {'ordering': 'price', 'cursor': cursor(price, product.pk)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_page_size_is_clamped(self):
+        def page_size(value):
+            data = self.client.get(self.URL, {'page_size': value}).json()
+            return len(data['results']), data['next'] and parse_qs(urlsplit(data['next']).query)['page_size'][0]
+
+        self.assertEqual(page_size(3), (3, '3'))
+        self.assertEqual(page_size(1000), (8, None))
+        self.assertEqual(page_size(0), (8, None))
+        with mock.patch.object(KeysetCursorPagination, 'max_page_size', 5):
+            self.assertEqual(page_size(1000), (5, '5'))
+        with mock.patch.object(KeysetCursorPagination, 'page_size', 2):
+            self.assertEqual(page_size('abc'), (2, '2'))
+            self.assertEqual(page_size(-1), (2, '2'))
+
+    def test_unpaginated_without_parameters(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(len(response.json()), 8)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.category = Categories.objects.create(name='Ses')
+        self.brand = Brands.objects.create(name='Marka')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.name_match = self.create('Kablosuz Kulaklık')
+            self.taxonomy_match = self.create('Hoparlör', category=Categories.objects.create(name='Kulaklıklar'))
+            self.description_match = self.create('Şarj Aleti', description='Kulaklık ve telefonlar için')
+            self.cable = self.create('USB Kablo')
+
+    def create(self, name, description='-', category=None):
+        return Product.objects.create(
+            name=name, description=description, price=10, stock=5,
+            category=category or self.category, brand=self.brand,
+        )
+
+    def search(self, query):
+        return list(search_products(Product.objects.all(), query).order_by('-search_rank', 'pk'))
+
+    def test_inflectional_suffixes_are_stemmed(self):
+        self.assertEqual(stem('telefonlar'), 'telefon')
+        self.assertEqual(stem('kitaplarda'), 'kitap')
+        self.assertEqual(stem('bilgisayarlardan'), 'bilgisayar')
+        self.assertEqual(stem('kulakliklari'), 'kulaklik')
+        # Kök MIN_STEM_LENGTH'ten kısa kalacaksa ek atılmaz; yapım ekleri ve sayılar korunur
+        self.assertEqual(stem('evler'), 'evler')
+        self.assertEqual(stem('kablosuz'), 'kablosuz')
+        self.assertEqual(stem('2024'), '2024')
+
+    def test_turkish_case_folding(self):
+        self.assertEqual(normalize('IŞIK İstanbul Çağrı ÜNLÜ café'), 'isik istanbul cagri unlu cafe')
+        self.assertEqual(tokenize('Telefonlar ve Kılıflar için'), ['telefon', 'kilif'])
+        self.assertEqual(parse_query('kablo KABLO Kablolar'), ['kablo'])
+        self.assertEqual(parse_query('ve ile !!'), [])
+
+    def test_fallback_ranks_name_over_taxonomy_over_description(self):
+        self.assertEqual(
+            self.search('KULAKLIK'), [self.name_match, self.taxonomy_match, self.description_match],
+        )
+        response = APIClient().get('/api/products/products/', {'search': 'kulaklık'})
+        self.assertEqual(
+            [row['id'] for row in response.json()],
+            [self.name_match.pk, self.taxonomy_match.pk, self.description_match.pk],
+        )
+        # Tüm terimler eşleşmeli
+        self.assertEqual(self.search('kulaklık telefon'), [self.description_match])
+
+    def test_query_terms_match_as_prefixes(self):
+        # Yazarken arama: "kablo" "kablosuz"u da kapsar, "kablosuz" ise yalnızca kendisini bulur
+        self.assertEqual(set(self.search('kablo')), {self.name_match, self.cable})
+        self.assertEqual(self.search('kablosuz'), [self.name_match])
+        self.assertEqual(self.search('kab'), self.search('kablo'))
+
+    def test_edits_are_reindexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cable.name = 'HDMI Adaptör'
+            self.cable.save()
+        self.assertEqual(self.search('usb'), [])
+        self.assertEqual(self.search('adaptör'), [self.cable])
+
+        # İndekslenmeyen alanlar dokümanı yeniden yazmaz
+        with mock.patch('products.search.index_products') as index_products, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.cable.save(update_fields=['stock'])
+        index_products.assert_not_called()
+
+        # Kategori adı değişince ürünleri yeniden indekslenir; toplu güncellemeler reindex_queryset ile
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Aksesuar'
+            self.category.save()
+        self.assertIn(self.cable, self.search('aksesuar'))
+        Product.objects.filter(pk=self.cable.pk).update(name='Toplu')
+        self.assertEqual(self.search('toplu'), [])
+        self.assertEqual(reindex_queryset(Product.objects.filter(pk=self.cable.pk)), 1)
+        self.assertEqual(self.search('toplu'), [self.cable])
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [User.objects.create_user(username=f'u{i}', email=f'u{i}@example.com', password='x') for i in range(3)]
+        self.product = Product.objects.create(name='Ürün', description='-', price=10, stock=5)
+
+    def rate(self, user, stars):
+        self.client.force_authenticate(user)
+        return self.client.post(f'/api/products/products/{self.product.pk}/rate/', {'stars': stars}, format='json')
+
+    def assertCounters(self, count, total, average, distribution):
+        self.product.refresh_from_db()
+        self.assertEqual(
+            (self.product.rating_count, self.product.rating_sum, self.product.rating_average),
+            (count, total, Decimal(average)),
+        )
+        self.assertEqual([getattr(self.product, f'rating_{s}_count') for s in range(1, 6)], distribution)
+
+    def test_new_ratings_and_star_changes(self):
+        self.assertEqual(self.rate(self.users[0], 5).status_code, 201)
+        self.assertEqual(self.rate(self.users[1], 4).status_code, 201)
+        self.assertCounters(2, 9, '4.50', [0, 0, 0, 1, 1])
+
+        # update_or_create ile yıldız değişimi: adet aynı, eski yıldız düşülür
+        self.assertEqual(self.rate(self.users[0], 2).status_code, 200)
+        self.assertCounters(2, 6, '3.00', [0, 1, 0, 1, 0])
+        self.rate(self.users[2], 2)
+        self.assertCounters(3, 8, '2.67', [0, 2, 0, 1, 0])
+        # Aynı yıldızla tekrar: sayaçlar değişmez
+        self.rate(self.users[2], 2)
+        self.assertCounters(3, 8, '2.67', [0, 2, 0, 1, 0])
+        self.assertEqual(self.rate(self.users[2], 6).status_code, 400)
+
+    def test_deletions_reset_average_when_last_rating_goes(self):
+        ratings = [ProductRating.objects.create(product=self.product, user=u, stars=s) for u, s in zip(self.users, (5, 3, 1))]
+        self.assertCounters(3, 9, '3.00', [1, 0, 1, 0, 1])
+        ratings[0].delete()
+        self.assertCounters(2, 4, '2.00', [1, 0, 1, 0, 0])
+        # Değiştirilip kaydedilmeden silinen puan eski (veritabanındaki) yıldızıyla düşülür
+        ratings[1].stars = 5
+        ratings[1].delete()
+        self.assertCounters(1, 1, '1.00', [1, 0, 0, 0, 0])
+        ratings[2].delete()
+        self.assertCounters(0, 0, '0.00', [0, 0, 0, 0, 0])
+
+    def test_reconcile_repairs_drifted_counters(self):
+        other = Product.objects.create(name='Diğer', description='-', price=10, stock=5)
+        ProductRating.objects.create(product=self.product, user=self.users[0], stars=4)
+        ProductRating.objects.create(product=self.product, user=self.users[1], stars=5)
+        Product.objects.filter(pk=self.product.pk).update(rating_count=7, rating_sum=1, rating_4_count=0)
+        Product.objects.filter(pk=other.pk).update(rating_count=1, rating_sum=3, rating_average=3, rating_3_count=1)
+
+        out = io.StringIO()
+        call_command('reconcile_ratings', '--dry-run', stdout=out)
+        self.assertIn('2 sapma bulundu', out.getvalue())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 7)
+
+        out = io.StringIO()
+        call_command('reconcile_ratings', '--batch-size', 1, stdout=out)
+        self.assertIn('2 ürün onarıldı', out.getvalue())
+        self.assertCounters(2, 9, '4.50', [0, 0, 0, 1, 1])
+        other.refresh_from_db()
+        self.assertEqual((other.rating_count, other.rating_sum, other.rating_average, other.rating_3_count), (0, 0, 0, 0))
+
+
+class CatalogCacheTests(TestCase):
+    FEATURED = '/api/products/products/featured/'
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.brand = Brands.objects.create(name='Marka')
+        self.product = Product.objects.create(
+            name='Ürün', description='-', price=10, stock=5, main_window_display=True,
+            category=Categories.objects.create(name='Kategori'), brand=self.brand,
+        )
+
+    def stats(self, endpoint='ProductViewSet.featured'):
+        return get_stats().get(endpoint, {'hit': 0, 'miss': 0, 'not_modified': 0})
+
+    def get(self, url, outcome, endpoint='ProductViewSet.featured'):
+        """İsteği atar ve yalnızca `outcome` sayacının bir arttığını doğrular."""
+        before = self.stats(endpoint)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        after = self.stats(endpoint)
+        self.assertEqual(
+            {key: after[key] - before[key] for key in ('hit', 'miss', 'not_modified')},
+            {key: int(key == outcome) for key in ('hit', 'miss', 'not_modified')},
+        )
+        return response.json()
+
+    def test_hit_skips_the_database(self):
+        self.get(self.FEATURED, 'miss')
+        with self.assertNumQueries(0):
+            data = self.get(self.FEATURED, 'hit')
+        self.assertEqual([row['id'] for row in data], [self.product.pk])
+        # Farklı query parametreleri ayrı girdidir
+        self.get(self.FEATURED + '?page_size=5', 'miss')
+
+    def test_saves_invalidate_dependent_entries_only(self):
+        self.get(self.FEATURED, 'miss')
+        self.get('/api/products/brands/', 'miss', 'BrandViewSet.list')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Yeni ad'
+            self.product.save()
+        self.assertEqual(self.get(self.FEATURED, 'miss')[0]['name'], 'Yeni ad')
+        # Marka listesi Product sürümüne bağlı değil
+        self.get('/api/products/brands/', 'hit', 'BrandViewSet.list')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertEqual(self.get(self.FEATURED, 'miss'), [])
+
+    def test_bump_version_invalidates_signalless_writes(self):
+        self.get(self.FEATURED, 'miss')
+        Product.objects.filter(pk=self.product.pk).update(name='Toplu')
+        self.assertEqual(self.get(self.FEATURED, 'hit')[0]['name'], 'Ürün')
+        bump_version(Product, [self.product.pk])
+        self.assertEqual(self.get(self.FEATURED, 'miss')[0]['name'], 'Toplu')
+
+    def test_stats_are_admin_only(self):
+        self.get(self.FEATURED, 'miss')
+        self.get(self.FEATURED, 'hit')
+        self.assertEqual(self.client.get('/api/products/cache-stats/').status_code, 401)
+        self.client.force_authenticate(User.objects.create_user(username='u', email='u@example.com', password='x'))
+        self.assertEqual(self.client.get('/api/products/cache-stats/').status_code, 403)
+
+        self.client.force_authenticate(User.objects.create_user(
+            username='a', email='a@example.com', password='x', is_staff=True,
+        ))
+        counts = self.client.get('/api/products/cache-stats/').json()['ProductViewSet.featured']
+        self.assertEqual(set(counts), {'hit', 'miss', 'not_modified', 'hit_ratio'})
+        self.assertEqual(counts['hit_ratio'], round(counts['hit'] / (counts['hit'] + counts['miss']), 4))
+
+
+class IndexAdvisorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Categories.objects.create(name='Kategori')
+        cls.brand = Brands.objects.create(name='Marka')
+        for i in range(30):
+            Product.objects.create(name=f'Ürün {i}', description='-', price=10 + i, stock=5, category=cls.category, brand=cls.brand)
+
+    def test_page_querysets_are_recorded_and_matched_to_partial_indexes(self):
+        with record_page_querysets() as recorded:
+            APIClient().get('/api/products/products/', {'brand': self.brand.pk, 'page_size': 5})
+        self.assertEqual(len(recorded), 1)
+        model, index = propose_index(recorded[0])
+        self.assertIs(model, Product)
+        self.assertEqual((index.fields, index.condition), (['brand', '-created_at', '-id'], Q(isActive=True)))
+        # 0006'daki product_act_brand_created_idx aynı alanları ve koşulu kapsar
+        self.assertTrue(is_covered(Product, index))
+
+        _, index = propose_index(Product.objects.filter(isActive=True, brand=self.brand).order_by('name', 'pk')[:5])
+        self.assertEqual(index.fields, ['brand', 'name', 'id'])
+        self.assertFalse(is_covered(Product, index))
+
+    def test_command_replays_endpoints_and_reports_plans(self):
+        User.objects.create_user(username='u', email='u@example.com', password='x')
+        out, err = io.StringIO(), io.StringIO()
+        call_command('advise_indexes', '--verbose-plans', stdout=out, stderr=err)
+        output = out.getvalue()
+
+        plans = dict(block.split('\n', 1) for block in output.split('\n-- ')[1:])
+        for label, _, _ in SHAPES:
+            self.assertIn(label, plans)
+        self.assertIn('product_act_cat_created_idx', plans['ürünler: kategori'])
+        self.assertIn('product_act_cat_price_idx', plans['ürünler: kategori, fiyat sıralı'])
+        self.assertIn('product_act_brand_created_idx', plans['ürünler: marka'])
+        report = output.rsplit('sorgu ', 1)[1].splitlines()[1:]
+        self.assertEqual(len(report), len(SHAPES))
+        self.assertEqual(err.getvalue(), '')
+        # Katalog ve sipariş sorgularının hepsi mevcut indekslerle karşılanıyor: öneri yok
+        self.assertNotIn('models.Index(', output)
+
+
+@override_settings(ROOT_URLCONF='ecommerce.asgi_urls')
+class AsyncCatalogViewTests(TestCase):
+    """ASGI'deki async katalog view'ları senkron DRF view'larıyla aynı yanıtı vermeli."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Categories.objects.create(name='Kategori')
+        cls.brand = Brands.objects.create(name='Marka')
+        cls.products = [
+            Product.objects.create(
+                name=f'Ürün {i}', description='-', price=10 + i, stock=5, category=cls.category,
+                brand=cls.brand, main_window_display=i % 2 == 0, discount_price=5 if i % 3 == 0 else None,
+            )
+            for i in range(6)
+        ]
+
+    async def assertSameAsSync(self, url, params=None):
+        response = await self.async_client.get(url, params or {})
+        with override_settings(ROOT_URLCONF='ecommerce.urls'):
+            expected = await sync_to_async(APIClient().get)(url, params or {})
+        self.assertEqual(response.status_code, expected.status_code, response.content)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    async def test_product_endpoints_match_sync(self):
+        await self.assertSameAsSync('/api/products/products/')
+        await self.assertSameAsSync('/api/products/products/', {'page_size': 2, 'ordering': 'price'})
+        await self.assertSameAsSync('/api/products/products/', {'on_sale': 'true', 'min_price': 12})
+        await self.assertSameAsSync('/api/products/products/', {'category': self.category.pk})
+        await self.assertSameAsSync('/api/products/products/featured/')
+        await self.assertSameAsSync('/api/products/products/on_sale/')
+        await self.assertSameAsSync('/api/products/products/top_rated/')
+        await self.assertSameAsSync('/api/products/products/filter_options/')
+        await self.assertSameAsSync('/api/products/products/filter_options/', {'brand': self.brand.pk, 'min_price': 12})
+        await self.assertSameAsSync(f'/api/products/products/{self.products[0].pk}/')
+
+    async def test_taxonomy_endpoints_match_sync(self):
+        await self.assertSameAsSync('/api/products/categories/')
+        await self.assertSameAsSync('/api/products/categories/tree/')
+        await self.assertSameAsSync(f'/api/products/categories/{self.category.pk}/')
+        await self.assertSameAsSync(f'/api/products/categories/{self.category.pk}/products/', {'page_size': 4})
+        await self.assertSameAsSync('/api/products/brands/')
+        await self.assertSameAsSync(f'/api/products/brands/{self.brand.pk}/products/')
+
+    async def test_filterset_parameters_are_validated(self):
+        other = await Brands.objects.acreate(name='Diğer')
+        for params in ({'brand': 'abc'}, {'brand': 999999}):
+            response = await self.assertSameAsSync('/api/products/products/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(iter(params)), response.json())
+        response = await self.assertSameAsSync(f'/api/products/products/{self.products[0].pk}/', {'brand': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        response = await self.assertSameAsSync(f'/api/products/products/{self.products[0].pk}/', {'brand': other.pk})
+        self.assertEqual(response.status_code, 404)
+        response = await self.assertSameAsSync('/api/products/products/', {'isActive': 'false', 'page_size': 2})
+        self.assertEqual(response.json()['results'], [])
+        await self.assertSameAsSync('/api/products/products/', {'brand': self.brand.pk, 'page_size': 2})
+
+    async def test_malformed_cursors_return_404(self):
+        for url in ('/api/products/products/', f'/api/products/categories/{self.category.pk}/products/', '/api/products/brands/'):
+            for cursor in ('bozuk!', 'eyJ2IjpbImFiYyIsMV19'):  # {"v":["abc",1]}
+                response = await self.assertSameAsSync(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Geçersiz cursor'})
+
+    async def test_missing_objects_return_404(self):
+        response = await self.assertSameAsSync('/api/products/products/999999/')
+        self.assertEqual(response.status_code, 404)
+        response = await self.assertSameAsSync('/api/products/categories/999999/products/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_writes_are_delegated_to_sync_views(self):
+        response = await self.async_client.post('/api/products/products/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json())
+        response = await self.async_client.post('/api/products/categories/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 405)
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        get_cache().clear()  # pk'ler testler arasında tekrar kullanılır; eski sürümlü yanıtlar kalmasın
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+
+    def image(self, color='red'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), color).save(buffer, format='JPEG')
+        return ContentFile(buffer.getvalue())
+
+    def create_product(self, name, content):
+        product = Product(name=name, description='-', price=10, stock=1)
+        product.image.save(f'{name}.jpg', content, save=False)
+        product.save()
+        return product
+
+    def test_derivatives_are_generated_off_request_and_exposed_as_srcset(self):
+        product = self.create_product('kirmizi', self.image())
+        self.assertEqual(product.image_derivatives, {})
+        self.assertEqual(Job.objects.filter(task='images.generate_derivatives').count(), 1)
+
+        run_jobs()
+        product.refresh_from_db()
+        manifest = product.image_derivatives
+        self.assertEqual(manifest['source'], product.image.name)
+        self.assertEqual(list(manifest['formats']), available_formats())
+        self.assertEqual(list(manifest['formats']['jpeg']), ['160', '320', '640', '800'])  # büyütme yok
+
+        data = self.client.get(f'/api/products/products/{product.pk}/').json()
+        self.assertTrue(data['image_srcset']['jpeg'].startswith('http://testserver/media/derivatives/'))
+        self.assertTrue(data['image_srcset']['jpeg'].endswith(' 800w'))
+
+        # Görsel dışındaki güncellemeler yeniden üretim tetiklemez
+        product.stock = 5
+        product.save()
+        self.assertFalse(Job.objects.exists())
+
+    def test_identical_content_reuses_cached_derivatives(self):
+        first = self.create_product('bir', self.image('blue'))
+        run_jobs()
+        second = self.create_product('iki', self.image('blue'))
+        with mock.patch('ecommerce.images._encode') as encode:
+            run_jobs()
+        encode.assert_not_called()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image_derivatives['formats'], second.image_derivatives['formats'])
+
+        # Görsel değişince eski türevler hemen temizlenir
+        second.image.save('iki-yeni.jpg', self.image('green'))
+        second.refresh_from_db()
+        self.assertEqual(second.image_derivatives, {})
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for name in ('products/a.jpg', 'derivatives/ab/abcd/1/160.webp'):
+            path = os.path.join(self.media_root, name)
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as f:
+                f.write(bytes(range(256)) * 4)
+
+    def test_full_conditional_and_ranged_responses(self):
+        response = self.client.get('/media/products/a.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(256)) * 4)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], '1024')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=86400')
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get('/media/products/a.jpg', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get('/media/products/a.jpg', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+        response = self.client.get('/media/products/a.jpg', HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(252, 256)))
+        # Dosya değiştiyse (If-Range eşleşmez) tam içerik döner
+        response = self.client.get('/media/products/a.jpg', HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"eski"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/media/products/a.jpg', HTTP_RANGE='bytes=5000-').status_code, 416)
+
+    def test_content_hashed_paths_are_immutable(self):
+        response = self.client.get('/media/derivatives/ab/abcd/1/160.webp')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+
+    def test_missing_files_and_traversal_are_not_found(self):
+        self.assertEqual(self.client.get('/media/products/yok.jpg').status_code, 404)
+        self.assertEqual(self.client.get('/media/%2e%2e/manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/products').status_code, 404)
+
+    @override_settings(MEDIA_ACCEL='nginx', MEDIA_ACCEL_PREFIX='/_media/')
+    def test_accel_redirect_delegates_body_to_web_server(self):
+        response = self.client.get('/media/products/a.jpg')
+        self.assertEqual(response['X-Accel-Redirect'], '/_media/products/a.jpg')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+
+class CatalogConditionalRequestTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        get_purger().clear()
+        self.client = APIClient()
+        self.category = Categories.objects.create(name='Kategori')
+        self.products = [
+            Product.objects.create(name=f'Ürün {i}', description='-', price=10, stock=5, category=self.category)
+            for i in range(2)
+        ]
+        self.url = f'/api/products/products/{self.products[0].pk}/'
+
+    def save(self, instance):
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+
+    def test_revalidation_is_answered_before_serialization(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0')
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(
+            response['Surrogate-Key'].split(),
+            ['categories-list', 'brands-list', f'product-{self.products[0].pk}', 'product-all'],
+        )
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_only_dependent_validators_and_purge_keys(self):
+        detail_etag = self.client.get(self.url)['ETag']
+        list_etag = self.client.get('/api/products/products/')['ETag']
+
+        self.save(self.products[1])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/products/products/', HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+        self.assertEqual(get_purger().purged, [sorted(['product-list', f'product-{self.products[1].pk}'])])
+
+        self.products[0].stock = 1
+        self.save(self.products[0])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stock'], 1)
+
+        # Kategori adı ürün yanıtlarında görünür; kategori değişikliği detay ETag'ini de yeniler
+        detail_etag = response['ETag']
+        self.save(self.category)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+        self.assertIn(f'categories-{self.category.pk}', get_purger().keys())
+
+
+class JSONRenderingTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        category = Categories.objects.create(name='Kategori')
+        for i in range(40):
+            Product.objects.create(
+                name=f'Ürün {i}', description='Uzun açıklama ' * 20, price='199.90', stock=5, category=category,
+            )
+
+    def test_orjson_output_matches_json_renderer(self):
+        data = {
+            'price': Decimal('12.50'), 'created': datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC),
+            'day': datetime.date(2025, 1, 2), 'counts': {1: 2}, 'text': 'çğü \u2028', 'big': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(ORJSONRenderer().render({'a': [1, 'ş']}))), {'a': [1, 'ş']})
+
+    def test_list_is_compressed_with_negotiated_encoding(self):
+        plain = self.client.get('/api/products/products/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        decoders = {'gzip': gzip.decompress, 'br': brotli.decompress, 'zstd': zstandard.ZstdDecompressor().decompress}
+        for header, expected in (
+            ('gzip, deflate, br, zstd', 'zstd'), ('gzip, br', 'br'), ('gzip;q=1, br;q=0', 'gzip'), ('*', 'zstd'),
+        ):
+            response = self.client.get('/api/products/products/', HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(response['Content-Encoding'], expected)
+            self.assertEqual(decoders[expected](response.content), plain.content)
+            self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertNotIn('Content-Encoding', self.client.get('/api/products/products/', HTTP_ACCEPT_ENCODING='identity'))
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get('/api/products/categories/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.category = Categories.objects.create(name='Kategori', seo_description='Uzun SEO metni')
+        self.brand = Brands.objects.create(name='Marka', description='Uzun marka metni')
+        self.product = Product.objects.create(
+            name='Ürün', description='Uzun açıklama', price=10, discount_price=8, stock=5,
+            category=self.category, brand=self.brand,
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_card_preset_trims_output_and_skips_heavy_columns(self):
+        response, sql = self.get('/api/products/products/?fields=card')
+        self.assertEqual(list(response.data[0]), [
+            'id', 'rating_average', 'rating_count', 'name', 'price', 'image', 'image_srcset', 'discount_price', 'slug',
+        ])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('JOIN', sql)
+
+        response, sql = self.get(f'/api/products/products/{self.product.pk}/?omit=description,rating_histogram')
+        self.assertEqual(response.data['brand'], 'Marka')
+        self.assertNotIn('description', response.data)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('seo_description', sql)  # kategori/marka yalnızca adları için JOIN'lenir
+
+    def test_taxonomy_and_async_views_share_the_fieldset(self):
+        response, sql = self.get(f'/api/products/brands/{self.brand.pk}/?fields=card')
+        self.assertEqual(set(response.data), {'id', 'name', 'slug', 'image', 'image_srcset'})
+        self.assertNotIn('"description"', sql)
+        response, _ = self.get(f'/api/products/categories/{self.category.pk}/products/?fields=id,name')
+        self.assertEqual(response.data, [{'id': self.product.pk, 'name': 'Ürün'}])
+
+        from .async_views import ProductListView
+        request = RequestFactory().get('/api/products/products/', {'fields': 'id,price'})
+        response = async_to_sync(ProductListView.as_view())(request)
+        self.assertEqual(json.loads(response.content), [{'id': self.product.pk, 'price': '10.00'}])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/products/products/?fields=id,secret&omit=nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'fields', 'omit'})
+
+
+class CategoryTreeTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.root = Categories.objects.create(name='Giyim')
+            self.child = Categories.objects.create(name='Kadın', mainCategory=self.root)
+            self.leaf = Categories.objects.create(name='Elbise', mainCategory=self.child)
+            self.other = Categories.objects.create(name='Elektronik')
+        self.products = {
+            category.pk: Product.objects.create(name=category.name, description='-', price=10, stock=1, category=category)
+            for category in (self.root, self.child, self.leaf, self.other)
+        }
+
+    def refresh(self, *categories):
+        for category in categories:
+            category.refresh_from_db()
+
+    def product_ids(self, url):
+        return sorted(row['id'] for row in self.client.get(url).json())
+
+    def test_paths_follow_moves_and_reject_cycles(self):
+        self.refresh(self.leaf)
+        self.assertEqual((self.leaf.path, self.leaf.depth), (f'{self.root.pk}/{self.child.pk}/{self.leaf.pk}/', 2))
+
+        self.child.mainCategory = self.other
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(5):
+            # SAVEPOINT + yolların okunması + UPDATE + alt ağacın tek UPDATE'i + RELEASE
+            self.child.save()
+        self.refresh(self.leaf)
+        self.assertEqual((self.leaf.path, self.leaf.depth), (f'{self.other.pk}/{self.child.pk}/{self.leaf.pk}/', 2))
+        self.assertEqual(sorted(get_category_tree().descendant_ids(self.other.pk)), sorted([self.other.pk, self.child.pk, self.leaf.pk]))
+
+        self.other.mainCategory = self.leaf
+        with self.assertRaises(ValueError):
+            self.other.save()
+        with self.assertRaises(ValidationError):
+            self.other.clean()
+
+    def test_product_filters_include_descendants_in_one_query(self):
+        expected = sorted(self.products[c.pk].pk for c in (self.root, self.child, self.leaf))
+        self.assertEqual(self.product_ids(f'/api/products/products/?category={self.root.pk}'), expected)
+        with self.assertNumQueries(1):  # ağaç süreç içinde; yalnızca ürün sorgusu
+            self.assertEqual(self.product_ids(f'/api/products/products/?category={self.child.pk}'), expected[1:])
+        self.assertEqual(self.product_ids(f'/api/products/categories/{self.root.pk}/products/'), expected)
+
+    def test_category_products_follow_subtree_moves(self):
+        urls = {
+            category: f'/api/products/categories/{category.pk}/products/'
+            for category in (self.root, self.other)
+        }
+        moved = sorted(self.products[c.pk].pk for c in (self.child, self.leaf))
+        for urlconf in ('ecommerce.urls', 'ecommerce.asgi_urls'):
+            with self.subTest(urlconf=urlconf), override_settings(ROOT_URLCONF=urlconf):
+                # Üst kategorilerin yanıtları önbelleğe alınır, sonra alt ağaç diğerine taşınır
+                self.assertEqual(self.product_ids(urls[self.other]), [self.products[self.other.pk].pk])
+                self.assertEqual(self.product_ids(urls[self.root]), sorted([self.products[self.root.pk].pk, *moved]))
+                self.child.mainCategory = self.other
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.child.save()
+                self.assertEqual(self.product_ids(urls[self.other]), sorted([self.products[self.other.pk].pk, *moved]))
+                self.assertEqual(self.product_ids(urls[self.root]), [self.products[self.root.pk].pk])
+                # Sonraki backend için başa dön
+                self.child.mainCategory = self.root
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.child.save()
+
+    def test_tree_endpoint_nests_active_categories(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Categories.objects.filter(pk=self.leaf.pk).update(isActive=False)
+            bump_version(Categories)
+        response = self.client.get('/api/products/categories/tree/')
+        self.assertEqual(response.data, [
+            {'id': self.root.pk, 'name': 'Giyim', 'slug': None, 'children': [
+                {'id': self.child.pk, 'name': 'Kadın', 'slug': None, 'children': []},
+            ]},
+            {'id': self.other.pk, 'name': 'Elektronik', 'slug': None, 'children': []},
+        ])
+        self.assertEqual(self.client.get('/api/products/categories/tree/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.root = Categories.objects.create(name='Giyim')
+            self.leaf = Categories.objects.create(name='Elbise', mainCategory=self.root)
+            self.other = Categories.objects.create(name='Elektronik')
+        self.brands = [Brands.objects.create(name=f'Marka {i}') for i in range(2)]
+        for i in range(8):
+            Product.objects.create(
+                name=f'Ürün {i}', description='-', price=10 + i * 10, stock=i % 2,
+                discount_price=5 if i % 4 == 0 else None, brand=self.brands[i % 2],
+                category=self.leaf if i < 5 else self.other,
+            )
+
+    def facets(self, **params):
+        response = self.client.get('/api/products/products/filter_options/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_each_facet_ignores_its_own_filter(self):
+        data = self.facets(brand=self.brands[0].pk, in_stock='true')
+        # Marka sayıları marka filtresi olmadan, stok sayısı stok filtresi olmadan hesaplanır
+        self.assertEqual([(b['id'], b['count']) for b in data['brands']], [(self.brands[1].pk, 4)])
+        self.assertEqual((data['total'], data['in_stock'], data['on_sale']), (0, 0, 0))
+
+        data = self.facets(brand=self.brands[1].pk)
+        self.assertEqual({b['id']: b['count'] for b in data['brands']}, {self.brands[0].pk: 4, self.brands[1].pk: 4})
+        self.assertEqual((data['total'], data['in_stock'], data['on_sale']), (4, 4, 0))
+        # Yaprağın sayısı üst kategoriye toplanır
+        self.assertEqual(
+            [(c['id'], c['count']) for c in data['categories']],
+            [(self.root.pk, 2), (self.other.pk, 2), (self.leaf.pk, 2)],
+        )
+        self.assertEqual(data['price_range'], {'min_price': 20.0, 'max_price': 80.0})
+        self.assertEqual(sum(bucket['count'] for bucket in data['price_histogram']), 4)
+
+    def test_invalid_prices_are_ignored(self):
+        expected = self.facets(max_price=70)
+        listed = self.client.get('/api/products/products/', {'max_price': 70}).json()
+        for value in ('nan', 'NaN', 'inf', '-Infinity', '1e400', 'abc'):
+            params = {'min_price': value, 'max_price': 70}
+            self.assertEqual(self.facets(**params), expected, value)
+            response = self.client.get('/api/products/products/', params)
+            self.assertEqual(response.status_code, 200, value)
+            self.assertEqual(response.json(), listed, value)
+
+    def test_filtered_facets_use_bounded_queries(self):
+        get_category_tree()
+        # marka GROUP BY + kategori GROUP BY + istatistikler + fiyat dilimleri + marka adları
+        with self.assertNumQueries(5):
+            self.facets(category=self.root.pk, min_price=20, on_sale='true')
+
+    def test_unfiltered_facets_are_precomputed_and_refreshed(self):
+        self.assertEqual(self.facets()['total'], 8)
+        get_category_tree()
+        with self.assertNumQueries(1):  # yalnızca marka adları; sayılar önceden hesaplanmış katmandan
+            self.client.get('/api/products/products/filter_options/', {'page_size': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name='Yeni', description='-', price=15, stock=3, brand=self.brands[0], category=self.other)
+        # Yenileme ertelenir: sayılar iş çalışana kadar eski katmandan gelir
+        self.assertEqual(self.facets()['total'], 8)
+        self.assertEqual(Job.objects.filter(task='catalog.refresh_facets').update(run_at=timezone.now()), 1)
+        run_jobs()
+        data = self.facets()
+        self.assertEqual((data['total'], data['in_stock']), (9, 5))
+        self.assertIn('product-facets', get_purger().keys())
+
+    def test_price_buckets_have_round_edges(self):
+        buckets = price_buckets(Decimal('3'), Decimal('97'), 10)
+        self.assertEqual(buckets[0], (Decimal('0'), Decimal('10')))
+        self.assertEqual(len(buckets), 10)
+        self.assertEqual(price_buckets(Decimal('120'), Decimal('1330'), 10)[0], (Decimal('0'), Decimal('200')))
+        self.assertEqual(price_buckets(Decimal('5'), Decimal('5'), 10), [(Decimal('5'), Decimal('5.01'))])
+
+
+@override_settings(CATALOG_INDEX_ENABLED=True)
+class CatalogIndexTests(TestCase):
+    PARAMS = (
+        {},
+        {'ordering': 'price'},
+        {'ordering': '-rating_average', 'in_stock': 'true'},
+        {'category': 'root', 'ordering': 'price'},
+        {'brand': 0, 'on_sale': 'true'},
+        {'min_price': '15.5', 'max_price': 60, 'main_window': 'true', 'ordering': '-price'},
+        {'min_price': 'nan', 'max_price': 'inf', 'ordering': 'price'},
+    )
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.root = Categories.objects.create(name='Giyim')
+            self.leaf = Categories.objects.create(name='Elbise', mainCategory=self.root)
+            self.other = Categories.objects.create(name='Elektronik')
+        self.brands = [Brands.objects.create(name=f'Marka {i}') for i in range(2)]
+        self.products = [
+            Product.objects.create(
+                name=f'Ürün {i}', description='-', price=10 + i * 5 % 70, stock=i % 3, rating_average=Decimal(i % 5),
+                discount_price=5 if i % 4 == 0 else None, main_window_display=i % 2 == 0,
+                brand=self.brands[i % 2], category=(self.leaf, self.root, self.other)[i % 3],
+            )
+            for i in range(30)
+        ]
+        self.index = get_catalog_index()
+        self.index.rebuild()
+
+    def params(self, params):
+        ids = {'root': self.root.pk, 0: self.brands[0].pk}
+        return {
+            key: ids.get(value, value) if key in ('category', 'brand') else value for key, value in params.items()
+        }
+
+    def walk(self, params):
+        """Tüm sayfaları `next` linkleriyle gezer; (sayfa id'leri) listesi."""
+        pages, url, query = [], '/api/products/products/', {**params, 'page_size': 4}
+        while url:
+            data = self.client.get(url, query).json()
+            pages.append([row['id'] for row in data['results']])
+            url, query = data['next'], None
+        return pages
+
+    def assertSameAsORM(self, params):
+        params = self.params(params)
+        indexed = self.walk(params)
+        with override_settings(CATALOG_INDEX_ENABLED=False):
+            self.assertEqual(indexed, self.walk(params), params)
+
+    def test_pages_match_orm(self):
+        hits, fallbacks = self.index.lookups['hit'], self.index.lookups['fallback']
+        for params in self.PARAMS:
+            self.assertSameAsORM(params)
+        self.assertGreater(self.index.lookups['hit'], hits)
+        self.assertEqual(self.index.lookups['fallback'], fallbacks)
+
+        # Arama ve isActive indekste yok: ORM ile sunulur
+        self.client.get('/api/products/products/', {'search': 'ürün', 'page_size': 4})
+        self.assertEqual(self.index.lookups['fallback'], fallbacks + 1)
+
+    def test_writes_are_applied_from_journal_without_rebuild(self):
+        builds = self.index.builds
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = self.products[3]
+            changed.price, changed.stock, changed.category = 99, 5, self.other
+            changed.save()
+            self.products[4].delete()
+            Product.objects.create(name='Yeni', description='-', price=12, stock=1, brand=self.brands[0], category=self.leaf)
+            Product.objects.filter(pk=self.products[5].pk).update(isActive=False)
+            bump_version(Product, [self.products[5].pk])
+        for params in self.PARAMS:
+            self.assertSameAsORM(params)
+        self.assertEqual(self.index.builds, builds)
+        self.assertEqual(self.index.store.size, 29)
+
+    async def test_async_list_uses_index(self):
+        hits = self.index.lookups['hit']
+        params = {'category': self.root.pk, 'ordering': '-price', 'page_size': 5}
+        with override_settings(ROOT_URLCONF='ecommerce.asgi_urls'):
+            response = await self.async_client.get('/api/products/products/', params)
+        expected = await sync_to_async(self.client.get)('/api/products/products/', params)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(self.index.lookups['hit'], hits + 2)
+
+    def test_index_disables_itself_over_memory_budget(self):
+        with override_settings(CATALOG_INDEX_MAX_BYTES=1024), self.assertLogs('products.index', 'WARNING'):
+            self.assertFalse(self.index.rebuild())
+        self.assertIsNone(self.index.store)
+        self.assertIn('CATALOG_INDEX_MAX_BYTES', self.index.disabled_reason)
+        self.assertSameAsORM({'ordering': 'price'})
+        self.assertTrue(self.index.rebuild())
@@ -0,0 +1,102 @@
+import threading
+from bisect import bisect_left
+
+from .cache import KEY_PREFIX, get_cache, get_versions, list_key
+from .models import Categories
+
+
+def compute_paths(rows):
+    """
+    (pk, üst pk) çiftlerinden materyalize yolları hesaplar: {pk: yol}. Kökten ulaşılamayan
+    kayıtlar (döngü) kök sayılır. `rebuild_category_tree` ve 0008 göçü aynı yolu izler.
+    """
+    children = {}
+    for pk, parent in rows:
+        children.setdefault(parent, []).append(pk)
+    paths = {}
+    for root in [pk for pk, parent in rows if parent is None] + [pk for pk, _ in rows]:
+        if root in paths:
+            continue
+        pending = [(root, '')]
+        while pending:
+            pk, prefix = pending.pop()
+            paths[pk] = f'{prefix}{pk}/'
+            pending.extend((child, paths[pk]) for child in children.get(pk, ()) if child not in paths)
+    return paths
+
+
+class CategoryTree:
+    """
+    Kategori ağacının bellek içi görüntüsü. Satırlar yola göre sıralı tutulur; bir kategorinin
+    alt ağacı (kendisi dahil) sıralı listede bitişik bir aralıktır ve ikili aramayla bulunur.
+    """
+    __slots__ = ('rows', 'paths', 'by_id', '_descendants', '_nested')
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: row['path'])
+        self.paths = [row['path'] for row in self.rows]
+        self.by_id = {row['id']: row for row in self.rows}
+        self._descendants = {}
+        self._nested = None
+
+    def descendant_ids(self, pk):
+        """Kategori ve tüm alt kategorilerinin id'leri; bilinmeyen id için yalnızca kendisi."""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return []
+        ids = self._descendants.get(pk)
+        if ids is None:
+            row = self.by_id.get(pk)
+            if row is None:
+                return [pk]
+            prefix = row['path']
+            # '/' ile biten önekten sonraki ilk yol: '/' karakterinin ardılı '0'
+            start, end = bisect_left(self.paths, prefix), bisect_left(self.paths, prefix[:-1] + '0')
+            ids = self._descendants[pk] = [r['id'] for r in self.rows[start:end]]
+        return ids
+
+    def as_nested(self):
+        """Aktif kategorilerin iç içe menüsü; pasif bir kategorinin alt ağacı gösterilmez."""
+        if self._nested is None:
+            nodes, roots = {}, []
+            # Derinlik sırası: üst her zaman altından önce gelir; kardeşler id sırasında
+            for row in sorted(self.rows, key=lambda r: (r['depth'], r['id'])):
+                if not row['isActive']:
+                    continue
+                node = {'id': row['id'], 'name': row['name'], 'slug': row['slug'], 'children': []}
+                if row['mainCategory_id'] is None:
+                    roots.append(node)
+                elif row['mainCategory_id'] in nodes:
+                    nodes[row['mainCategory_id']]['children'].append(node)
+                else:
+                    continue
+                nodes[row['id']] = node
+            self._nested = roots
+        return self._nested
+
+
+_snapshot = (None, None)
+_snapshot_lock = threading.Lock()
+
+
+def get_category_tree():
+    """
+    Güncel kategori ağacı. Kategori listesinin cache sürümüne bağlıdır: kategori kaydedilince
+    sürüm artar ve ağaç bir kez yeniden kurulur (paylaşılan cache'e, süreç içine de kopyalanır).
+    """
+    global _snapshot
+    (version,), _ = get_versions([list_key(Categories)])
+    cached_version, tree = _snapshot
+    if cached_version == version:
+        return tree
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:category-tree:{version}'
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(Categories.objects.values('id', 'name', 'slug', 'path', 'depth', 'mainCategory_id', 'isActive'))
+        cache.set(key, rows, timeout=None)
+    tree = CategoryTree(rows)
+    with _snapshot_lock:
+        _snapshot = (version, tree)
+    return tree
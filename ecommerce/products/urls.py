@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CategoryViewSet, BrandViewSet
+from .views import ProductViewSet, CategoryViewSet, BrandViewSet, CatalogCacheStatsView
 
 router = DefaultRouter()
 router.register('products', ProductViewSet)
@@ -8,5 +8,6 @@ router.register('categories', CategoryViewSet)
 router.register('brands', BrandViewSet)
 
 urlpatterns = [
+    path('cache-stats/', CatalogCacheStatsView.as_view(), name='catalog-cache-stats'),
     path('', include(router.urls)),
 ]
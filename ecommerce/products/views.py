@@ -1,75 +1,49 @@
-from rest_framework import viewsets, permissions, status, filters
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Min, Max
-from django.db import models
 from .models import Product, ProductRating, Categories, Brands
 from .serializers import ProductSerializer, ProductRatingSerializer, CategorySerializer, BrandSerializer
+from .search import SearchRankOrderingFilter
+from ecommerce.fieldsets import SparseFieldsetMixin, fieldset_from_request
+from ecommerce.prefetch import apply_prefetch_plan
+from .cache import cached_response, conditional_response, get_stats
+from .tree import get_category_tree
+from .filters import filter_products
+from .facets import FACETS_VERSION, get_facets
+from .index import paginate_with_index
 
-class ProductViewSet(viewsets.ModelViewSet):
+
+class ProductViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Product.objects.filter(isActive=True)
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'brand', 'isActive']
-    search_fields = ['name', 'description', 'category__name', 'brand__name']
+    # Arama get_queryset içinde tam metin indeksiyle yapılır (bkz. products/search.py)
+    filter_backends = [DjangoFilterBackend, SearchRankOrderingFilter]
+    # category filter_products'ta alt kategorilerle birlikte uygulanır
+    filterset_fields = ['brand', 'isActive']
+    # Cursor sayfalama ile uyumlu kalması için yalnızca NULL olmayan ve (alan, id) indeksli alanlar
     ordering_fields = ['name', 'price', 'created_at', 'rating_average']
     ordering = ['-created_at']
 
     def get_queryset(self):
-        queryset = Product.objects.filter(isActive=True)
-        
-        # Arama
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(category__name__icontains=search) |
-                Q(brand__name__icontains=search)
-            )
-        
-        # Kategori filtresi
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category__id=category)
-        
-        # Marka filtresi
-        brand = self.request.query_params.get('brand')
-        if brand:
-            queryset = queryset.filter(brand__id=brand)
-        
-        # Fiyat aralığı filtresi
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-        if min_price:
-            try:
-                queryset = queryset.filter(price__gte=float(min_price))
-            except ValueError:
-                pass
-        if max_price:
-            try:
-                queryset = queryset.filter(price__lte=float(max_price))
-            except ValueError:
-                pass
-        
-        # Stok durumu filtresi
-        in_stock = self.request.query_params.get('in_stock')
-        if in_stock and in_stock.lower() == 'true':
-            queryset = queryset.filter(stock__gt=0)
-        
-        # İndirimli ürünler
-        on_sale = self.request.query_params.get('on_sale')
-        if on_sale and on_sale.lower() == 'true':
-            queryset = queryset.filter(discount_price__isnull=False)
-        
-        # Ana sayfa gösterimi
-        main_window = self.request.query_params.get('main_window')
-        if main_window and main_window.lower() == 'true':
-            queryset = queryset.filter(main_window_display=True)
-        
-        return queryset
+        return filter_products(super().get_queryset(), self.request.query_params)
+
+    def paginate_queryset(self, queryset):
+        # Sayfalı liste: sayfa id'leri açıksa bellek içi katalog indeksinden (bkz. products/index.py)
+        if self.action == 'list' and self.paginator is not None:
+            return paginate_with_index(self.paginator, queryset, self.request, view=self)
+        return super().paginate_queryset(queryset)
+
+    # Liste gövdesi cache'lenmez (arama/filtre kombinasyonları sınırsız); yalnızca koşullu istek
+    @conditional_response(Product, Categories, Brands, ProductRating)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response(Categories, Brands, obj=Product)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def rate(self, request, pk=None):
@@ -98,68 +72,108 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cached_response(Product, Categories, Brands, FACETS_VERSION)
     def filter_options(self, request):
-        """Filtreleme seçeneklerini döndürür"""
-        categories = Categories.objects.filter(isActive=True).values('id', 'name')
-        brands = Brands.objects.filter(isActive=True).values('id', 'name')
-        
-        # Fiyat aralığı
-        price_range = Product.objects.filter(isActive=True).aggregate(
-            min_price=models.Min('price'),
-            max_price=models.Max('price')
-        )
-        
-        return Response({
-            'categories': list(categories),
-            'brands': list(brands),
-            'price_range': price_range
-        })
+        """Mevcut filtrelere göre kategori/marka sayıları, stok/indirim sayıları ve fiyat dilimleri"""
+        return Response(get_facets(request.query_params))
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cached_response(Product, Categories, Brands, ProductRating)
     def featured(self, request):
         """Ana sayfa için öne çıkan ürünler"""
         queryset = self.get_queryset().filter(main_window_display=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._list_response(queryset)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cached_response(Product, Categories, Brands, ProductRating)
     def on_sale(self, request):
         """İndirimli ürünler"""
         queryset = self.get_queryset().filter(discount_price__isnull=False)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._list_response(queryset)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cached_response(Product, Categories, Brands, ProductRating)
     def top_rated(self, request):
         """En yüksek puanlı ürünler"""
         queryset = self.get_queryset().filter(rating_count__gt=0).order_by('-rating_average')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._list_response(queryset)
 
+    def _list_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+
+class CategoryViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Categories.objects.filter(isActive=True)
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    fieldset_actions = ('list', 'retrieve')  # products action'ında ?fields= ürün alanlarıdır
+
+    @cached_response(Categories)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response(obj=Categories)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cached_response(Categories)
+    def tree(self, request):
+        """Aktif kategorilerin iç içe ağacı (menü için tek yanıt)"""
+        return Response(get_category_tree().as_nested())
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    # Gövde alt ağaca bağlı: alt kategori ekleme/taşıma yalnızca kategori liste sürümünü artırır
+    @cached_response(Product, Categories, Brands, ProductRating, obj=Categories)
     def products(self, request, pk=None):
-        """Kategoriye ait ürünleri döndürür"""
+        """Kategoriye ve alt kategorilerine ait ürünleri döndürür"""
         category = self.get_object()
-        products = Product.objects.filter(category=category, isActive=True)
-        serializer = ProductSerializer(products, many=True)
+        fieldset = fieldset_from_request(ProductSerializer, request)
+        products = apply_prefetch_plan(
+            Product.objects.filter(category_id__in=get_category_tree().descendant_ids(category.pk), isActive=True),
+            ProductSerializer, fieldset,
+        )
+        page = self.paginate_queryset(products)
+        if page is not None:
+            return self.get_paginated_response(ProductSerializer(page, many=True, fields=fieldset).data)
+        serializer = ProductSerializer(products, many=True, fields=fieldset)
         return Response(serializer.data)
 
 
-class BrandViewSet(viewsets.ReadOnlyModelViewSet):
+class BrandViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Brands.objects.filter(isActive=True)
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
+    fieldset_actions = ('list', 'retrieve')
+
+    @cached_response(Brands)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response(obj=Brands)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cached_response(Product, Categories, ProductRating, obj=Brands)
     def products(self, request, pk=None):
         """Markaya ait ürünleri döndürür"""
         brand = self.get_object()
-        products = Product.objects.filter(brand=brand, isActive=True)
-        serializer = ProductSerializer(products, many=True)
+        fieldset = fieldset_from_request(ProductSerializer, request)
+        products = apply_prefetch_plan(Product.objects.filter(brand=brand, isActive=True), ProductSerializer, fieldset)
+        page = self.paginate_queryset(products)
+        if page is not None:
+            return self.get_paginated_response(ProductSerializer(page, many=True, fields=fieldset).data)
+        serializer = ProductSerializer(products, many=True, fields=fieldset)
         return Response(serializer.data)
+
+
+class CatalogCacheStatsView(APIView):
+    """Katalog cache hit/miss sayaçları (izleme için, yalnızca yönetici)"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats())
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import authentication  # noqa: F401  (kullanıcı cache'i geçersiz kılma sinyallerini bağlar)
+        from . import revocation  # noqa: F401  (kara listeye alınan token'ları filtreye ekleyen sinyal)
+
+        from ecommerce.images import track
+        from .models import UserProfile
+        track(UserProfile, 'pro_photo')
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+KEY_PREFIX = 'auth:user'
+# Şifre özeti cache'e yazılmaz; `user.password` erişimi alanı veritabanından yükler
+SNAPSHOT_FIELDS = [f.attname for f in User._meta.concrete_fields if f.attname != 'password']
+
+
+class UserCache:
+    """
+    İki katmanlı kullanıcı cache'i: süreç içi, boyutu sınırlı ve kısa ömürlü bir LRU; arkasında
+    süreçler arası paylaşılan cache (Redis varsa). Geçersiz kılma paylaşılan katmanı ve bu sürecin
+    LRU'sunu temizler; diğer süreçlerin LRU'su en geç `local_ttl` saniyede tazelenir.
+    """
+
+    def __init__(self, maxsize, local_ttl, shared_ttl, alias):
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.alias = alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _key(self, pk):
+        return f'{KEY_PREFIX}:{pk}'
+
+    def get(self, pk):
+        pk = str(pk)  # token claim'i int ya da str olabilir
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(pk)
+            if entry is not None and entry[0] > now:
+                self._local.move_to_end(pk)
+                return self._build(entry[1])
+        values = self.shared.get(self._key(pk))
+        if values is None:
+            return None
+        self._remember(pk, values)
+        return self._build(values)
+
+    def set(self, user):
+        values = tuple(getattr(user, attname) for attname in SNAPSHOT_FIELDS)
+        self.shared.set(self._key(user.pk), values, timeout=self.shared_ttl)
+        self._remember(str(user.pk), values)
+
+    def invalidate(self, pk):
+        pk = str(pk)
+        with self._lock:
+            self._local.pop(pk, None)
+        self.shared.delete(self._key(pk))
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+    def _remember(self, pk, values):
+        with self._lock:
+            self._local[pk] = (time.monotonic() + self.local_ttl, values)
+            self._local.move_to_end(pk)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def _build(self, values):
+        # Her istek kendi örneğini alır (view'lar request.user'ı değiştirebilir); password ertelenmiş
+        # alandır, save() yalnızca yüklü alanları yazar
+        return User.from_db(User.objects.db, SNAPSHOT_FIELDS, values)
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 2048),
+    local_ttl=getattr(settings, 'AUTH_USER_CACHE_LOCAL_TTL', 5),
+    shared_ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 300),
+    alias=getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default'),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication ile aynı doğrulama; kullanıcı her istekte veritabanından değil `user_cache`
+    üzerinden yüklenir. CHECK_REVOKE_TOKEN açıksa şifre özeti gerektiğinden cache kullanılmaz.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD not in ('id', 'pk'):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+
+def invalidate_user(pk):
+    """
+    Kullanıcının cache girdisini hemen ve commit sonrasında siler. Commit öncesi başka bir istek
+    eski satırı yeniden cache'e yazabileceği için ikinci silme gereklidir. Sinyal tetiklemeyen
+    yazımlarda (queryset.update ile pasifleştirme gibi) elle çağrılmalıdır.
+    """
+    user_cache.invalidate(pk)
+    transaction.on_commit(lambda: user_cache.invalidate(pk))
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_user(instance.pk)
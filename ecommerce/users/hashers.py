@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Maliyeti ayarlardan okunan Argon2id. Parametreler değişince eski hash'ler `must_update` ile
+    işaretlenir ve kullanıcının bir sonraki girişinde yeni parametrelerle yeniden hash'lenir.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """İterasyon sayısı ayarlardan okunan PBKDF2-SHA256 (argon2-cffi kurulamayan ortamlar için)."""
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
@@ -0,0 +1,79 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from users.models import User
+from users.serializers import EmailTokenObtainPairSerializer
+from users.views import EmailTokenObtainPairView
+
+PASSWORD = 'Bench-Sifre-2024!'
+
+POLICIES = {
+    'pbkdf2': ['users.hashers.TunedPBKDF2PasswordHasher', 'users.hashers.TunedArgon2PasswordHasher'],
+    'argon2': ['users.hashers.TunedArgon2PasswordHasher', 'users.hashers.TunedPBKDF2PasswordHasher'],
+}
+
+
+class LegacyEmailTokenObtainPairSerializer(EmailTokenObtainPairSerializer):
+    """Önceki giriş yolu: check_password ardından authenticate() ile şifreyi ikinci kez doğrular."""
+
+    def validate(self, attrs):
+        user = User.objects.get(email__iexact=attrs['email'], is_active=True)
+        if not user.check_password(attrs['password']):
+            raise exceptions.AuthenticationFailed('Geçersiz e-posta veya şifre')
+        return TokenObtainPairSerializer.validate(self, {'username': user.get_username(), 'password': attrs['password']})
+
+
+class LegacyLoginView(EmailTokenObtainPairView):
+    serializer_class = LegacyEmailTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Giriş (/api/token/) verimini hash politikası ve doğrulama yoluna göre ölçer. Tek thread çalışır; '
+        'sonuç CPU saniyesi başına giriş, yani çekirdek başına giriş/sn olarak raporlanır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help='Senaryo başına giriş sayısı')
+
+    def handle(self, *args, **options):
+        scenarios = [
+            ('pbkdf2, çift doğrulama (önce)', 'pbkdf2', LegacyLoginView),
+            ('pbkdf2, tek doğrulama', 'pbkdf2', EmailTokenObtainPairView),
+            ('argon2, tek doğrulama (sonra)', 'argon2', EmailTokenObtainPairView),
+        ]
+        factory = APIRequestFactory()
+        self.stdout.write(f"{'senaryo':<32} {'giriş/sn/çekirdek':>18} {'medyan ms':>10}")
+        results = {}
+        for label, policy, view_class in scenarios:
+            with override_settings(PASSWORD_HASHERS=POLICIES[policy]):
+                tag = uuid.uuid4().hex[:8]
+                user = User.objects.create(
+                    username=f'bench-{tag}', email=f'bench-{tag}@example.com', password=make_password(PASSWORD),
+                )
+                try:
+                    view = view_class.as_view()
+                    payload = {'email': user.email, 'password': PASSWORD}
+                    samples = []
+                    cpu_start = time.process_time()
+                    for _ in range(options['logins']):
+                        start = time.perf_counter()
+                        response = view(factory.post('/api/token/', payload, format='json'))
+                        samples.append((time.perf_counter() - start) * 1000)
+                        assert response.status_code == 200, response.data
+                    cpu = time.process_time() - cpu_start
+                finally:
+                    user.delete()
+            results[label] = options['logins'] / cpu
+            self.stdout.write(f'{label:<32} {results[label]:>18.1f} {statistics.median(samples):>10.1f}')
+
+        before, after = results[scenarios[0][0]], results[scenarios[-1][0]]
+        self.stdout.write(self.style.SUCCESS(f'Önce → sonra: {after / before:.1f} kat giriş/sn/çekirdek'))
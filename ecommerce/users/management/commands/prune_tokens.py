@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Süresi dolmuş refresh token kayıtlarını (OutstandingToken ve bağlı BlacklistedToken) siler. '
+        'simplejwt\'nin flushexpiredtokens komutundan farkı: tablo birincil anahtar aralıklarıyla '
+        'gezilir ve her aralık ayrı, kısa bir transaction\'da silinir; tek büyük DELETE tabloyu uzun '
+        'süre kilitlemez. Cron ile düzenli çalıştırılmalıdır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Aralık başına taranan kayıt (id) sayısı')
+        parser.add_argument('--sleep', type=float, default=0.05, help='Partiler arası bekleme (saniye)')
+        parser.add_argument('--grace', type=float, default=0,
+                            help='Süresi bu kadar saat önce dolmuş kayıtlar silinir')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace'])
+        batch_size = options['batch_size']
+        # expires_at indeksli değil; id aralığı taraması her partiyi birincil anahtar indeksine sınırlar
+        bounds = OutstandingToken.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write('Token tablosu boş.')
+            return
+
+        started = time.perf_counter()
+        outstanding = blacklisted = 0
+        for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+            with transaction.atomic():
+                ids = list(
+                    OutstandingToken.objects.filter(id__gte=low, id__lt=low + batch_size, expires_at__lte=cutoff)
+                    .values_list('id', flat=True)
+                )
+                if not ids:
+                    continue
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{outstanding} token ve {blacklisted} kara liste kaydı silindi '
+            f'({time.perf_counter() - started:.1f} sn).'
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:14
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    """Mevcut e-postaları küçük harf ve boşluksuz hale getirir (Lower(email) kısıtından önce)."""
+    User = apps.get_model('users', 'User')
+    normalized = Lower(Trim('email'))
+    conflicts = list(
+        User.objects.annotate(normalized=normalized).values('normalized')
+        .annotate(rows=Count('id')).filter(rows__gt=1).values_list('normalized', flat=True)
+    )
+    if conflicts:
+        # Aynı e-postanın farklı yazımlarıyla açılmış hesaplar otomatik birleştirilemez
+        raise RuntimeError(
+            'Büyük/küçük harf farkıyla çakışan hesaplar var, önce elle birleştirin: ' + ', '.join(conflicts)
+        )
+    User.objects.annotate(normalized=normalized).exclude(email=normalized).update(email=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_email_lower_uniq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='pro_photo_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
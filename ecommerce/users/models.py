@@ -5,13 +5,30 @@ import random
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.db.models import Q
+from django.db.models.functions import Lower
 
 # ---------------------------
 # User Model
 # ---------------------------
+def canonical_email(value):
+    """E-postanın saklanan ve aranan biçimi: boşluksuz, küçük harf."""
+    return (value or '').strip().lower()
+
+
 class User(AbstractUser):
     email = models.EmailField(unique=True)
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Normalize edilmeden yazılan satırlara karşı büyük/küçük harf duyarsız tekillik
+            models.UniqueConstraint(Lower('email'), name='user_email_lower_uniq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Aramalar `email=canonical_email(...)` ile yapılır ve email'in unique indeksini kullanır
+        self.email = canonical_email(self.email)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.email
 
@@ -91,6 +108,13 @@ class Message(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Gönderen/alıcı OR sorgusunun iki kolu için cursor sayfalama indeksleri
+        indexes = [
+            models.Index(fields=['sender', 'created_at', 'id'], name='message_sender_created_id_idx'),
+            models.Index(fields=['receiver', 'created_at', 'id'], name='message_recv_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.sender.email} -> {self.receiver.email}: {self.subject}"
 
@@ -104,6 +128,11 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='notif_user_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.email}: {self.title}"
 
@@ -142,6 +171,7 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     pro_photo = models.ImageField(upload_to='profile/', blank=True, null=True)
+    pro_photo_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # bkz. ecommerce/images.py
     birth_date = models.DateField(blank=True, null=True)
     gender = models.CharField(max_length=10, choices=[('M', 'Erkek'), ('F', 'Kadın'), ('O', 'Diğer')], blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
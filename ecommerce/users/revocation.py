@@ -0,0 +1,223 @@
+import math
+import threading
+import time
+from datetime import timedelta
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ecommerce.metrics import Histogram, registry, render_histogram
+
+# Kontrol süresi mikro saniyeler mertebesinde; istek histogramının sınırları fazla kaba
+CHECK_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+
+class BloomFilter:
+    """
+    Sabit boyutlu Bloom filtresi. `capacity` eleman için yanlış pozitif oranı ~`error_rate`;
+    yanlış negatif yoktur. Konumlar tek blake2b özetinden çift hash ile türetilir.
+    """
+    __slots__ = ('size', 'hashes', 'count', 'bits')
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationFilter:
+    """
+    Kara listedeki refresh token jti'lerinin süreç içi Bloom filtresi. Filtrede olmayan token
+    kesinlikle kara listede değildir ve veritabanına gidilmez; filtrede olan token (gerçek kayıt
+    ya da yanlış pozitif) her zaman veritabanında doğrulanır.
+
+    - Tam yeniden kurulum (`REVOCATION_REBUILD_SECONDS`): süresi dolmamış tüm kayıtlar; süresi
+      dolan jti'ler böylece filtreden düşer ve boyut büyüyen tabloya göre yeniden ayarlanır.
+    - Artımlı senkron (`REVOCATION_SYNC_SECONDS`): `id` filigranından sonraki kayıtlar. Geç commit
+      edilen satırlar kaçmasın diye filigran yalnızca `REVOCATION_SYNC_OVERLAP` saniyeden eski
+      kayıtların ötesine ilerler; yeni kayıtlar her senkronda tekrar okunur.
+    - Bu süreçte kara listeye alınan token'lar (logout, rotasyon) sinyal ile anında eklenir; diğer
+      worker'lar en geç bir senkron aralığında görür.
+
+    Filtre hazır değilken (ilk kurulum sürerken) kontrol doğrudan veritabanına düşer.
+    """
+
+    def __init__(self, rebuild_interval, sync_interval, overlap, error_rate):
+        self.rebuild_interval = rebuild_interval
+        self.sync_interval = sync_interval
+        self.overlap = overlap
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._watermark = 0
+            self._built_at = self._synced_at = 0.0
+            self._pending = None  # yeniden kurulum sırasında sinyalle eklenenler
+            self.results = {'filtered': 0, 'db_hit': 0, 'false_positive': 0, 'db_fallback': 0}
+            self.latency = Histogram(CHECK_BUCKETS, 1024)
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            if self._pending is not None:
+                self._pending.append(jti)
+
+    def is_blacklisted(self, jti):
+        start = time.perf_counter()
+        self.refresh()
+        bloom = self._bloom
+        if bloom is not None and jti not in bloom:
+            result, blacklisted = 'filtered', False
+        else:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            if bloom is None:
+                result = 'db_fallback'
+            else:
+                result = 'db_hit' if blacklisted else 'false_positive'
+        with self._lock:
+            self.results[result] += 1
+            self.latency.observe(time.perf_counter() - start)
+        return blacklisted
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._bloom is not None and now - self._synced_at < self.sync_interval:
+            return
+        # Tek thread yeniler; diğerleri mevcut filtreyle (ya da veritabanıyla) devam eder
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            if self._bloom is None or now - self._built_at >= self.rebuild_interval:
+                self.rebuild()
+            else:
+                self.sync()
+        finally:
+            self._refreshing.release()
+
+    def rebuild(self):
+        with self._lock:
+            self._pending = []
+        try:
+            rows = list(
+                BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+                .values_list('id', 'blacklisted_at', 'token__jti')
+            )
+            bloom = BloomFilter(max(len(rows) * 2, 1024), self.error_rate)
+            for _, _, jti in rows:
+                bloom.add(jti)
+            watermark = self._stable_watermark(rows, 0)
+            with self._lock:
+                for jti in self._pending:
+                    bloom.add(jti)
+                self._bloom, self._watermark = bloom, watermark
+                self._built_at = self._synced_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def sync(self):
+        rows = list(
+            BlacklistedToken.objects.filter(id__gt=self._watermark)
+            .order_by('id').values_list('id', 'blacklisted_at', 'token__jti')
+        )
+        with self._lock:
+            for _, _, jti in rows:
+                self._bloom.add(jti)
+            self._watermark = self._stable_watermark(rows, self._watermark)
+            self._synced_at = time.monotonic()
+
+    def _stable_watermark(self, rows, watermark):
+        cutoff = timezone.now() - timedelta(seconds=self.overlap)
+        stable = [pk for pk, blacklisted_at, _ in rows if blacklisted_at < cutoff]
+        return max(stable, default=watermark)
+
+    def collect(self):
+        """`/api/_metrics` için filtre, kontrol ve tablo boyutu metrikleri."""
+        with self._lock:
+            bloom, results = self._bloom, dict(self.results)
+            built_at = self._built_at
+            lines = [
+                '# HELP jwt_revocation_check_seconds Refresh token kara liste kontrol süresi',
+                '# TYPE jwt_revocation_check_seconds histogram',
+            ]
+            render_histogram(lines, 'jwt_revocation_check_seconds', self.latency)
+        lines.append('# HELP jwt_revocation_checks_total Kara liste kontrolleri (filtered: veritabanına gidilmedi)')
+        lines.append('# TYPE jwt_revocation_checks_total counter')
+        for result, count in results.items():
+            lines.append(f'jwt_revocation_checks_total{{result="{result}"}} {count}')
+        lines.append('# HELP jwt_revocation_filter_items Bloom filtresindeki jti sayısı')
+        lines.append('# TYPE jwt_revocation_filter_items gauge')
+        lines.append(f'jwt_revocation_filter_items {bloom.count if bloom else 0}')
+        lines.append('# HELP jwt_revocation_filter_age_seconds Son tam yeniden kurulumdan bu yana geçen süre')
+        lines.append('# TYPE jwt_revocation_filter_age_seconds gauge')
+        lines.append(f'jwt_revocation_filter_age_seconds {time.monotonic() - built_at if bloom else 0:.1f}')
+        lines.append('# HELP jwt_token_table_rows Token tablolarının satır sayısı (PostgreSQL\'de tahmini)')
+        lines.append('# TYPE jwt_token_table_rows gauge')
+        for model in (OutstandingToken, BlacklistedToken):
+            lines.append(f'jwt_token_table_rows{{table="{model._meta.db_table}"}} {table_rows(model)}')
+        return lines
+
+
+def table_rows(model):
+    """PostgreSQL'de istatistiklerden (pg_class.reltuples) okunur; büyük tabloda COUNT(*) taraması yapılmaz."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return model.objects.count()
+
+
+revocation_filter = RevocationFilter(
+    rebuild_interval=getattr(settings, 'REVOCATION_REBUILD_SECONDS', 600),
+    sync_interval=getattr(settings, 'REVOCATION_SYNC_SECONDS', 1),
+    overlap=getattr(settings, 'REVOCATION_SYNC_OVERLAP', 60),
+    error_rate=getattr(settings, 'REVOCATION_FILTER_ERROR_RATE', 0.001),
+)
+registry.add_collector(revocation_filter.collect)
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Kara liste kontrolü önce `revocation_filter`'a sorulan RefreshToken."""
+
+    def check_blacklist(self):
+        if revocation_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+@receiver(post_save, sender=BlacklistedToken)
+def remember_blacklisted_token(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        revocation_filter.add(instance.token.jti)
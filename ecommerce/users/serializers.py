@@ -1,12 +1,19 @@
-from .models import User
+from .models import User, canonical_email
 from django.utils import timezone
 from rest_framework import serializers
 from .models import Address, PaymentCard, Favorite, Message, Notification, PasswordResetCode, UserProfile
+from .revocation import RevocableRefreshToken
+from ecommerce.images import SrcsetField
 import re
 import random
 import string
 from rest_framework import exceptions
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import update_last_login
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer, TokenObtainPairSerializer, TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -22,10 +29,10 @@ class RegisterSerializer(serializers.ModelSerializer):
         }
 
     def validate_email(self, value):
-        email = (value or '').strip()
+        email = canonical_email(value)
         if not email:
             raise serializers.ValidationError('E-posta gereklidir')
-        if User.objects.filter(email__iexact=email).exists():
+        if User.objects.filter(email=email).exists():
             raise serializers.ValidationError('Bu e-posta ile zaten bir hesap var')
         return email
 
@@ -110,11 +117,10 @@ class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
     def validate_email(self, value):
-        try:
-            User.objects.get(email=value)
-        except User.DoesNotExist:
+        email = canonical_email(value)
+        if not User.objects.filter(email=email).exists():
             raise serializers.ValidationError('Bu e-posta ile kayıtlı kullanıcı bulunamadı')
-        return value
+        return email
 
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
@@ -123,7 +129,7 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     new_password = serializers.CharField(min_length=8)
 
     def validate(self, attrs):
-        email = attrs.get('email')
+        email = canonical_email(attrs.get('email'))
         code = attrs.get('code')
         try:
             user = User.objects.get(email=email)
@@ -160,21 +166,28 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         return super().get_token(user)
 
     def validate(self, attrs):
-        email = (attrs.get('email') or '').strip()
+        email = canonical_email(attrs.get('email'))
         password = attrs.get('password')
         if not email or not password:
             raise exceptions.AuthenticationFailed('E-posta ve şifre zorunludur')
 
-        # Email unique olduğu için direkt bulabiliriz
+        # E-postalar normalize saklandığından tek indeks erişimiyle bulunur. Şifre yalnızca bir kez doğrulanır (authenticate()
+        # ile ikinci kez doğrulamak hash maliyetini ikiye katlıyordu); check_password eski politikadaki
+        # hash'i girişte yeni hasher'la yeniler.
         try:
-            user = User.objects.get(email__iexact=email, is_active=True)
-            if not user.check_password(password):
-                raise exceptions.AuthenticationFailed('Geçersiz e-posta veya şifre')
+            user = User.objects.get(email=email, is_active=True)
         except User.DoesNotExist:
+            # Kullanıcı yokken de bir hash hesaplanır; yanıt süresi hesabın varlığını ele vermesin
+            make_password(password)
+            raise exceptions.AuthenticationFailed('Geçersiz e-posta veya şifre')
+        if not user.check_password(password):
             raise exceptions.AuthenticationFailed('Geçersiz e-posta veya şifre')
 
-        # Bridge to parent by providing username of the matched user
-        data = super().validate({'username': user.get_username(), 'password': password})
+        self.user = user
+        refresh = self.get_token(user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
 
         # Optionally include basic user info
         data['user'] = {
@@ -187,6 +200,15 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    # Kara liste kontrolü önce süreç içi filtreye sorulur (bkz. users/revocation.py)
+    token_class = RevocableRefreshToken
+
+
+class RevocableTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = RevocableRefreshToken
+
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     phone_number = serializers.CharField(required=False, allow_blank=True)
     pro_photo = serializers.ImageField(required=False, allow_null=True)
@@ -202,6 +224,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         data['pro_photo'] = (
             profile.pro_photo.url if getattr(profile, 'pro_photo', None) else None
         )
+        data['pro_photo_srcset'] = SrcsetField(source='pro_photo_derivatives').to_representation(
+            getattr(profile, 'pro_photo_derivatives', None)
+        )
         return data
 
     def update(self, instance, validated_data):
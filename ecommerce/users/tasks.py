@@ -0,0 +1,35 @@
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from jobs.queue import task
+from .models import Notification, PasswordResetCode
+
+
+@task('users.send_password_reset', batch_size=50)
+def send_password_reset(payloads):
+    """Şifre sıfırlama kodlarını tek e-posta bağlantısıyla toplu gönderir; kullanılmış/süresi dolmuş kodlar atlanır."""
+    codes = PasswordResetCode.objects.select_related('user').in_bulk([p['code_id'] for p in payloads])
+    now = timezone.now()
+    messages = [
+        EmailMessage(
+            subject='Şifre Sıfırlama Kodu',
+            body=(
+                f'Sifre sifirlama kodunuz: {code.code}. '
+                f'Kod {timezone.localtime(code.expires_at).strftime("%H:%M")} saatine kadar geçerlidir.'
+            ),
+            to=[code.user.email],
+        )
+        for code in codes.values()
+        if not code.used and code.expires_at and code.expires_at > now
+    ]
+    if messages:
+        get_connection().send_messages(messages)
+
+
+@task('users.notify', batch_size=500)
+def notify(payloads):
+    """Kullanıcı bildirimlerini tek bulk_create ile yazar."""
+    Notification.objects.bulk_create([
+        Notification(user_id=p['user_id'], title=p.get('title'), message=p.get('message'))
+        for p in payloads
+    ])
@@ -1,3 +1,197 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from jobs.models import Job
+from jobs.queue import run_jobs
+from .authentication import user_cache
+from .hashers import TunedArgon2PasswordHasher
+from .models import User
+from .revocation import revocation_filter
+
+
+class PasswordResetEmailTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='ayse', email='ayse@example.com', password=None)
+
+    def test_request_only_enqueues_email(self):
+        response = self.client.post('/api/users/password-reset/request/', {'email': 'ayse@example.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.filter(task='users.send_password_reset').count(), 1)
+
+        run_jobs()
+        self.assertEqual(len(mail.outbox), 1)
+        code = self.user.password_reset_codes.get(used=False).code
+        self.assertEqual(mail.outbox[0].to, ['ayse@example.com'])
+        self.assertIn(code, mail.outbox[0].body)
+        self.assertFalse(Job.objects.exists())
+
+    def test_superseded_codes_are_not_sent(self):
+        for _ in range(3):
+            self.client.post('/api/users/password-reset/request/', {'email': 'ayse@example.com'}, format='json')
+        run_jobs()
+        # Yeni istek eski kodları geçersiz kılar; sadece geçerli kod tek partide gönderilir
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        caches[user_cache.alias].clear()
+        self.user = User.objects.create_user(username='ali', email='ali@example.com', password='eski-sifre-123')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        # Kimlik doğrulamanın kullanıcı sorgusu (veri sorgularındaki JOIN'ler hariç)
+        return [q['sql'] for q in ctx.captured_queries if 'FROM "users_user"' in q['sql']]
+
+    def test_hot_path_does_not_query_users(self):
+        self.assertEqual(len(self.user_queries('/api/cart/')), 1)  # ilk istek cache'i doldurur
+        self.assertEqual(self.user_queries('/api/cart/'), [])
+        self.assertEqual(self.user_queries('/api/orders/my-orders/'), [])
+
+        user_cache.clear()  # süreç içi LRU boşken paylaşılan katman yeterli
+        self.assertEqual(self.user_queries('/api/orders/my-orders/'), [])
+
+    def test_password_change_and_deactivation_invalidate(self):
+        self.user_queries('/api/cart/')
+        response = self.client.put(
+            '/api/users/password/change/',
+            {'old_password': 'eski-sifre-123', 'new_password': 'yeni-sifre-456', 'new_password_confirm': 'yeni-sifre-456'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('yeni-sifre-456'))
+        self.assertEqual(len(self.user_queries('/api/cart/')), 1)
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get('/api/cart/').status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'users.hashers.TunedArgon2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class LoginTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            username='veli', email='veli@example.com',
+            password=make_password('gizli-sifre-1', hasher='md5'),  # eski politikadan kalan hash
+        )
+
+    def login(self, password='gizli-sifre-1', email='Veli@example.com'):
+        return self.client.post('/api/token/', {'email': email, 'password': password}, format='json')
+
+    def test_password_is_verified_once_and_rehashed(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('access', response.data)
+        self.assertEqual(response.data['user']['email'], 'veli@example.com')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+
+        with mock.patch.object(
+            TunedArgon2PasswordHasher, 'verify', autospec=True, side_effect=TunedArgon2PasswordHasher.verify,
+        ) as verify:
+            self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_invalid_credentials(self):
+        self.assertEqual(self.login(password='yanlis-sifre').status_code, 401)
+        self.assertEqual(self.login(email='yok@example.com').status_code, 401)
+
+
+class EmailNormalizationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_email_is_stored_normalized_and_matched_case_insensitively(self):
+        response = self.client.post('/api/users/register/', {
+            'email': ' Zeynep@Example.COM ', 'password': 'gizli-sifre-1', 'password_confirm': 'gizli-sifre-1',
+            'first_name': 'Zeynep', 'last_name': 'Kaya',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(User.objects.filter(email='zeynep@example.com').exists())
+
+        response = self.client.post('/api/users/register/', {
+            'email': 'ZEYNEP@example.com', 'password': 'gizli-sifre-1', 'password_confirm': 'gizli-sifre-1',
+            'first_name': 'Z', 'last_name': 'K',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/users/password-reset/request/', {'email': 'ZEYNEP@Example.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_resolves_user_with_exact_indexed_lookup(self):
+        User.objects.create_user(username='can', email='Can@Example.com', password='gizli-sifre-1')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/token/', {'email': 'CAN@example.com', 'password': 'gizli-sifre-1'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        lookups = [q['sql'] for q in ctx.captured_queries if 'FROM "users_user"' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn('"users_user"."email" = ', lookups[0])
+        self.assertNotIn('LIKE', lookups[0])
+
+
+class RevocationTests(TestCase):
+    def setUp(self):
+        revocation_filter.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='ece', email='ece@example.com', password='gizli-sifre-1')
+
+    def refresh(self, token):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/users/token/refresh/', {'refresh': str(token)}, format='json')
+        blacklist_queries = [q['sql'] for q in ctx.captured_queries if 'token_blacklist_blacklistedtoken' in q['sql']]
+        return response, blacklist_queries
+
+    def test_refresh_skips_database_unless_filter_matches(self):
+        token = RefreshToken.for_user(self.user)
+        self.refresh(token)  # ilk çağrı filtreyi kurar
+        response, queries = self.refresh(token)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(queries, [])
+        self.assertGreaterEqual(revocation_filter.results['filtered'], 1)
+
+        response = self.client.post('/api/users/logout/', {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        response, queries = self.refresh(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(revocation_filter.results['db_hit'], 1)
+
+    def test_sync_picks_up_tokens_blacklisted_by_other_workers(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token)[0].status_code, 200)
+        with mock.patch.object(revocation_filter, 'add'):  # başka bir süreçte kara listeye alınmış gibi
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        revocation_filter._synced_at = 0
+        self.assertEqual(self.refresh(token)[0].status_code, 401)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        now = timezone.now()
+        expired = OutstandingToken.objects.create(jti='eski', token='x', expires_at=now - timedelta(days=1))
+        BlacklistedToken.objects.create(token=expired)
+        OutstandingToken.objects.create(jti='yeni', token='y', expires_at=now + timedelta(days=1))
+        call_command('prune_tokens', batch_size=1, sleep=0, stdout=mock.Mock())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['yeni'])
+        self.assertFalse(BlacklistedToken.objects.exists())
@@ -1,6 +1,4 @@
 from django.urls import path
-from django.conf import settings
-from django.conf.urls.static import static
 from .views import (
     RegisterView,
     AddressListCreateView, AddressDetailView,
@@ -38,4 +36,4 @@ urlpatterns = [
     path('password/change/', PasswordChangeView.as_view(), name='password-change'),
     path('addresses/delete/<int:pk>/', AddressDetailView.as_view(), name='address-delete'),
     path('addresses/update/<int:pk>/', AddressDetailView.as_view(), name='address-update'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
@@ -11,9 +11,11 @@ from .serializers import (
 )
 from rest_framework.response import Response
 import os
-import requests
+from django.conf import settings
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework import serializers
+from ecommerce.prefetch import PrefetchPlanMixin
+from .tasks import send_password_reset
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -97,13 +99,14 @@ class FavoriteDetailView(generics.DestroyAPIView):
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user)
 
-class MessageListCreateView(generics.ListCreateAPIView):
+class MessageListCreateView(PrefetchPlanMixin, generics.ListCreateAPIView):
+    queryset = Message.objects.all()
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         # Kullanıcıya gelen ve kullanıcının gönderdiği mesajlar
-        return Message.objects.filter(models.Q(sender=self.request.user) | models.Q(receiver=self.request.user)).order_by('-created_at')
+        return super().get_queryset().filter(models.Q(sender=self.request.user) | models.Q(receiver=self.request.user)).order_by('-created_at')
 
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
@@ -115,12 +118,13 @@ class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return Message.objects.filter(models.Q(sender=self.request.user) | models.Q(receiver=self.request.user))
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(PrefetchPlanMixin, generics.ListAPIView):
+    queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return super().get_queryset().filter(user=self.request.user).order_by('-created_at')
 
 class NotificationDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = NotificationSerializer
@@ -141,47 +145,12 @@ class PasswordResetRequestView(generics.GenericAPIView):
         user = User.objects.get(email=email)
 
         reset_code = PasswordResetCode.create_for_user(user)
+        # E-posta worker tarafından gönderilir (python manage.py run_jobs); istek sağlayıcıyı beklemez
+        send_password_reset.enqueue(code_id=reset_code.pk)
 
-        # Send via Mailjet
-        mailjet_api_key = os.getenv('MAILJET_API_KEY')
-        mailjet_secret_key = os.getenv('MAILJET_SECRET_KEY')
-        mailjet_from_email = os.getenv('MAILJET_FROM_EMAIL', 'no-reply@example.com')
-        mailjet_from_name = os.getenv('MAILJET_FROM_NAME', 'Sampa E-comm')
-
-        email_sent = False
-        if mailjet_api_key and mailjet_secret_key and mailjet_api_key != 'dkmsakdsmkadkmsakmd':
-            try:
-                resp = requests.post(
-                    'https://api.mailjet.com/v3.1/send',
-                    auth=(mailjet_api_key, mailjet_secret_key),
-                    json={
-                        'Messages': [{
-                            'From': {'Email': mailjet_from_email, 'Name': mailjet_from_name},
-                            'To': [{'Email': email}],
-                            'Subject': 'Şifre Sıfırlama Kodu',
-                            'TextPart': f'Sifre sifirlama kodunuz: {reset_code.code}. Kod {reset_code.expires_at.strftime("%H:%M")} saatine kadar geçerlidir.'
-                        }]
-                    },
-                    timeout=10
-                )
-                resp.raise_for_status()
-                email_sent = True
-            except Exception as e:
-                print(f"❌ Email gönderilemedi: {str(e)}")
-        
-        # Development mode: print code to console
-        if not email_sent:
-            print(f"\n{'='*60}")
-            print(f"🔑 ŞİFRE SIFIRLAMA KODU (DEVELOPMENT)")
-            print(f"{'='*60}")
-            print(f"Email: {email}")
-            print(f"Kod: {reset_code.code}")
-            print(f"Geçerlilik: {reset_code.expires_at.strftime('%H:%M')} saatine kadar")
-            print(f"{'='*60}\n")
-        
-        # Return code in development mode
+        # Development mode: Mailjet yapılandırılmamışsa kodu yanıtta döndür
         response_data = {'detail': 'Kod gönderildi'}
-        if os.getenv('DJANGO_DEBUG', 'False') == 'True' and not email_sent:
+        if os.getenv('DJANGO_DEBUG', 'False') == 'True' and not settings.MAILJET_API_KEY:
             response_data['code'] = reset_code.code  # Only in DEBUG mode!
         
         return Response(response_data, status=status.HTTP_200_OK)